@@ -1,3 +1,7 @@
 # solver/app/__init__.py
 # Samay solver package
 
+import time
+
+# When the package started loading; the service reports its import time from it
+IMPORT_STARTED = time.perf_counter()
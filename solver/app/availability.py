@@ -0,0 +1,149 @@
+# solver/app/availability.py
+# Per-employee availability index built once per optimization request
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import tzinfo
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .models import AvailabilityType, Employee
+from .timeline import parse_epoch_minutes
+
+# Integer codes for availability types in vectorized lookups; 0 = no covering window
+AVAILABILITY_TYPES: List[Optional[AvailabilityType]] = [
+    None,
+    AvailabilityType.PREFERRED,
+    AvailabilityType.NEUTRAL,
+    AvailabilityType.AVOIDED,
+    AvailabilityType.BLACKOUT,
+]
+AVAILABILITY_CODES: Dict[Optional[AvailabilityType], int] = {
+    avail_type: code for code, avail_type in enumerate(AVAILABILITY_TYPES)
+}
+NO_WINDOW = AVAILABILITY_CODES[None]
+BLACKOUT = AVAILABILITY_CODES[AvailabilityType.BLACKOUT]
+
+
+@dataclass
+class EmployeeWindows:
+    """Availability windows of one employee in epoch minutes, sorted by start."""
+    starts: np.ndarray
+    ends: np.ndarray
+    codes: np.ndarray
+    # Position of each window in the employee's original availability list
+    order: np.ndarray
+    # max(ends[0..i]) - lets a lookup stop scanning once no earlier window can cover
+    reach: np.ndarray
+    # No two windows overlap, so at most one window can cover a shift
+    disjoint: bool
+
+
+class AvailabilityIndex:
+    """
+    Availability windows for all employees of a request, by employee position.
+
+    Windows are parsed once and sorted by start so a shift lookup only has to
+    bisect to the last window starting before the shift and walk back while an
+    earlier window can still reach the shift end.
+    """
+
+    def __init__(self, windows: List[EmployeeWindows]):
+        self._windows = windows
+
+    @classmethod
+    def from_employees(cls, employees: List[Employee], local_tz: tzinfo) -> "AvailabilityIndex":
+        """Parse every employee's windows; naive timestamps are read in local_tz."""
+        return cls([_index_employee(emp, local_tz) for emp in employees])
+
+    @classmethod
+    def from_columns(
+        cls,
+        offsets: Optional[List[int]],
+        starts: List[int],
+        ends: List[int],
+        types: List[AvailabilityType],
+        num_employees: int
+    ) -> "AvailabilityIndex":
+        """Index over windows already in epoch minutes, employee e's at offsets[e]:offsets[e + 1]."""
+        if offsets is None:
+            offsets = [0] * (num_employees + 1)
+        starts_arr = np.asarray(starts, dtype=np.int64)
+        ends_arr = np.asarray(ends, dtype=np.int64)
+        codes_arr = np.array([AVAILABILITY_CODES[t] for t in types], dtype=np.int8)
+        return cls([
+            _windows(starts_arr[a:b], ends_arr[a:b], codes_arr[a:b])
+            for a, b in zip(offsets, offsets[1:])
+        ])
+
+    def subset(self, emp_idx: List[int]) -> "AvailabilityIndex":
+        """Index over the given employees, renumbered in that order."""
+        return AvailabilityIndex([self._windows[i] for i in emp_idx])
+
+    def lookup(self, emp_idx: int, shift_start: int, shift_end: int) -> Optional[AvailabilityType]:
+        """
+        Get the availability type for an employee during a shift.
+
+        Only windows that fully cover the shift count. When several windows
+        cover it, the one listed first in the request wins.
+        """
+        windows = self._windows[emp_idx]
+
+        best: Optional[int] = None
+        i = bisect_right(windows.starts, shift_start) - 1
+        while i >= 0 and windows.reach[i] >= shift_end:
+            if windows.ends[i] >= shift_end and (best is None or windows.order[i] < windows.order[best]):
+                best = i
+            i -= 1
+
+        return AVAILABILITY_TYPES[windows.codes[best]] if best is not None else None
+
+    def lookup_codes(self, emp_idx: int, shift_starts: np.ndarray, shift_ends: np.ndarray) -> np.ndarray:
+        """Vectorized lookup: availability codes of one employee for many shifts."""
+        windows = self._windows[emp_idx]
+        codes = np.zeros(len(shift_starts), dtype=np.int8)
+        if len(windows.starts) == 0:
+            return codes
+
+        if windows.disjoint:
+            # Only the last window starting at or before the shift can cover it
+            i = np.searchsorted(windows.starts, shift_starts, side="right") - 1
+            safe = np.maximum(i, 0)
+            covered = (i >= 0) & (windows.ends[safe] >= shift_ends)
+            codes[covered] = windows.codes[safe[covered]]
+            return codes
+
+        # Overlapping windows: compare against all of them, first listed wins
+        by_order = np.argsort(windows.order)
+        cover = (
+            (windows.starts[by_order][:, None] <= shift_starts[None, :])
+            & (windows.ends[by_order][:, None] >= shift_ends[None, :])
+        )
+        any_cover = cover.any(axis=0)
+        first = cover.argmax(axis=0)
+        codes[any_cover] = windows.codes[by_order][first[any_cover]]
+        return codes
+
+
+def _index_employee(employee: Employee, local_tz: tzinfo) -> EmployeeWindows:
+    windows = employee.availability
+    return _windows(
+        np.array([parse_epoch_minutes(w.start, local_tz) for w in windows], dtype=np.int64),
+        np.array([parse_epoch_minutes(w.end, local_tz) for w in windows], dtype=np.int64),
+        np.array([AVAILABILITY_CODES[w.type] for w in windows], dtype=np.int8),
+    )
+
+
+def _windows(starts: np.ndarray, ends: np.ndarray, codes: np.ndarray) -> EmployeeWindows:
+    """One employee's windows, given in request order, sorted by start."""
+    order = np.argsort(starts, kind="stable")
+    starts, ends = starts[order], ends[order]
+    return EmployeeWindows(
+        starts=starts,
+        ends=ends,
+        codes=codes[order],
+        order=order.astype(np.int64),
+        reach=np.maximum.accumulate(ends) if len(ends) else ends,
+        disjoint=bool(np.all(starts[1:] >= ends[:-1])),
+    )
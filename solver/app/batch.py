@@ -0,0 +1,106 @@
+# solver/app/batch.py
+# Many optimization requests in one call, solved across the job pool's processes
+
+import logging
+import math
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .cache import get_cache
+from .decompose import time_budgets
+from .metrics import IN_FLIGHT, observe_result, observe_solve
+from .models import BatchItem, OptimizeRequest, OptimizeStatus
+from .optimize import OptimizationResult, build_response, run_optimization
+
+logger = logging.getLogger(__name__)
+
+
+def _solve_item(
+    index: int,
+    data: Dict[str, Any],
+    timeout_seconds: Optional[int]
+) -> Tuple[BatchItem, Optional[OptimizationResult]]:
+    """
+    Pool entry point: validate and solve one batch request in a worker process.
+
+    Any failure becomes an "error" item, so it never reaches the other items.
+    The result comes back too, for the parent's metrics.
+    """
+    team_id = data.get("team_id")
+    try:
+        request = OptimizeRequest.model_validate(data)
+        if timeout_seconds is not None and timeout_seconds < request.settings.timeout_seconds:
+            request.settings.timeout_seconds = timeout_seconds
+        result = run_optimization(request, cache=get_cache())
+        return BatchItem(index=index, team_id=team_id, type="result", result=build_response(result)), result
+    except Exception as e:
+        logger.warning(f"Batch item {index} (team={team_id}) failed: {e}")
+        return BatchItem(index=index, team_id=team_id, type="error", detail=str(e)), None
+
+
+def _size(data: Dict[str, Any]) -> int:
+    """
+    Employees times shifts, the scale of a request before it is validated.
+
+    Fields that are not lists count as empty; validation fails that item later.
+    """
+    employees, shifts = (data.get(key) for key in ("employees", "open_shifts"))
+    if not isinstance(employees, list) or not isinstance(shifts, list):
+        return 1
+    return max(1, len(employees) * len(shifts))
+
+
+def run_batch(
+    requests: List[Dict[str, Any]],
+    timeout_seconds: Optional[int],
+    executor: Executor,
+    concurrency: int
+) -> Iterator[BatchItem]:
+    """
+    Solve requests on `executor`, yielding each item as it finishes.
+
+    At most `concurrency` requests are in the pool at once, so a batch does
+    not crowd out other work queued on it. With `timeout_seconds`, each
+    request's timeout is capped at its share of the batch budget by size,
+    and at the time left when it starts, so the batch ends within about
+    that budget. Closing the iterator cancels requests not yet started.
+    """
+    start_time = time.time()
+    budgets: List[Optional[int]] = [None] * len(requests)
+    if timeout_seconds is not None:
+        budgets = time_budgets([_size(data) for data in requests], timeout_seconds, concurrency)
+
+    pending = deque(range(len(requests)))
+    running: Dict[Future, int] = {}
+    try:
+        while pending or running:
+            while pending and len(running) < concurrency:
+                i = pending.popleft()
+                budget = budgets[i]
+                if budget is not None:
+                    remaining_seconds = timeout_seconds - (time.time() - start_time)
+                    budget = max(1, min(budget, math.floor(remaining_seconds)))
+                running[executor.submit(_solve_item, i, requests[i], budget)] = i
+                IN_FLIGHT.inc(source="batch")
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                i = running.pop(future)
+                IN_FLIGHT.dec(source="batch")
+                try:
+                    item, result = future.result()
+                except Exception as e:
+                    # The worker itself failed, e.g. a broken pool
+                    logger.error(f"Batch item {i} failed in the pool: {e}")
+                    item = BatchItem(index=i, team_id=requests[i].get("team_id"), type="error", detail=str(e))
+                    result = None
+                if result is not None:
+                    observe_result(result)
+                else:
+                    observe_solve(OptimizeStatus.ERROR, None)
+                yield item
+    finally:
+        for future in running:
+            future.cancel()
+        IN_FLIGHT.dec(len(running), source="batch")
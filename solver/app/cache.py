@@ -0,0 +1,280 @@
+# solver/app/cache.py
+# Content-addressed cache of optimization results and built models
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Generic, Optional, TypeVar, Union
+
+from .models import ColumnarRequest, OptimizeRequest, OptimizeResponse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESULT_ENTRIES = 256
+DEFAULT_MODEL_ENTRIES = 8
+DEFAULT_TTL_SECONDS = 3600
+DEFAULT_DISK_ENTRIES = 4096
+
+# Settings that change how long or how the search runs but not the model itself
+SEARCH_ONLY_SETTINGS = (
+    "timeout_seconds", "random_seed", "mode", "relaxed_concurrently", "unsat_core_time_fraction", "profile"
+)
+
+V = TypeVar("V")
+
+
+@dataclass
+class RequestKeys:
+    """Cache keys of one request: the full request, and the request minus search-only settings."""
+    result: str
+    model: str
+
+
+def _canonical(request: Union[OptimizeRequest, ColumnarRequest]) -> Dict[str, Any]:
+    """
+    Request as plain data with set-like lists in a fixed order.
+
+    Employees, shifts, skills and assignment lists are sorted since their
+    order does not change the problem. Availability windows keep their
+    order: where windows overlap, the first listed one wins. Columnar
+    requests are taken as sent; their keys never match a nested request's.
+    """
+    data = request.model_dump(mode="json")
+    if isinstance(request, ColumnarRequest):
+        return data
+    for employee in data["employees"]:
+        employee["skills"] = sorted(set(employee["skills"]))
+    for shift in data["open_shifts"]:
+        shift["required_skills"] = sorted(set(shift["required_skills"]))
+    data["employees"].sort(key=lambda e: e["id"])
+    data["open_shifts"].sort(key=lambda s: s["id"])
+    for name in ("previous_assignments", "locked_assignments"):
+        data[name].sort(key=lambda a: (a["shift_id"], a["employee_id"]))
+    return data
+
+
+def _digest(data: Dict[str, Any]) -> str:
+    encoded = json.dumps(data, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def request_keys(request: Union[OptimizeRequest, ColumnarRequest]) -> RequestKeys:
+    """Content hashes of a request for the result and model tiers."""
+    data = _canonical(request)
+    result_key = _digest(data)
+    for name in SEARCH_ONLY_SETTINGS:
+        data["settings"].pop(name, None)
+    return RequestKeys(result=result_key, model=_digest(data))
+
+
+class LRUCache(Generic[V]):
+    """Thread-safe LRU mapping with a maximum size, per-entry TTL and hit/miss counters."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[V]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, value: V) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class DiskResultCache:
+    """
+    Results stored as JSON files named by key, so they survive restarts and
+    are shared between processes using the same directory.
+
+    Expiry uses file modification times; the oldest files are removed once
+    there are more than `max_entries`.
+    """
+
+    def __init__(self, directory: str, max_entries: int, ttl_seconds: float):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[OptimizeResponse]:
+        path = self._path(key)
+        try:
+            if os.path.getmtime(path) + self.ttl_seconds < time.time():
+                os.remove(path)
+                self.misses += 1
+                return None
+            with open(path, "rb") as f:
+                response = OptimizeResponse.model_validate_json(f.read())
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable cache file {path}: {e}")
+            self.errors += 1
+            self.misses += 1
+            return None
+        self.hits += 1
+        return response
+
+    def put(self, key: str, response: OptimizeResponse) -> None:
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                f.write(response.model_dump_json())
+            os.replace(tmp_path, path)
+            self._prune()
+        except OSError as e:
+            logger.warning(f"Could not write cache file {path}: {e}")
+            self.errors += 1
+
+    def _prune(self) -> None:
+        files = [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.endswith(".json")
+        ]
+        if len(files) <= self.max_entries:
+            return
+        files.sort(key=os.path.getmtime)
+        for path in files[:len(files) - self.max_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "directory": self.directory,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+        }
+
+
+class SolverCache:
+    """
+    Two-tier cache for run_optimization.
+
+    The result tier maps the full request hash to its OptimizeResponse, in
+    memory and optionally on disk. The model tier maps the hash without
+    search-only settings to a prepared model (ingested problem, pair table
+    and built CpModel), so a request that only changes timeout_seconds or
+    random_seed skips straight to solving. Models are kept in memory only.
+    """
+
+    def __init__(
+        self,
+        result_entries: int = DEFAULT_RESULT_ENTRIES,
+        model_entries: int = DEFAULT_MODEL_ENTRIES,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        disk_dir: Optional[str] = None,
+        disk_entries: int = DEFAULT_DISK_ENTRIES
+    ):
+        self.results: LRUCache[OptimizeResponse] = LRUCache(result_entries, ttl_seconds)
+        self.models: LRUCache[Any] = LRUCache(model_entries, ttl_seconds)
+        self.disk = DiskResultCache(disk_dir, disk_entries, ttl_seconds) if disk_dir else None
+
+    def get_result(self, key: str) -> Optional[OptimizeResponse]:
+        response = self.results.get(key)
+        if response is None and self.disk is not None:
+            response = self.disk.get(key)
+            if response is not None:
+                self.results.put(key, response)
+        return response
+
+    def put_result(self, key: str, response: OptimizeResponse) -> None:
+        # A copy: the caller's result may still be changed after it is stored
+        response = response.model_copy(deep=True)
+        self.results.put(key, response)
+        if self.disk is not None:
+            self.disk.put(key, response)
+
+    def get_model(self, key: str) -> Optional[Any]:
+        return self.models.get(key)
+
+    def put_model(self, key: str, prepared: Any) -> None:
+        self.models.put(key, prepared)
+
+    def clear(self) -> None:
+        """Drop the in-memory tiers; files on disk are left to expire."""
+        self.results.clear()
+        self.models.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {"result": self.results.stats(), "model": self.models.stats()}
+        if self.disk is not None:
+            stats["disk"] = self.disk.stats()
+        return stats
+
+
+_cache: Optional[SolverCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> SolverCache:
+    """Process-wide SolverCache, created on first use from the environment."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SolverCache(
+                result_entries=int(os.getenv("SOLVER_CACHE_RESULTS", DEFAULT_RESULT_ENTRIES)),
+                model_entries=int(os.getenv("SOLVER_CACHE_MODELS", DEFAULT_MODEL_ENTRIES)),
+                ttl_seconds=float(os.getenv("SOLVER_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)),
+                disk_dir=os.getenv("SOLVER_CACHE_DIR") or None,
+                disk_entries=int(os.getenv("SOLVER_CACHE_DISK_ENTRIES", DEFAULT_DISK_ENTRIES)),
+            )
+        return _cache
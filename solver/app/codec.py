@@ -0,0 +1,174 @@
+# solver/app/codec.py
+# Request and response bodies: JSON or msgpack, optionally gzip or zstd compressed
+
+import gzip
+import importlib
+import json
+import zlib
+from types import ModuleType
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from fastapi.responses import Response
+
+from .models import Assignment, OptimizeResponse
+
+
+def _optional_module(name: str) -> Optional[ModuleType]:
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+# Optional speedups (poetry extra "fast"); everything works without them
+orjson = _optional_module("orjson")
+msgpack = _optional_module("msgpack")
+zstandard = _optional_module("zstandard")
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+MSGPACK_TYPES = (MSGPACK, "application/x-msgpack")
+
+# Smaller bodies are sent as they are
+MIN_COMPRESS_BYTES = 1024
+# Cap on a decompressed request body, so a small compressed body cannot fill memory
+MAX_DECOMPRESSED_BYTES = 256 * 1024 * 1024
+# Roster bodies repeat ids and timestamps, so fast levels already compress well
+GZIP_LEVEL = 1
+ZSTD_LEVEL = 3
+
+_DECOMPRESS_ERRORS: Tuple[Type[BaseException], ...] = (OSError, EOFError, zlib.error)
+if zstandard is not None:
+    _DECOMPRESS_ERRORS += (zstandard.ZstdError,)
+
+
+class UnsupportedMediaError(Exception):
+    """Raised for a body media type or content encoding this server cannot read."""
+
+
+def _media_type(header: Optional[str]) -> str:
+    return (header or JSON).split(";", 1)[0].strip().lower()
+
+
+def decode_body(body: bytes, content_type: Optional[str], content_encoding: Optional[str]) -> Any:
+    """
+    Decompress and parse a request body into plain data.
+
+    Raises UnsupportedMediaError for an unknown media type or encoding and
+    ValueError for a body that cannot be decompressed or parsed.
+    """
+    encoding = (content_encoding or "identity").strip().lower()
+    try:
+        if encoding == "gzip":
+            body = _gunzip(body, MAX_DECOMPRESSED_BYTES)
+        elif encoding == "zstd" and zstandard is not None:
+            body = zstandard.ZstdDecompressor().decompress(body, max_output_size=MAX_DECOMPRESSED_BYTES)
+        elif encoding != "identity":
+            raise UnsupportedMediaError(f"Unsupported content encoding: {encoding}")
+    except _DECOMPRESS_ERRORS as e:
+        raise ValueError(f"Cannot decompress {encoding} body: {e}") from e
+
+    media_type = _media_type(content_type)
+    if media_type in MSGPACK_TYPES and msgpack is not None:
+        return msgpack.unpackb(body)
+    if media_type == JSON or media_type.endswith("+json"):
+        return orjson.loads(body) if orjson is not None else json.loads(body)
+    raise UnsupportedMediaError(f"Unsupported content type: {media_type}")
+
+
+def _gunzip(body: bytes, limit: int) -> bytes:
+    """Decompress every gzip member of a body; ValueError beyond `limit` bytes or on a truncated body."""
+    chunks: List[bytes] = []
+    size = 0
+    while body:
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        chunk = decompressor.decompress(body, limit - size + 1)
+        size += len(chunk)
+        if size > limit:
+            raise ValueError(f"decompressed body exceeds {limit} bytes")
+        if not decompressor.eof:
+            raise ValueError("truncated gzip body")
+        chunks.append(chunk)
+        body = decompressor.unused_data
+    return b"".join(chunks)
+
+
+def _preferences(header: Optional[str]) -> Dict[str, float]:
+    """Quality value of each token of an Accept or Accept-Encoding header."""
+    preferences = {}
+    for part in (header or "").split(","):
+        token, *params = [p.strip() for p in part.split(";")]
+        if not token:
+            continue
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        preferences[token.lower()] = q
+    return preferences
+
+
+def negotiate(accept: Optional[str], accept_encoding: Optional[str]) -> Tuple[str, Optional[str]]:
+    """
+    Response media type and content encoding for a client's Accept headers.
+
+    msgpack is used only when asked for and installed, zstd only when
+    installed; anything else gets JSON and gzip or no compression.
+    """
+    types = _preferences(accept)
+    wants_msgpack = max((types.get(t, 0.0) for t in MSGPACK_TYPES), default=0.0)
+    media_type = MSGPACK if msgpack is not None and wants_msgpack > types.get(JSON, 0.0) else JSON
+
+    encodings = _preferences(accept_encoding)
+    encoding = None
+    for name in ("zstd", "gzip"):
+        if name == "zstd" and zstandard is None:
+            continue
+        if encodings.get(name, 0.0) > 0:
+            encoding = name
+            break
+    return media_type, encoding
+
+
+def _rows(assignments: List[Assignment]) -> List[Dict[str, Any]]:
+    # Field by field: much cheaper than model_dump per row
+    return [
+        {"shift_id": a.shift_id, "employee_id": a.employee_id, "start": a.start, "end": a.end, "notes": a.notes}
+        for a in assignments
+    ]
+
+
+def response_data(response: OptimizeResponse) -> Dict[str, Any]:
+    """Plain data of a response, with assignment lists written directly as rows."""
+    data = response.model_dump(
+        mode="json", exclude={"assignments": True, "relaxed_solution": {"assignments"}}
+    )
+    data["assignments"] = _rows(response.assignments)
+    if response.relaxed_solution is not None:
+        data["relaxed_solution"]["assignments"] = _rows(response.relaxed_solution.assignments)
+    return data
+
+
+def encode_response(data: Any, media_type: str, encoding: Optional[str]) -> Response:
+    """Serialize and, above MIN_COMPRESS_BYTES, compress a response body."""
+    if media_type == MSGPACK and msgpack is not None:
+        body = msgpack.packb(data)
+    else:
+        media_type = JSON
+        if orjson is not None:
+            body = orjson.dumps(data)
+        else:
+            body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if encoding is not None and len(body) >= MIN_COMPRESS_BYTES:
+        if encoding == "zstd" and zstandard is not None:
+            body = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+        else:
+            encoding = "gzip"
+            body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=media_type, headers=headers)
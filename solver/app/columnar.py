@@ -0,0 +1,202 @@
+# solver/app/columnar.py
+# Conversion between the nested request schema and its columnar form
+
+from datetime import timedelta, tzinfo
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .models import (
+    AssignmentRef,
+    AvailabilityWindow,
+    ColumnarRequest,
+    Employee,
+    OpenShift,
+    OptimizeRequest,
+)
+from .timeline import EPOCH, parse_epoch_minutes, resolve_timezone, shift_epoch_minutes
+
+
+class _Table:
+    """Strings interned to positions in order of first use."""
+
+    def __init__(self) -> None:
+        self.pos: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def __call__(self, value: str) -> int:
+        pos = self.pos.get(value)
+        if pos is None:
+            pos = self.pos[value] = len(self.values)
+            self.values.append(value)
+        return pos
+
+
+def to_columnar(request: OptimizeRequest) -> ColumnarRequest:
+    """
+    The columnar form of a request, solving to the same roster.
+
+    Previous assignments naming unknown employees or shifts are dropped, as
+    the solver would; unknown ids in locked assignments are errors.
+    """
+    local_tz = resolve_timezone(request.timezone)
+    skills, codes, days = _Table(), _Table(), _Table()
+
+    employee_skills: List[int] = []
+    employee_skill_offsets = [0]
+    availability: List[AvailabilityWindow] = []
+    availability_offsets = [0]
+    preference_codes: List[int] = []
+    preference_values: List[int] = []
+    preference_offsets = [0]
+    for employee in request.employees:
+        employee_skills.extend(skills(name) for name in employee.skills)
+        employee_skill_offsets.append(len(employee_skills))
+        availability.extend(employee.availability)
+        availability_offsets.append(len(availability))
+        preference_codes.extend(codes(code) for code in employee.preferences)
+        preference_values.extend(employee.preferences.values())
+        preference_offsets.append(len(preference_codes))
+
+    shift_skills: List[int] = []
+    shift_skill_offsets = [0]
+    shift_start: List[int] = []
+    shift_end: List[int] = []
+    for shift in request.open_shifts:
+        shift_skills.extend(skills(name) for name in shift.required_skills)
+        shift_skill_offsets.append(len(shift_skills))
+        start, end = shift_epoch_minutes(
+            shift.day, shift.start_time, shift.end_time, shift.duration_hours, local_tz
+        )
+        shift_start.append(start)
+        shift_end.append(end)
+
+    employee_pos = {e.id: i for i, e in enumerate(request.employees)}
+    shift_pos = {s.id: i for i, s in enumerate(request.open_shifts)}
+    previous = [
+        a for a in request.previous_assignments
+        if a.employee_id in employee_pos and a.shift_id in shift_pos
+    ]
+    for a in request.locked_assignments:
+        if a.employee_id not in employee_pos:
+            raise ValueError(f"Locked assignment references unknown employee {a.employee_id}")
+        if a.shift_id not in shift_pos:
+            raise ValueError(f"Locked assignment references unknown shift {a.shift_id}")
+
+    return ColumnarRequest(
+        team_id=request.team_id,
+        date_from=request.date_from,
+        date_to=request.date_to,
+        timezone=request.timezone,
+        settings=request.settings,
+        skills=skills.values,
+        shift_codes=codes.values,
+        days=days.values,
+        employee_ids=[e.id for e in request.employees],
+        employee_skill_offsets=employee_skill_offsets,
+        employee_skills=employee_skills,
+        availability_offsets=availability_offsets,
+        availability_start=[parse_epoch_minutes(w.start, local_tz) for w in availability],
+        availability_end=[parse_epoch_minutes(w.end, local_tz) for w in availability],
+        availability_type=[w.type for w in availability],
+        preference_offsets=preference_offsets,
+        preference_codes=preference_codes,
+        preference_values=preference_values,
+        shift_ids=[s.id for s in request.open_shifts],
+        shift_day=[days(s.day) for s in request.open_shifts],
+        shift_code=[codes(s.shift_code) for s in request.open_shifts],
+        shift_start=shift_start,
+        shift_end=shift_end,
+        shift_hours=[s.duration_hours for s in request.open_shifts],
+        shift_skill_offsets=shift_skill_offsets,
+        shift_skills=shift_skills,
+        shift_headcount=[s.headcount for s in request.open_shifts],
+        previous_shift=[shift_pos[a.shift_id] for a in previous],
+        previous_employee=[employee_pos[a.employee_id] for a in previous],
+        locked_shift=[shift_pos[a.shift_id] for a in request.locked_assignments],
+        locked_employee=[employee_pos[a.employee_id] for a in request.locked_assignments],
+    )
+
+
+def to_request(request: ColumnarRequest) -> OptimizeRequest:
+    """
+    The nested form of a columnar request, for code paths that work on
+    OptimizeRequest such as the rolling horizon.
+
+    Availability is written as UTC timestamps. Shifts get local wall-clock
+    times on their day; a shift those cannot express (starting on another
+    day, longer than a day, or across a DST gap) is an error.
+    """
+    local_tz = resolve_timezone(request.timezone)
+
+    def iso(minutes: int) -> str:
+        return (EPOCH + timedelta(minutes=minutes)).isoformat()
+
+    def rows(offsets: Optional[List[int]], num_rows: int) -> Iterable[Tuple[int, int]]:
+        return zip(offsets, offsets[1:]) if offsets is not None else [(0, 0)] * num_rows
+
+    num_employees = len(request.employee_ids)
+    employees = []
+    for e_idx, ((sa, sb), (aa, ab), (pa, pb)) in enumerate(zip(
+        rows(request.employee_skill_offsets, num_employees),
+        rows(request.availability_offsets, num_employees),
+        rows(request.preference_offsets, num_employees),
+    )):
+        employees.append(Employee(
+            id=request.employee_ids[e_idx],
+            skills=[request.skills[k] for k in request.employee_skills[sa:sb]],
+            availability=[
+                AvailabilityWindow(
+                    start=iso(request.availability_start[w]),
+                    end=iso(request.availability_end[w]),
+                    type=request.availability_type[w],
+                )
+                for w in range(aa, ab)
+            ],
+            preferences={
+                request.shift_codes[c]: v
+                for c, v in zip(request.preference_codes[pa:pb], request.preference_values[pa:pb])
+            },
+        ))
+
+    shifts = []
+    for s_idx, (ka, kb) in enumerate(rows(request.shift_skill_offsets, len(request.shift_ids))):
+        start, end = request.shift_start[s_idx], request.shift_end[s_idx]
+        day = request.days[request.shift_day[s_idx]]
+        start_time = _wall_clock(start, local_tz)
+        end_time = _wall_clock(end, local_tz)
+        hours = request.shift_hours[s_idx] if request.shift_hours is not None else (end - start) / 60
+        if shift_epoch_minutes(day, start_time, end_time, hours, local_tz) != (start, end):
+            raise ValueError(
+                f"Shift {request.shift_ids[s_idx]} cannot be written as wall-clock times on {day}"
+            )
+        shifts.append(OpenShift(
+            id=request.shift_ids[s_idx],
+            day=day,
+            shift_code=request.shift_codes[request.shift_code[s_idx]],
+            required_skills=[request.skills[k] for k in request.shift_skills[ka:kb]],
+            duration_hours=hours,
+            start_time=start_time,
+            end_time=end_time,
+            headcount=request.shift_headcount[s_idx] if request.shift_headcount is not None else 1,
+        ))
+
+    def refs(shift_col: List[int], employee_col: List[int]) -> List[AssignmentRef]:
+        return [
+            AssignmentRef(shift_id=request.shift_ids[s], employee_id=request.employee_ids[e])
+            for s, e in zip(shift_col, employee_col)
+        ]
+
+    return OptimizeRequest(
+        team_id=request.team_id,
+        date_from=request.date_from,
+        date_to=request.date_to,
+        timezone=request.timezone,
+        employees=employees,
+        open_shifts=shifts,
+        settings=request.settings,
+        previous_assignments=refs(request.previous_shift, request.previous_employee),
+        locked_assignments=refs(request.locked_shift, request.locked_employee),
+    )
+
+
+def _wall_clock(minutes: int, local_tz: tzinfo) -> str:
+    return (EPOCH + timedelta(minutes=minutes)).astimezone(local_tz).strftime("%H:%M")
@@ -0,0 +1,149 @@
+# solver/app/constraints.py
+# Scopes of the per-employee constraints, derived from the pair table
+
+from dataclasses import dataclass
+from datetime import date
+from typing import List
+
+import numpy as np
+
+from .eligibility import PairTable
+from .intervals import overlap_cliques
+from .problem import ProblemData
+
+WEEK_DAYS = 7
+
+
+def employee_conflicts(problem: ProblemData, pairs: PairTable) -> List[List[int]]:
+    """
+    Groups of pair indices coupled by a per-employee constraint.
+
+    One group per employee and day (the max_shifts_per_day cap), plus one per
+    maximal set of an employee's shifts that overlap or leave too little
+    rest, taken over the whole horizon so overnight shifts spilling into the
+    next day are covered too. With a weekly hours cap, all of an employee's
+    pairs form one group. Groups with a single pair are omitted. These are
+    the only constraints linking different shifts.
+    """
+    groups = same_day_groups(problem, pairs) + overlap_groups(problem, pairs)
+    if problem.settings.max_hours_per_week is not None:
+        groups += [group.tolist() for group in pairs.group_by(pairs.emp) if len(group) > 1]
+    return groups
+
+
+def same_day_groups(problem: ProblemData, pairs: PairTable) -> List[List[int]]:
+    """Pair indices of each employee and day with more than one eligible shift."""
+    days, day_of_shift = np.unique(np.asarray(problem.shift_days), return_inverse=True)
+    day_keys = pairs.emp.astype(np.int64) * len(days) + day_of_shift.reshape(-1)[pairs.shift]
+    return [group.tolist() for group in pairs.group_by(day_keys) if len(group) > 1]
+
+
+def rest_minutes(problem: ProblemData) -> int:
+    return round(problem.settings.min_rest_hours * 60)
+
+
+def overlap_groups(problem: ProblemData, pairs: PairTable) -> List[List[int]]:
+    """
+    Pair indices of each maximal set of an employee's shifts of which no two
+    may both be worked: they overlap, or one starts less than
+    settings.min_rest_hours after the other ends.
+
+    Stretching every shift's end by the rest turns too-short rests into
+    overlaps, so the same sweep finds both, across midnight included.
+    """
+    groups: List[List[int]] = []
+    starts = np.asarray(problem.shift_start, dtype=np.int64)
+    ends = np.asarray(problem.shift_end, dtype=np.int64) + rest_minutes(problem)
+    pair_start = starts[pairs.shift].tolist()
+    pair_end = ends[pairs.shift].tolist()
+    for group in pairs.by_employee(starts):
+        groups.extend(overlap_cliques(group.tolist(), pair_start, pair_end))
+    return groups
+
+
+def shift_minutes(problem: ProblemData) -> np.ndarray:
+    """Each shift's duration_hours in whole minutes."""
+    return np.rint(np.asarray(problem.shift_hours, dtype=np.float64) * 60).astype(np.int64)
+
+
+@dataclass
+class WeeklyHours:
+    """
+    The rolling 7-day hours cap as sliding windows over employee-days.
+
+    `day_pairs` holds the pair indices of each employee-day that is part of
+    a window able to exceed the cap, and `day_bounds` the minutes of all of
+    that employee-day's eligible shifts. The bounds leave the shift count to
+    the guarded max_shifts_per_day constraint, so dropping that guard in the
+    relaxed solve or the core search is not blocked by them. `windows` lists
+    positions in `day_pairs`, with the employee index and first day of each
+    window. The model sums each employee-day's minutes into one integer
+    variable and caps each window's sum of those, so every pair appears in
+    one day sum instead of seven window sums.
+    """
+    cap: int  # minutes
+    day_pairs: List[np.ndarray]
+    day_bounds: np.ndarray
+    windows: List[np.ndarray]
+    window_employee: np.ndarray
+    window_start: List[str]
+
+
+def weekly_hours(problem: ProblemData, pairs: PairTable) -> WeeklyHours:
+    """
+    Windows of 7 consecutive days, by shift day, whose shifts could add up to
+    more than settings.max_hours_per_week; none when there is no cap.
+
+    Windows start on the days an employee has eligible shifts: any other
+    window holds a subset of the shifts of the window starting on the next
+    such day. Windows holding the same employee-days as the window a day
+    earlier are dropped too.
+    """
+    cap_hours = problem.settings.max_hours_per_week
+    if cap_hours is None or len(pairs) == 0:
+        return WeeklyHours(
+            cap=0, day_pairs=[], day_bounds=np.zeros(0, dtype=np.int64),
+            windows=[], window_employee=np.zeros(0, dtype=np.int64), window_start=[],
+        )
+    cap = round(cap_hours * 60)
+
+    ordinals = np.asarray([date.fromisoformat(day[:10]).toordinal() for day in problem.shift_days], dtype=np.int64)
+    pair_day = ordinals[pairs.shift]
+    first_day = int(pair_day.min())
+    # Room for WEEK_DAYS past the last day, so a window never runs into the next employee's keys
+    stride = int(pair_day.max()) - first_day + 1 + WEEK_DAYS
+    keys = pairs.emp.astype(np.int64) * stride + (pair_day - first_day)
+    minutes = shift_minutes(problem)[pairs.shift]
+
+    # Employee-days in key order, each with all of its durations summed
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    new_day = np.r_[True, sorted_keys[1:] != sorted_keys[:-1]]
+    day_start = np.flatnonzero(new_day)
+    day_of = np.cumsum(new_day) - 1
+    bounds = np.bincount(day_of, weights=minutes[order]).astype(np.int64)
+    day_keys = sorted_keys[day_start]
+
+    # Window i covers employee-days [i, end[i]); it matters if it can exceed the cap
+    end = np.searchsorted(day_keys, day_keys + WEEK_DAYS, side="left")
+    prefix = np.r_[0, np.cumsum(bounds)]
+    binding = prefix[end] - prefix[:-1] > cap
+    binding[1:] &= end[1:] != end[:-1]
+    starts = np.flatnonzero(binding)
+
+    # Only employee-days inside some binding window get a sum
+    cover = np.zeros(len(day_keys) + 1, dtype=np.int64)
+    np.add.at(cover, starts, 1)
+    np.add.at(cover, end[starts], -1)
+    needed = np.cumsum(cover[:-1]) > 0
+    position = np.cumsum(needed) - 1
+
+    day_pairs = np.split(order, day_start[1:])
+    return WeeklyHours(
+        cap=cap,
+        day_pairs=[day_pairs[i] for i in np.flatnonzero(needed).tolist()],
+        day_bounds=bounds[needed],
+        windows=[position[i:j] for i, j in zip(starts.tolist(), end[starts].tolist())],
+        window_employee=day_keys[starts] // stride,
+        window_start=[date.fromordinal(first_day + int(k % stride)).isoformat() for k in day_keys[starts]],
+    )
@@ -0,0 +1,180 @@
+# solver/app/decompose.py
+# Split a problem into independent subproblems along its constraint graph
+
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import chain
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .constraints import employee_conflicts
+from .eligibility import PairTable
+from .models import OptimizeSettings
+from .problem import ProblemData
+
+DEFAULT_INLINE_PAIRS = 10000
+
+
+@dataclass
+class Part:
+    """One component of a problem, solved as its own model."""
+    shifts: np.ndarray  # sorted shift indices
+    num_pairs: int
+    inline: bool
+
+
+def find_components(problem: ProblemData, pairs: PairTable) -> List[np.ndarray]:
+    """
+    Shift index arrays of the independent components of the problem.
+
+    Two shifts are coupled when some employee-level constraint (same day or
+    overlapping times) contains pairs of both. The objective is a sum over
+    pairs and shifts, so components can be solved separately and their
+    fitness added up. Components are ordered by their first shift.
+    """
+    num_shifts = problem.num_shifts
+    groups = employee_conflicts(problem, pairs)
+
+    # Chain the shifts of each group: consecutive members are connected
+    flat = np.fromiter(chain.from_iterable(groups), dtype=np.int64)
+    group_of = np.repeat(np.arange(len(groups)), [len(g) for g in groups])
+    linked = group_of[1:] == group_of[:-1]
+    u = pairs.shift[flat[:-1][linked]]
+    v = pairs.shift[flat[1:][linked]]
+
+    labels = _component_labels(num_shifts, u, v)
+    order = np.argsort(labels, kind="stable")
+    bounds = np.flatnonzero(np.diff(labels[order])) + 1
+    return np.split(order, bounds) if num_shifts else []
+
+
+def _component_labels(n: int, u: np.ndarray, v: np.ndarray) -> np.ndarray:
+    """Smallest node index of each node's component, by min-label propagation."""
+    labels = np.arange(n)
+    while True:
+        low = np.minimum(labels[u], labels[v])
+        updated = labels.copy()
+        np.minimum.at(updated, u, low)
+        np.minimum.at(updated, v, low)
+        # Pointer jumping: follow labels to their own label until stable
+        while True:
+            jumped = updated[updated]
+            if np.array_equal(jumped, updated):
+                break
+            updated = jumped
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+
+def plan_parts(pairs: PairTable, components: List[np.ndarray], inline_pairs: int) -> List[Part]:
+    """
+    One part per component; components with fewer than `inline_pairs` pairs
+    are solved inline rather than shipped to the component pool.
+    """
+    pairs_per_shift = np.diff(pairs.shift_ptr)
+    parts = []
+    for shifts in components:
+        num_pairs = int(pairs_per_shift[shifts].sum())
+        parts.append(Part(shifts=shifts, num_pairs=num_pairs, inline=num_pairs < inline_pairs))
+    return parts
+
+
+def time_budgets(sizes: List[int], timeout_seconds: int, concurrency: int) -> List[int]:
+    """
+    Whole-second time limits proportional to part size.
+
+    `concurrency` parts run at once, so together they may use that many
+    times the request's timeout, but no part gets more than the timeout.
+    """
+    total = sum(sizes) or 1
+    return [
+        min(timeout_seconds, max(1, math.ceil(timeout_seconds * concurrency * size / total)))
+        for size in sizes
+    ]
+
+
+def subproblem(
+    problem: ProblemData,
+    pairs: PairTable,
+    shifts: np.ndarray,
+    settings: OptimizeSettings
+) -> Tuple[ProblemData, PairTable]:
+    """A part's shifts with the employees eligible for them, as a standalone problem."""
+    in_part = np.isin(pairs.shift, shifts)
+    employees = np.unique(pairs.emp[in_part])
+    return (
+        problem.subset(employees.tolist(), shifts.tolist(), settings),
+        pairs.subset(employees, shifts),
+    )
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_stop_manager = None
+_pool_lock = threading.Lock()
+
+
+def decompose_enabled() -> bool:
+    """
+    SOLVER_DECOMPOSE=1 splits requests. Off by default: each part pays its
+    own presolve, so splitting only wins when parts run in parallel.
+    """
+    return os.getenv("SOLVER_DECOMPOSE", "0") != "0"
+
+
+def component_pool_workers() -> int:
+    """
+    Component pool processes, SOLVER_DECOMPOSE_WORKERS (default none). They
+    come out of the job pool's SOLVER_POOL_WORKERS budget, see jobs.job_pool_workers.
+    """
+    return int(os.getenv("SOLVER_DECOMPOSE_WORKERS", 0)) if decompose_enabled() else 0
+
+
+def inline_pairs_threshold() -> int:
+    return int(os.getenv("SOLVER_DECOMPOSE_INLINE_PAIRS", DEFAULT_INLINE_PAIRS))
+
+
+def get_component_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    Process pool for large components, created on first use; None when
+    SOLVER_DECOMPOSE_WORKERS is below 2 and components are solved inline.
+    """
+    global _pool
+    workers = component_pool_workers()
+    if workers < 2:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def stop_event() -> threading.Event:
+    """
+    An Event that can be passed to component pool workers, so a stopped
+    solve can stop its running parts. Its manager process starts on first use.
+    """
+    global _stop_manager
+    with _pool_lock:
+        if _stop_manager is None:
+            _stop_manager = multiprocessing.get_context("spawn").Manager()
+        return _stop_manager.Event()
+
+
+def shutdown_component_pool() -> None:
+    global _pool, _stop_manager
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+        if _stop_manager is not None:
+            _stop_manager.shutdown()
+            _stop_manager = None
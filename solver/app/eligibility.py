@@ -0,0 +1,233 @@
+# solver/app/eligibility.py
+# Vectorized employee x shift eligibility and objective weights
+
+from dataclasses import dataclass
+from typing import List, Tuple
+
+import numpy as np
+
+from .availability import AVAILABILITY_CODES, BLACKOUT
+from .models import AvailabilityType, OptimizeWeights
+from .problem import ProblemData
+from .skills import covers
+
+
+@dataclass
+class Eligibility:
+    """
+    Dense (employee x shift) matrices of a request or of a block of its shifts.
+
+    matrix[e, s] is True when employee e may be assigned to shift s (has all
+    required skills and no BLACKOUT covers the shift), except that pinned
+    employees of locked shifts always are and a shift whose seats are all
+    locked admits only them. availability[e, s] holds the availability code
+    of the covering window and weights[e, s] the objective weight of the
+    assignment.
+    """
+    matrix: np.ndarray
+    availability: np.ndarray
+    weights: np.ndarray
+
+    def pairs(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Eligible (employee, shift) index arrays, ordered by shift then employee."""
+        shift_idx, emp_idx = np.nonzero(self.matrix.T)
+        return emp_idx, shift_idx
+
+
+# Cells of the dense (employee x shift) block evaluated at a time by build_pairs,
+# about 24 MB of codes, flags and weights
+PAIR_BLOCK_CELLS = 1 << 22
+
+
+def build_eligibility(problem: ProblemData, weights: OptimizeWeights) -> Eligibility:
+    """
+    Compute eligibility, availability codes and weights for all pairs at once.
+
+    The matrices are dense, so this is for inspecting small problems; the
+    solver builds its pairs block by block with build_pairs.
+    """
+    return _BlockEvaluator(problem, weights).evaluate(0, problem.num_shifts)
+
+
+def build_pairs(
+    problem: ProblemData,
+    weights: OptimizeWeights,
+    block_cells: int = PAIR_BLOCK_CELLS
+) -> "PairTable":
+    """
+    The eligible pairs of a request, evaluated one block of shifts at a time.
+
+    Each block covers about `block_cells` (employee, shift) cells, so memory
+    stays bounded by the block and the eligible pairs rather than growing
+    with employees x shifts.
+    """
+    evaluator = _BlockEvaluator(problem, weights)
+    step = max(1, block_cells // max(1, problem.num_employees))
+    emp: List[np.ndarray] = [np.zeros(0, dtype=np.int32)]
+    shift: List[np.ndarray] = [np.zeros(0, dtype=np.int32)]
+    coef: List[np.ndarray] = [np.zeros(0, dtype=np.int64)]
+    avail: List[np.ndarray] = [np.zeros(0, dtype=np.int8)]
+    for lo in range(0, problem.num_shifts, step):
+        block = evaluator.evaluate(lo, min(lo + step, problem.num_shifts))
+        emp_idx, shift_idx = block.pairs()
+        emp.append(emp_idx.astype(np.int32))
+        shift.append((shift_idx + lo).astype(np.int32))
+        coef.append(block.weights[emp_idx, shift_idx].astype(np.int64))
+        avail.append(block.availability[emp_idx, shift_idx])
+
+    # Blocks come in shift order, so the concatenation stays shift-major
+    shifts = np.concatenate(shift)
+    return PairTable(
+        emp=np.concatenate(emp),
+        shift=shifts,
+        coef=np.concatenate(coef),
+        avail=np.concatenate(avail),
+        var=np.full(len(shifts), -1, dtype=np.int32),
+        shift_ptr=np.searchsorted(shifts, np.arange(problem.num_shifts + 1)),
+    )
+
+
+class _BlockEvaluator:
+    """
+    Per-request tables shared by every block of shifts: skill checks by
+    required-skill signature, full locks, weights by availability code and
+    preferences by shift code.
+    """
+
+    def __init__(self, problem: ProblemData, weights: OptimizeWeights) -> None:
+        self.problem = problem
+        self.starts = np.asarray(problem.shift_start, dtype=np.int64)
+        self.ends = np.asarray(problem.shift_end, dtype=np.int64)
+
+        # The bitmask check runs once per distinct required-skill signature
+        # rather than once per shift
+        signatures, signature_of_shift = np.unique(
+            np.asarray(problem.shift_skill_masks, dtype=object), return_inverse=True
+        )
+        self.skill_ok = covers(
+            problem.skills.pack(problem.employee_skill_masks),
+            problem.skills.pack(signatures.tolist()),
+        )
+        self.signature_of_shift = signature_of_shift.reshape(-1)
+
+        # Pinned employees are candidates, eligible or not; a shift whose
+        # seats are all locked has no other candidates
+        self.locked = np.asarray(problem.locked, dtype=np.int64).reshape(-1, 2)
+        self.full = (
+            np.bincount(self.locked[:, 1], minlength=problem.num_shifts)
+            >= np.asarray(problem.shift_headcount)
+        )
+
+        # Availability weight by code, plus the employee's preference for the shift code
+        self.type_weights = np.zeros(len(AVAILABILITY_CODES), dtype=np.int32)
+        self.type_weights[AVAILABILITY_CODES[None]] = weights.neutral
+        self.type_weights[AVAILABILITY_CODES[AvailabilityType.PREFERRED]] = weights.preferred
+        self.type_weights[AVAILABILITY_CODES[AvailabilityType.NEUTRAL]] = weights.neutral
+        self.type_weights[AVAILABILITY_CODES[AvailabilityType.AVOIDED]] = weights.avoided
+
+        codes, code_idx = np.unique(np.asarray(problem.shift_codes, dtype=object), return_inverse=True)
+        code_pos = {code: i for i, code in enumerate(codes.tolist())}
+        self.code_idx = code_idx.reshape(-1)
+        self.preferences = np.zeros((problem.num_employees, len(codes)), dtype=np.int32)
+        for e_idx, prefs in enumerate(problem.employee_preferences):
+            for code, value in prefs.items():
+                pos = code_pos.get(code)
+                if pos is not None:
+                    self.preferences[e_idx, pos] = value
+
+    def evaluate(self, lo: int, hi: int) -> Eligibility:
+        """Dense matrices of shifts [lo, hi), with columns relative to lo."""
+        problem = self.problem
+        availability = np.zeros((problem.num_employees, hi - lo), dtype=np.int8)
+        for e_idx in range(problem.num_employees):
+            availability[e_idx] = problem.availability.lookup_codes(
+                e_idx, self.starts[lo:hi], self.ends[lo:hi]
+            )
+
+        matrix = self.skill_ok[self.signature_of_shift[lo:hi]].T & (availability != BLACKOUT)
+        matrix[:, self.full[lo:hi]] = False
+        in_block = (self.locked[:, 1] >= lo) & (self.locked[:, 1] < hi)
+        matrix[self.locked[in_block, 0], self.locked[in_block, 1] - lo] = True
+
+        weights = self.type_weights[availability] + self.preferences[:, self.code_idx[lo:hi]]
+        return Eligibility(matrix=matrix, availability=availability, weights=weights)
+
+
+@dataclass
+class PairTable:
+    """
+    Eligible (employee, shift) pairs as parallel arrays, ordered by shift then employee.
+
+    Built once per request and shared by constraint generation, the objective,
+    the relaxed solve and result extraction. Pairs of shift s occupy
+    [shift_ptr[s], shift_ptr[s + 1]).
+    """
+    emp: np.ndarray        # int32 employee index
+    shift: np.ndarray      # int32 shift index
+    coef: np.ndarray       # int64 objective coefficient
+    avail: np.ndarray      # int8 availability code
+    var: np.ndarray        # int32 CP-SAT variable index, -1 until a model is built
+    shift_ptr: np.ndarray  # int64 offsets, length num_shifts + 1
+
+    def __len__(self) -> int:
+        return len(self.emp)
+
+    @classmethod
+    def from_eligibility(cls, eligibility: Eligibility) -> "PairTable":
+        emp_idx, shift_idx = eligibility.pairs()
+        num_shifts = eligibility.matrix.shape[1]
+        return cls(
+            emp=emp_idx.astype(np.int32),
+            shift=shift_idx.astype(np.int32),
+            coef=eligibility.weights[emp_idx, shift_idx].astype(np.int64),
+            avail=eligibility.availability[emp_idx, shift_idx],
+            var=np.full(len(emp_idx), -1, dtype=np.int32),
+            shift_ptr=np.searchsorted(shift_idx, np.arange(num_shifts + 1)),
+        )
+
+    def subset(self, emp_idx: np.ndarray, shift_idx: np.ndarray) -> "PairTable":
+        """
+        Pairs of the given shifts, renumbered to positions in the sorted
+        emp_idx and shift_idx arrays. Every employee of those pairs must be in
+        emp_idx. Renumbering keeps the shift-then-employee order.
+        """
+        keep = np.isin(self.shift, shift_idx)
+        emp = np.searchsorted(emp_idx, self.emp[keep]).astype(np.int32)
+        shift = np.searchsorted(shift_idx, self.shift[keep]).astype(np.int32)
+        return PairTable(
+            emp=emp,
+            shift=shift,
+            coef=self.coef[keep],
+            avail=self.avail[keep],
+            var=np.full(len(emp), -1, dtype=np.int32),
+            shift_ptr=np.searchsorted(shift, np.arange(len(shift_idx) + 1)),
+        )
+
+    def shift_pairs(self, shift_idx: int) -> range:
+        """Pair indices of one shift."""
+        return range(int(self.shift_ptr[shift_idx]), int(self.shift_ptr[shift_idx + 1]))
+
+    def find(self, emp_idx: np.ndarray, shift_idx: np.ndarray) -> np.ndarray:
+        """Pair index of each (employee, shift), or -1 where the pair is not eligible."""
+        emp_idx = np.asarray(emp_idx, dtype=np.int64)
+        shift_idx = np.asarray(shift_idx, dtype=np.int64)
+        if len(self) == 0:
+            return np.full(len(emp_idx), -1, dtype=np.int64)
+        # Pairs are sorted by shift then employee, so the combined key is sorted too
+        stride = int(self.emp.max()) + 1
+        keys = self.shift.astype(np.int64) * stride + self.emp
+        wanted = shift_idx * stride + emp_idx
+        pos = np.minimum(np.searchsorted(keys, wanted), len(keys) - 1)
+        return np.where((keys[pos] == wanted) & (emp_idx < stride), pos, -1)
+
+    def group_by(self, keys: np.ndarray) -> List[np.ndarray]:
+        """Pair indices grouped by an int key per pair, in key order."""
+        order = np.argsort(keys, kind="stable")
+        bounds = np.flatnonzero(np.diff(keys[order])) + 1
+        return np.split(order, bounds) if len(order) else []
+
+    def by_employee(self, shift_start: np.ndarray) -> List[np.ndarray]:
+        """Pair indices of each employee with pairs, sorted by shift start."""
+        order = np.lexsort((shift_start[self.shift], self.emp))
+        bounds = np.flatnonzero(np.diff(self.emp[order])) + 1
+        return np.split(order, bounds) if len(order) else []
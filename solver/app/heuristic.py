@@ -0,0 +1,252 @@
+# solver/app/heuristic.py
+# Greedy matching with local repair: a roster in milliseconds, without CP-SAT
+
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .constraints import WEEK_DAYS, rest_minutes, shift_minutes
+from .eligibility import PairTable
+from .problem import ProblemData
+
+DEFAULT_MAX_PASSES = 3
+
+
+@dataclass
+class HeuristicRoster:
+    """A feasible roster: chosen pair indices in shift order and their fitness."""
+    chosen: np.ndarray
+    fitness: int
+
+
+class _Roster:
+    """
+    Assignment state with the model's hard constraints: at most
+    max_shifts_per_day shifts per employee and day, no overlapping shifts
+    or too short rests, the weekly hours cap, at most headcount employees
+    per shift.
+    """
+
+    def __init__(self, problem: ProblemData, pairs: PairTable):
+        settings = problem.settings
+        self.days = problem.shift_days
+        self.starts = problem.shift_start
+        self.ends = problem.shift_end
+        self.rest = rest_minutes(problem)
+        self.per_day = settings.max_shifts_per_day
+        self.week_cap = None
+        if settings.max_hours_per_week is not None:
+            self.week_cap = round(settings.max_hours_per_week * 60)
+            self.minutes = shift_minutes(problem).tolist()
+            self.ordinals = [date.fromisoformat(day[:10]).toordinal() for day in problem.shift_days]
+        self.emp = pairs.emp.tolist()
+        self.shift = pairs.shift.tolist()
+        self.capacity = problem.shift_headcount
+        self.holders: List[List[int]] = [[] for _ in range(problem.num_shifts)]  # pair indices filling each shift
+        self.worked: Dict[Tuple[int, str], List[int]] = {}  # (employee, day) -> shifts
+        self.held: List[List[int]] = [[] for _ in range(problem.num_employees)]
+
+    def is_full(self, s_idx: int) -> bool:
+        return len(self.holders[s_idx]) >= self.capacity[s_idx]
+
+    def holder(self, e_idx: int, s_idx: int) -> int:
+        """The pair index by which employee e_idx holds shift s_idx."""
+        return next(p for p in self.holders[s_idx] if self.emp[p] == e_idx)
+
+    def has_room(self, e_idx: int, day: str) -> bool:
+        """Whether employee e_idx works fewer than max_shifts_per_day shifts on `day`."""
+        return len(self.worked.get((e_idx, day), ())) < self.per_day
+
+    def fits(self, e_idx: int, s_idx: int, ignore: int = -1) -> bool:
+        """Whether employee e_idx can take shift s_idx, if they gave up shift `ignore`."""
+        same_day = self.worked.get((e_idx, self.days[s_idx]), ())
+        if len(same_day) - (ignore in same_day) >= self.per_day:
+            return False
+        # Widened by the rest on both sides: too short a rest counts as an overlap,
+        # and so does holding the same shift twice
+        start, end = self.starts[s_idx] - self.rest, self.ends[s_idx] + self.rest
+        if any(
+            t != ignore and self.starts[t] < end and start < self.ends[t]
+            for t in self.held[e_idx]
+        ):
+            return False
+        return self.week_cap is None or self._within_week_cap(e_idx, s_idx, ignore)
+
+    def _within_week_cap(self, e_idx: int, s_idx: int, ignore: int) -> bool:
+        day = self.ordinals[s_idx]
+        near = [
+            (self.ordinals[t], self.minutes[t]) for t in self.held[e_idx]
+            if t != ignore and abs(self.ordinals[t] - day) < WEEK_DAYS
+        ]
+        return all(
+            self.minutes[s_idx] + sum(m for d, m in near if first <= d < first + WEEK_DAYS) <= self.week_cap
+            for first in range(day - WEEK_DAYS + 1, day + 1)
+        )
+
+    def assign(self, p: int) -> None:
+        e_idx, s_idx = self.emp[p], self.shift[p]
+        self.holders[s_idx].append(p)
+        self.worked.setdefault((e_idx, self.days[s_idx]), []).append(s_idx)
+        self.held[e_idx].append(s_idx)
+
+    def unassign(self, p: int) -> None:
+        e_idx, s_idx = self.emp[p], self.shift[p]
+        self.holders[s_idx].remove(p)
+        key = (e_idx, self.days[s_idx])
+        self.worked[key].remove(s_idx)
+        if not self.worked[key]:
+            del self.worked[key]
+        self.held[e_idx].remove(s_idx)
+
+
+def solve_heuristic(
+    problem: ProblemData,
+    pairs: PairTable,
+    max_passes: int = DEFAULT_MAX_PASSES
+) -> Optional[HeuristicRoster]:
+    """
+    A feasible roster built greedily and repaired locally, or None when the
+    locked assignments conflict with each other.
+
+    Locked pairs are placed first and never moved. The remaining pairs are
+    taken in order of decreasing gain (objective coefficient plus the
+    unfilled penalty they save) whenever the employee is still free and the
+    shift has an open seat. With one shift per employee and day, each day's
+    roster is a bipartite matching, which is then improved day by day for
+    up to `max_passes` passes: an open seat is filled by moving its
+    candidate's shift to another free employee (an augmenting path of
+    length two), a shift moves to a free employee with a higher weight, and
+    two shifts swap employees when that gains.
+    """
+    penalty = problem.settings.unassigned_penalty
+    gain = (pairs.coef + penalty).tolist()
+    shift_ptr = pairs.shift_ptr.tolist()
+    roster = _Roster(problem, pairs)
+
+    fixed = [False] * len(pairs)
+    if problem.locked:
+        locked_emp, locked_shift = np.asarray(problem.locked, dtype=np.int64).T
+        for p, e_idx, s_idx in zip(
+            pairs.find(locked_emp, locked_shift).tolist(), locked_emp.tolist(), locked_shift.tolist()
+        ):
+            if p < 0 or not roster.fits(e_idx, s_idx):
+                return None
+            roster.assign(p)
+            fixed[p] = True
+
+    # Greedy: best gains first; pairs that lose against leaving the seat unfilled are skipped
+    order = np.argsort(-(pairs.coef + penalty), kind="stable")
+    for p in order[(pairs.coef + penalty)[order] > 0].tolist():
+        s_idx = roster.shift[p]
+        if not roster.is_full(s_idx) and roster.fits(roster.emp[p], s_idx):
+            roster.assign(p)
+
+    # Shifts whose seats are all locked are left out
+    shifts_by_day: Dict[str, List[int]] = defaultdict(list)
+    for s_idx, day in enumerate(problem.shift_days):
+        locked_full = roster.is_full(s_idx) and all(fixed[p] for p in roster.holders[s_idx])
+        if not locked_full and shift_ptr[s_idx] < shift_ptr[s_idx + 1]:
+            shifts_by_day[day].append(s_idx)
+
+    # Later passes revisit only the days that changed in the one before
+    days = sorted(shifts_by_day)
+    for _ in range(max_passes):
+        changed = []
+        for day in days:
+            shifts = shifts_by_day[day]
+            improved = _augment(roster, shifts, shift_ptr, gain, fixed)
+            improved |= _move(roster, shifts, shift_ptr, gain, fixed)
+            improved |= _swap(roster, shifts, shift_ptr, gain, fixed)
+            if improved:
+                changed.append(day)
+        days = changed
+
+    chosen = np.sort(np.asarray([p for held in roster.holders for p in held], dtype=np.int64))
+    unfilled = problem.num_seats - len(chosen)
+    return HeuristicRoster(chosen=chosen, fitness=int(pairs.coef[chosen].sum()) - unfilled * penalty)
+
+
+def _augment(
+    roster: _Roster,
+    shifts: List[int],
+    shift_ptr: List[int],
+    gain: List[int],
+    fixed: List[bool]
+) -> bool:
+    """Fill open seats by handing a candidate's shift of the day to another employee."""
+    improved = False
+    for s_idx in shifts:
+        day = roster.days[s_idx]
+        while not roster.is_full(s_idx):
+            best = None
+            for p in range(shift_ptr[s_idx], shift_ptr[s_idx + 1]):
+                e_idx = roster.emp[p]
+                for t in roster.worked.get((e_idx, day), ()):
+                    if not roster.fits(e_idx, s_idx, ignore=t):
+                        continue
+                    current = roster.holder(e_idx, t)
+                    if fixed[current]:
+                        continue
+                    for q in range(shift_ptr[t], shift_ptr[t + 1]):
+                        # Most candidates already work that day; rule them out before the full check
+                        if roster.has_room(roster.emp[q], day) and roster.fits(roster.emp[q], t):
+                            delta = gain[p] + gain[q] - gain[current]
+                            if delta > 0 and (best is None or delta > best[0]):
+                                best = (delta, p, current, q)
+            if best is None:
+                break
+            _, p, current, q = best
+            roster.unassign(current)
+            roster.assign(q)
+            roster.assign(p)
+            improved = True
+    return improved
+
+
+def _move(roster: _Roster, shifts: List[int], shift_ptr: List[int], gain: List[int], fixed: List[bool]) -> bool:
+    """Hand assigned shifts to free employees with a higher weight."""
+    improved = False
+    for s_idx in shifts:
+        for current in list(roster.holders[s_idx]):
+            if fixed[current]:
+                continue
+            best = current
+            for p in range(shift_ptr[s_idx], shift_ptr[s_idx + 1]):
+                if gain[p] > gain[best] and roster.fits(roster.emp[p], s_idx):
+                    best = p
+            if best != current:
+                roster.unassign(current)
+                roster.assign(best)
+                improved = True
+    return improved
+
+
+def _swap(roster: _Roster, shifts: List[int], shift_ptr: List[int], gain: List[int], fixed: List[bool]) -> bool:
+    """Swap the employees of two shifts of the same day when that gains."""
+    # [shift, pair holding it] per filled seat, updated as seats change hands
+    seats = [[s_idx, p] for s_idx in shifts for p in roster.holders[s_idx] if not fixed[p]]
+    pair_of = {
+        (roster.emp[p], s_idx): p
+        for s_idx in {s_idx for s_idx, _ in seats} for p in range(shift_ptr[s_idx], shift_ptr[s_idx + 1])
+    }
+    improved = False
+    for i, first in enumerate(seats):
+        for second in seats[i + 1:]:
+            (s1, p1), (s2, p2) = first, second
+            if s1 == s2:
+                continue
+            e1, e2 = roster.emp[p1], roster.emp[p2]
+            q1, q2 = pair_of.get((e2, s1)), pair_of.get((e1, s2))
+            if q1 is None or q2 is None or gain[q1] + gain[q2] <= gain[p1] + gain[p2]:
+                continue
+            if roster.fits(e2, s1, ignore=s2) and roster.fits(e1, s2, ignore=s1):
+                roster.unassign(p1)
+                roster.unassign(p2)
+                roster.assign(q1)
+                roster.assign(q2)
+                first[1], second[1] = q1, q2
+                improved = True
+    return improved
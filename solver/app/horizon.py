@@ -0,0 +1,161 @@
+# solver/app/horizon.py
+# Rolling-horizon windows over long date ranges
+
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, List
+
+from .constraints import WEEK_DAYS
+from .eligibility import build_pairs
+from .models import Assignment, AssignmentRef, OpenShift, OptimizeRequest, OptimizeSettings
+from .problem import ingest_request
+
+
+@dataclass
+class Window:
+    """
+    Days [start, end) solved as one model. Shifts before `commit_end` are
+    kept from this window; later ones are lookahead and solved again by the
+    next window, which starts at `commit_end`.
+    """
+    start: date
+    end: date
+    commit_end: date
+
+
+def shift_date(day: str) -> date:
+    return date.fromisoformat(day[:10])
+
+
+def _days(start: date, end: date) -> List[date]:
+    return [start + timedelta(days=i) for i in range((end - start).days)]
+
+
+def plan_windows(first: date, last: date, horizon_days: int, overlap_days: int) -> List[Window]:
+    """
+    Windows of `horizon_days` days covering [first, last), each overlapping
+    the next by `overlap_days`.
+    """
+    if not 0 <= overlap_days < horizon_days:
+        raise ValueError(
+            f"horizon_overlap_days must be between 0 and horizon_days - 1, "
+            f"got {overlap_days} with horizon_days={horizon_days}"
+        )
+    length = timedelta(days=horizon_days)
+    step = timedelta(days=horizon_days - overlap_days)
+    windows = []
+    start = first
+    while start + length < last:
+        windows.append(Window(start=start, end=start + length, commit_end=start + step))
+        start += step
+    windows.append(Window(start=start, end=last, commit_end=last))
+    return windows
+
+
+class RollingHorizon:
+    """
+    A request cut into overlapping windows of `horizon_days` days.
+
+    Shifts and assignment references are bucketed by day once, so building
+    each window's request only touches that window's days and the total
+    work grows linearly with the length of the range.
+    """
+
+    def __init__(self, request: OptimizeRequest):
+        settings = request.settings
+        self.request = request
+        self.overlap_days = settings.horizon_overlap_days
+        # Committed days before a window that its constraints reach back to
+        self.context_days = self.overlap_days
+        if settings.min_rest_hours:
+            self.context_days = max(self.context_days, 1 + int(settings.min_rest_hours // 24))
+        if settings.max_hours_per_week is not None:
+            self.context_days = max(self.context_days, WEEK_DAYS - 1)
+        self.shift_day: Dict[str, date] = {}
+        self.shifts: Dict[date, List[OpenShift]] = defaultdict(list)
+        for shift in request.open_shifts:
+            day = shift_date(shift.day)
+            self.shift_day[shift.id] = day
+            self.shifts[day].append(shift)
+
+        self.previous: Dict[date, List[AssignmentRef]] = defaultdict(list)
+        for a in request.previous_assignments:
+            if a.shift_id in self.shift_day:
+                self.previous[self.shift_day[a.shift_id]].append(a)
+        self.locked: Dict[date, List[AssignmentRef]] = defaultdict(list)
+        for a in request.locked_assignments:
+            if a.shift_id not in self.shift_day:
+                raise ValueError(f"Locked assignment references unknown shift {a.shift_id}")
+            self.locked[self.shift_day[a.shift_id]].append(a)
+        self.committed: Dict[date, List[Assignment]] = defaultdict(list)
+
+        self.windows: List[Window] = []
+        if self.shift_day:
+            first = min(self.shift_day.values())
+            last = max(self.shift_day.values()) + timedelta(days=1)
+            self.windows = plan_windows(first, last, settings.horizon_days, self.overlap_days)
+
+    def window_request(self, window: Window, settings: OptimizeSettings) -> OptimizeRequest:
+        """
+        The request restricted to one window's shifts.
+
+        Assignments already committed on the days before the window are added
+        as locked shifts, so constraints that cross the boundary see them:
+        `horizon_overlap_days` days for overnight overlaps, enough for the
+        minimum rest, and six for a weekly hours cap.
+        """
+        days = _days(window.start, window.end)
+        context_days = _days(window.start - timedelta(days=self.context_days), window.start)
+        context = [a for day in context_days for a in self.committed.get(day, [])]
+        context_shifts = {s.id: s for day in context_days for s in self.shifts.get(day, [])}
+        # A context shift has as many seats as it has committed assignments
+        seats = Counter(a.shift_id for a in context)
+        return self.request.model_copy(update={
+            "date_from": window.start.isoformat(),
+            "date_to": (window.end - timedelta(days=1)).isoformat(),
+            "open_shifts": [
+                context_shifts[shift_id].model_copy(update={"headcount": count})
+                for shift_id, count in seats.items()
+            ] + [
+                s for day in days for s in self.shifts.get(day, [])
+            ],
+            "settings": settings,
+            "previous_assignments": [a for day in days for a in self.previous.get(day, [])],
+            "locked_assignments": [
+                AssignmentRef(shift_id=a.shift_id, employee_id=a.employee_id) for a in context
+            ] + [a for day in days for a in self.locked.get(day, [])],
+        })
+
+    def count_shifts(self, start: date, end: date) -> int:
+        """Seats of the shifts on the days from start up to end."""
+        return sum(s.headcount for day in _days(start, end) for s in self.shifts.get(day, []))
+
+    def commit(self, window: Window, assignments: List[Assignment]) -> List[Assignment]:
+        """Keep a window's assignments on its committed days; returns the kept ones."""
+        kept = [
+            a for a in assignments
+            if window.start <= self.shift_day[a.shift_id] < window.commit_end
+        ]
+        for a in kept:
+            self.committed[self.shift_day[a.shift_id]].append(a)
+        return kept
+
+    def committed_fitness(self, window: Window, kept: List[Assignment]) -> int:
+        """
+        Objective value of the kept assignments over the window's committed
+        days, with the same weights and unfilled penalty as the solver.
+        """
+        sub = self.request.model_copy(update={
+            "open_shifts": [s for day in _days(window.start, window.commit_end) for s in self.shifts.get(day, [])],
+            "previous_assignments": [],
+            # Locked so that pairs exist even for pinned, otherwise ineligible assignments
+            "locked_assignments": [
+                AssignmentRef(shift_id=a.shift_id, employee_id=a.employee_id) for a in kept
+            ],
+        })
+        problem = ingest_request(sub)
+        pairs = build_pairs(problem, problem.settings.weights)
+        chosen = [pairs.find(e_idx, s_idx) for e_idx, s_idx in problem.locked]
+        unfilled = problem.num_seats - len(chosen)
+        return int(pairs.coef[chosen].sum()) - unfilled * problem.settings.unassigned_penalty
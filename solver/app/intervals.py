@@ -0,0 +1,41 @@
+# solver/app/intervals.py
+# Sweep-line helpers over shift intervals in epoch minutes
+
+import heapq
+from typing import List, Sequence, Tuple
+
+
+def overlap_cliques(
+    shifts: Sequence[int],
+    starts: Sequence[int],
+    ends: Sequence[int]
+) -> List[List[int]]:
+    """
+    Maximal groups of mutually overlapping shifts, found with one sweep.
+
+    `shifts` are indices into `starts`/`ends` and must be sorted by start.
+    Intervals are half-open, so a shift ending at 13:00 does not overlap one
+    starting at 13:00. Every overlapping pair ends up in at least one group,
+    so one AtMostOne per group replaces all pairwise constraints. Groups with
+    a single shift are omitted.
+    """
+    cliques: List[List[int]] = []
+    active: List[Tuple[int, int]] = []  # min-heap of (end, shift)
+    grown = False
+
+    for shift in shifts:
+        start = starts[shift]
+        if active and active[0][0] <= start:
+            # The active set is maximal right before its first shift ends
+            if grown and len(active) > 1:
+                cliques.append([s for _, s in active])
+            grown = False
+            while active and active[0][0] <= start:
+                heapq.heappop(active)
+        heapq.heappush(active, (ends[shift], shift))
+        grown = True
+
+    if grown and len(active) > 1:
+        cliques.append([s for _, s in active])
+
+    return cliques
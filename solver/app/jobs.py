@@ -0,0 +1,329 @@
+# solver/app/jobs.py
+# Background solve jobs on a bounded process pool
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from .cache import get_cache
+from .metrics import observe_result, observe_solve
+from .models import JobResponse, JobStatus, OptimizeRequest, OptimizeResponse, OptimizeStatus
+
+if TYPE_CHECKING:
+    from .optimize import OptimizationResult
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_WORKERS = os.cpu_count() or 1
+DEFAULT_QUEUE_SIZE = 32
+DEFAULT_RESULT_TTL_SECONDS = 3600
+
+# Per-slot state shared with the worker processes
+SLOT_IDLE = 0
+SLOT_RUNNING = 1
+SLOT_CANCELLED = 2
+
+FINISHED = (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+
+class QueueFullError(Exception):
+    """Raised when every job slot is taken."""
+
+
+class JobFinishedError(Exception):
+    """Raised when cancelling a job that already completed or failed."""
+
+
+# Worker-process state, set by the pool initializer: the synchronized slot
+# states and the raw array of slot start times
+_slot_states: Any = None
+_slot_started: Any = None
+
+
+def _init_worker(slot_states: Any, slot_started: Any) -> None:
+    global _slot_states, _slot_started
+    _slot_states = slot_states
+    _slot_started = slot_started
+    # Load OR-Tools while the worker is idle rather than in its first job
+    from . import optimize  # noqa: F401
+
+
+def _run_job(request: OptimizeRequest, slot: int) -> Optional["OptimizationResult"]:
+    """
+    Pool entry point: solve one request in a worker process.
+
+    Returns None without solving if the job was cancelled while queued. A
+    cancel that arrives mid-solve stops the search through should_stop.
+    OR-Tools is imported here, in the worker, rather than with this module.
+    """
+    with _slot_states.get_lock():
+        if _slot_states[slot] == SLOT_CANCELLED:
+            return None
+        _slot_states[slot] = SLOT_RUNNING
+        _slot_started[slot] = time.time()
+
+    from .optimize import run_optimization
+    return run_optimization(
+        request,
+        should_stop=lambda: _slot_states[slot] == SLOT_CANCELLED,
+        cache=get_cache()
+    )
+
+
+def _timestamp(seconds: float) -> str:
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).isoformat()
+
+
+@dataclass
+class Job:
+    """Bookkeeping for one submitted solve."""
+    job_id: str
+    team_id: str
+    slot: int
+    future: Future
+    submitted_at: float
+    status: JobStatus = JobStatus.QUEUED
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[OptimizeResponse] = None
+    error: Optional[str] = None
+    # Set once the job's slot is released
+    done: threading.Event = field(default_factory=threading.Event)
+
+
+class JobManager:
+    """
+    Runs optimization requests on a process pool with a bounded queue.
+
+    At most `max_workers + queue_size` jobs are in flight at once; each holds
+    one slot in shared memory through which it reports that it started and
+    receives cancellation. Finished jobs are kept for `result_ttl_seconds` so
+    clients can collect the result.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_POOL_WORKERS,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        result_ttl_seconds: float = DEFAULT_RESULT_TTL_SECONDS
+    ):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if queue_size < 0:
+            raise ValueError("queue_size must not be negative")
+
+        # Spawn, not fork: the parent runs uvicorn threads that must not be
+        # duplicated into the workers
+        context = multiprocessing.get_context("spawn")
+        num_slots = max_workers + queue_size
+        self._slot_states = context.Array("b", num_slots)
+        self._slot_started = context.Array("d", num_slots, lock=False)
+        self._free_slots: List[int] = list(range(num_slots))
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self._slot_states, self._slot_started),
+        )
+        self._jobs: Dict[str, Job] = {}
+        # Reentrant: Future.cancel() runs done callbacks in the calling thread
+        self._lock = threading.RLock()
+        self.max_workers = max_workers
+        self.queue_size = queue_size
+        self.result_ttl_seconds = result_ttl_seconds
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        """The worker pool, for work that takes no job slot, such as batch items."""
+        return self._executor
+
+    def submit(self, request: OptimizeRequest) -> JobResponse:
+        """Queue a request; raises QueueFullError when no slot is free."""
+        with self._lock:
+            self._purge_expired()
+            if not self._free_slots:
+                raise QueueFullError(
+                    f"Solver queue is full ({self.max_workers} running, {self.queue_size} queued)"
+                )
+            slot = self._free_slots.pop()
+
+            job_id = uuid.uuid4().hex
+            future = self._executor.submit(_run_job, request, slot)
+            job = Job(
+                job_id=job_id,
+                team_id=request.team_id,
+                slot=slot,
+                future=future,
+                submitted_at=time.time(),
+            )
+            self._jobs[job_id] = job
+
+        logger.info(
+            f"Job {job_id} queued: team={request.team_id}, "
+            f"employees={len(request.employees)}, shifts={len(request.open_shifts)}"
+        )
+        future.add_done_callback(lambda f: self._finish(job, f))
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> JobResponse:
+        """Current state of a job; raises KeyError if it is unknown or expired."""
+        with self._lock:
+            self._purge_expired()
+            job = self._jobs[job_id]
+            if job.status == JobStatus.QUEUED and self._slot_states[job.slot] == SLOT_RUNNING:
+                job.status = JobStatus.RUNNING
+                job.started_at = self._slot_started[job.slot]
+            return self._describe(job)
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> JobResponse:
+        """
+        Block until a job has finished and released its slot.
+
+        A cancelled job that was already running keeps its slot until its
+        worker stops, so this can return after the cancellation itself.
+        Raises KeyError for an unknown job and TimeoutError if it is still
+        in flight after `timeout` seconds.
+        """
+        with self._lock:
+            job = self._jobs[job_id]
+        if not job.done.wait(timeout):
+            raise TimeoutError(f"Job {job_id} still {job.status.value.lower()} after {timeout}s")
+        with self._lock:
+            return self._describe(job)
+
+    def cancel(self, job_id: str) -> JobResponse:
+        """
+        Cancel a queued or running job.
+
+        A running solve is stopped at its next poll. Raises KeyError for an
+        unknown job and JobFinishedError if it already completed or failed.
+        """
+        with self._lock:
+            job = self._jobs[job_id]
+            if job.status in (JobStatus.COMPLETED, JobStatus.FAILED):
+                raise JobFinishedError(f"Job {job_id} already {job.status.value.lower()}")
+            if job.status != JobStatus.CANCELLED:
+                with self._slot_states.get_lock():
+                    self._slot_states[job.slot] = SLOT_CANCELLED
+                job.status = JobStatus.CANCELLED
+                job.finished_at = time.time()
+                job.future.cancel()
+                logger.info(f"Job {job_id} cancelled")
+            return self._describe(job)
+
+    def counts(self) -> Dict[str, int]:
+        """Jobs waiting for a worker and jobs being solved."""
+        with self._lock:
+            active = [job for job in self._jobs.values() if job.status not in FINISHED]
+            running = sum(self._slot_states[job.slot] == SLOT_RUNNING for job in active)
+        return {"queued": len(active) - running, "running": running}
+
+    def shutdown(self) -> None:
+        """Stop running solves, drop queued ones and wait for the workers to exit."""
+        with self._lock:
+            for job in self._jobs.values():
+                if job.status not in FINISHED:
+                    self._slot_states[job.slot] = SLOT_CANCELLED
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def _finish(self, job: Job, future: Future) -> None:
+        """Done callback: record the outcome and release the job's slot."""
+        from .optimize import build_response
+        with self._lock:
+            if job.status not in FINISHED:
+                job.finished_at = time.time()
+                if job.started_at is None and self._slot_states[job.slot] == SLOT_RUNNING:
+                    job.started_at = self._slot_started[job.slot]
+                if future.cancelled():
+                    job.status = JobStatus.CANCELLED
+                elif future.exception() is not None:
+                    job.status = JobStatus.FAILED
+                    job.error = str(future.exception())
+                    logger.error(f"Job {job.job_id} failed: {job.error}")
+                    observe_solve(OptimizeStatus.ERROR, None)
+                else:
+                    job.status = JobStatus.COMPLETED
+                    job.result = build_response(future.result())
+                    observe_result(future.result())
+                    logger.info(
+                        f"Job {job.job_id} complete: status={job.result.status}, "
+                        f"fitness={job.result.fitness}"
+                    )
+            self._slot_states[job.slot] = SLOT_IDLE
+            self._free_slots.append(job.slot)
+        job.done.set()
+
+    def _purge_expired(self) -> None:
+        cutoff = time.time() - self.result_ttl_seconds
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff and job.future.done()
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _describe(self, job: Job) -> JobResponse:
+        return JobResponse(
+            job_id=job.job_id,
+            status=job.status,
+            team_id=job.team_id,
+            submitted_at=_timestamp(job.submitted_at),
+            started_at=_timestamp(job.started_at) if job.started_at is not None else None,
+            finished_at=_timestamp(job.finished_at) if job.finished_at is not None else None,
+            result=job.result,
+            error=job.error,
+        )
+
+
+_manager: Optional[JobManager] = None
+_manager_lock = threading.Lock()
+
+
+def job_pool_workers() -> int:
+    """
+    Job pool processes: SOLVER_POOL_WORKERS (default: CPU count) is the budget
+    of solver processes for the service, less those the component pool takes
+    (decompose.component_pool_workers), but at least one.
+    """
+    from .decompose import component_pool_workers
+    budget = int(os.getenv("SOLVER_POOL_WORKERS", DEFAULT_POOL_WORKERS))
+    return max(1, budget - component_pool_workers())
+
+
+def get_job_manager() -> JobManager:
+    """Process-wide JobManager, created on first use from the environment."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager(
+                max_workers=job_pool_workers(),
+                queue_size=int(os.getenv("SOLVER_QUEUE_SIZE", DEFAULT_QUEUE_SIZE)),
+                result_ttl_seconds=float(os.getenv("SOLVER_JOB_TTL_SECONDS", DEFAULT_RESULT_TTL_SECONDS)),
+            )
+            logger.info(
+                f"Job pool started: workers={_manager.max_workers}, queue={_manager.queue_size}"
+            )
+        return _manager
+
+
+def job_counts() -> Optional[Dict[str, int]]:
+    """JobManager.counts() of the process-wide manager; None before it starts."""
+    with _manager_lock:
+        manager = _manager
+    return manager.counts() if manager is not None else None
+
+
+def shutdown_job_manager() -> None:
+    """Shut down the process-wide JobManager if one was started."""
+    global _manager
+    with _manager_lock:
+        if _manager is not None:
+            _manager.shutdown()
+            _manager = None
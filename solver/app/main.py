@@ -1,17 +1,63 @@
 # solver/app/main.py
 # FastAPI entry point for the OR-Tools constraint solver service
 
-import os
+import asyncio
 import logging
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import List, Dict, Optional, Any
-from enum import Enum
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime
+from typing import Any, Dict, Type, TypeVar, Union
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, ValidationError
+
+from . import IMPORT_STARTED
+from .cache import get_cache
+from .codec import (
+    JSON,
+    MSGPACK,
+    UnsupportedMediaError,
+    decode_body,
+    encode_response,
+    negotiate,
+    response_data,
+)
+from .jobs import (
+    JobFinishedError,
+    QueueFullError,
+    get_job_manager,
+    job_counts,
+    shutdown_job_manager,
+)
+from .metrics import (
+    IN_FLIGHT,
+    REGISTRY,
+    STARTUP_SECONDS,
+    observe_cache,
+    observe_jobs,
+    observe_result,
+    observe_solve,
+)
+from .models import (
+    BatchRequest,
+    ColumnarRequest,
+    JobResponse,
+    OptimizeRequest,
+    OptimizeResponse,
+    OptimizeStatus,
+    StreamEvent,
+)
+from .warmup import get_readiness
 
-from .optimize import run_optimization, OptimizationResult
-from .models import OptimizeRequest, OptimizeResponse
+# OR-Tools is loaded by the first solve or the warm-up, not here, so /health
+# answers as soon as the server is up. The solver modules are imported where
+# they are used: optimize, batch and decompose.
 
 # Configure logging
 log_level = os.getenv("LOG_LEVEL", "info").upper()
@@ -21,11 +67,26 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up off the event loop: /health answers meanwhile, /ready after
+    threading.Thread(target=get_readiness().warm_up, name="solver-warmup", daemon=True).start()
+    yield
+    # Stop the job and component pools' worker processes, if they were started
+    from .decompose import shutdown_component_pool
+    shutdown_job_manager()
+    shutdown_component_pool()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Samay Solver",
     description="OR-Tools CP-SAT constraint solver for workforce scheduling",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS configuration
@@ -49,41 +110,252 @@ def health_check():
     }
 
 
-@app.post("/optimize", response_model=OptimizeResponse)
-def optimize(request: OptimizeRequest) -> OptimizeResponse:
+@app.get("/ready")
+def readiness_check() -> JSONResponse:
     """
-    Run constraint-based optimization to assign employees to shifts.
-    
-    Uses Google OR-Tools CP-SAT solver with:
-    - Hard constraints: skills, blackouts, max shifts per day
-    - Soft constraints: preferences, availability types
-    - Objective: maximize preference satisfaction, minimize unassigned shifts
+    Readiness endpoint for container orchestration: 503 until the warm-up
+    solve has finished, so new replicas get traffic only once they solve at
+    full speed. Unlike /health, stays 503 if the warm-up fails.
     """
+    readiness = get_readiness()
+    return JSONResponse(
+        status_code=200 if readiness.ready else 503,
+        content={
+            "status": readiness.state,
+            "warmup_seconds": readiness.warmup_seconds,
+            "error": readiness.error,
+        },
+    )
+
+
+def _body_schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    openapi_extra for a body read by hand: the model's schema for every
+    accepted media type. Nested models are referenced from components, where
+    the endpoints taking OptimizeRequest already put them.
+    """
+    schema = model.model_json_schema(ref_template="#/components/schemas/{model}")
+    schema.pop("$defs", None)
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {media_type: {"schema": schema} for media_type in (JSON, MSGPACK)},
+        }
+    }
+
+
+async def _read_request(http_request: Request, model: Type[ModelT]) -> ModelT:
+    """Decode and validate a JSON or msgpack body, compressed or not."""
+    headers = http_request.headers
+    try:
+        data = decode_body(await http_request.body(), headers.get("content-type"), headers.get("content-encoding"))
+        return model.model_validate(data)
+    except UnsupportedMediaError as e:
+        raise HTTPException(status_code=415, detail=str(e)) from e
+    except ValidationError as e:
+        raise RequestValidationError(e.errors()) from e
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Malformed request body: {e}") from e
+
+
+async def _optimize(
+    http_request: Request,
+    request: Union[OptimizeRequest, ColumnarRequest],
+    num_employees: int,
+    num_shifts: int
+) -> Response:
+    """Solve off the event loop and encode the response as the client accepts."""
+    from .decompose import get_component_pool
+    from .optimize import build_response, run_optimization
     logger.info(
         f"Optimization request: team={request.team_id}, "
-        f"employees={len(request.employees)}, shifts={len(request.open_shifts)}"
+        f"employees={num_employees}, shifts={num_shifts}"
     )
     
+    IN_FLIGHT.inc(source="request")
     try:
-        result = run_optimization(request)
+        result = await run_in_threadpool(
+            run_optimization, request, cache=get_cache(), component_pool=get_component_pool()
+        )
+        observe_result(result)
         
         logger.info(
             f"Optimization complete: status={result.status}, "
             f"fitness={result.fitness}, assigned={len(result.assignments)}"
         )
         
-        return OptimizeResponse(
-            status=result.status,
-            assignments=result.assignments,
-            fitness=result.fitness,
-            diagnostics=result.diagnostics,
-            suggestions=result.suggestions,
-            relaxed_solution=result.relaxed_solution
-        )
+        headers = http_request.headers
+        media_type, encoding = negotiate(headers.get("accept"), headers.get("accept-encoding"))
+        return encode_response(response_data(build_response(result)), media_type, encoding)
         
+    except ValueError as e:
+        # Ids or settings the request cannot be solved with, e.g. a lock on an unknown shift
+        logger.warning(f"Optimization rejected: {e}")
+        raise HTTPException(status_code=400, detail=str(e)) from e
     except Exception as e:
         logger.exception("Optimization failed")
-        raise HTTPException(status_code=500, detail=str(e))
+        observe_solve(OptimizeStatus.ERROR, None)
+        raise HTTPException(status_code=500, detail=str(e)) from e
+    finally:
+        IN_FLIGHT.dec(source="request")
+
+
+@app.post("/optimize", response_model=OptimizeResponse, openapi_extra=_body_schema(OptimizeRequest))
+async def optimize(http_request: Request) -> Response:
+    """
+    Run constraint-based optimization to assign employees to shifts.
+    
+    Uses Google OR-Tools CP-SAT solver with:
+    - Hard constraints: skills, blackouts, max shifts per day
+    - Soft constraints: preferences, availability types
+    - Objective: maximize preference satisfaction, minimize unassigned shifts
+    
+    Bodies may be JSON or msgpack (Content-Type), gzip or zstd compressed
+    (Content-Encoding); the response follows Accept and Accept-Encoding.
+    """
+    request = await _read_request(http_request, OptimizeRequest)
+    return await _optimize(http_request, request, len(request.employees), len(request.open_shifts))
+
+
+@app.post("/optimize/columnar", response_model=OptimizeResponse, openapi_extra=_body_schema(ColumnarRequest))
+async def optimize_columnar(http_request: Request) -> Response:
+    """
+    Same as /optimize for a ColumnarRequest: string tables and parallel
+    integer columns, read into the solver without per-item models.
+    """
+    request = await _read_request(http_request, ColumnarRequest)
+    return await _optimize(http_request, request, len(request.employee_ids), len(request.shift_ids))
+
+
+@app.post("/optimize/stream")
+async def optimize_stream(request: OptimizeRequest) -> StreamingResponse:
+    """
+    Run optimization and stream progress as newline-delimited JSON.
+    
+    Emits one StreamEvent per line: an "incumbent" for each improving solution
+    found during the search, then a final "result" (or "error"). Closing the
+    connection early, e.g. to accept the current incumbent, stops the search.
+    """
+    from .optimize import build_response, run_optimization
+    logger.info(
+        f"Streaming optimization request: team={request.team_id}, "
+        f"employees={len(request.employees)}, shifts={len(request.open_shifts)}"
+    )
+    
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+    stop = threading.Event()
+    
+    def publish(event: StreamEvent) -> None:
+        # Called from the solver thread
+        if not stop.is_set():
+            loop.call_soon_threadsafe(events.put_nowait, event)
+    
+    def solve() -> None:
+        IN_FLIGHT.inc(source="stream")
+        try:
+            result = run_optimization(
+                request,
+                should_stop=stop.is_set,
+                on_solution=lambda incumbent: publish(StreamEvent(type="incumbent", incumbent=incumbent)),
+                cache=get_cache()
+            )
+            observe_result(result)
+            publish(StreamEvent(type="result", result=build_response(result)))
+        except Exception as e:
+            logger.exception("Streaming optimization failed")
+            observe_solve(OptimizeStatus.ERROR, None)
+            publish(StreamEvent(type="error", detail=str(e)))
+        finally:
+            IN_FLIGHT.dec(source="stream")
+    
+    async def stream():
+        loop.run_in_executor(None, solve)
+        try:
+            while True:
+                event = await events.get()
+                yield event.model_dump_json() + "\n"
+                if event.type != "incumbent":
+                    return
+        finally:
+            # Also reached when the client disconnects mid-search
+            stop.set()
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@app.post("/optimize/batch")
+def optimize_batch(batch: BatchRequest) -> StreamingResponse:
+    """
+    Solve many requests on the solver process pool in one call.
+    
+    Streams a JSON array of BatchItem objects in completion order, each
+    with the index of its request. A request that is invalid or fails
+    becomes an "error" item; the rest of the batch carries on.
+    """
+    from .batch import run_batch
+    logger.info(f"Batch optimization request: {len(batch.requests)} requests, timeout={batch.timeout_seconds}")
+    manager = get_job_manager()
+    
+    def stream():
+        yield "["
+        items = run_batch(batch.requests, batch.timeout_seconds, manager.executor, manager.max_workers)
+        for i, item in enumerate(items):
+            yield ("," if i else "") + item.model_dump_json()
+        yield "]"
+    
+    return StreamingResponse(stream(), media_type="application/json")
+
+
+@app.post("/jobs", response_model=JobResponse, status_code=202)
+def submit_job(request: OptimizeRequest) -> JobResponse:
+    """
+    Queue an optimization on the solver process pool and return its job id.
+    
+    Responds 503 when the pool's queue is full; retry later.
+    """
+    try:
+        return get_job_manager().submit(request)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"}) from e
+
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+def get_job(job_id: str) -> JobResponse:
+    """Job status, with the optimization result once it has completed."""
+    try:
+        return get_job_manager().get(job_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found") from None
+
+
+@app.delete("/jobs/{job_id}", response_model=JobResponse)
+def cancel_job(job_id: str) -> JobResponse:
+    """Cancel a queued or running job."""
+    try:
+        return get_job_manager().cancel(job_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found") from None
+    except JobFinishedError as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    """Hit/miss counters and sizes of this process's result and model caches."""
+    return get_cache().stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    """
+    Solve counts by status, phase time and size histograms, in-flight solves,
+    job queue depth and cache counters of this process, in the Prometheus
+    text format.
+    """
+    observe_cache(get_cache().stats())
+    observe_jobs(job_counts())
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
 
 
 @app.get("/")
@@ -94,7 +366,17 @@ def root():
         "description": "Workforce scheduling optimization using OR-Tools CP-SAT",
         "endpoints": {
             "/health": "Health check",
-            "/optimize": "POST - Run optimization"
+            "/ready": "Readiness, once the warm-up solve has finished",
+            "/optimize": "POST - Run optimization",
+            "/optimize/columnar": "POST - Run optimization on a columnar request",
+            "/optimize/stream": "POST - Run optimization, streaming improving solutions as NDJSON",
+            "/optimize/batch": "POST - Run many optimizations, streaming results as a JSON array",
+            "/cache/stats": "Result and model cache counters",
+            "/metrics": "Prometheus metrics",
+            "/jobs": "POST - Queue optimization, returns job id",
+            "/jobs/{job_id}": "GET - Job status and result, DELETE - Cancel job"
         }
     }
 
+
+STARTUP_SECONDS.set(time.perf_counter() - IMPORT_STARTED, phase="import")
@@ -0,0 +1,224 @@
+# solver/app/metrics.py
+# In-process metrics in the Prometheus text exposition format
+
+import threading
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+from .models import OptimizeStatus
+
+if TYPE_CHECKING:
+    # Annotations only: importing optimize would load OR-Tools with the metrics
+    from .optimize import OptimizationResult, SolveStats
+
+# Seconds: a fast-mode roster takes milliseconds, a full solve up to its timeout
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+# Counts of employees, shifts, variables or constraints
+SIZE_BUCKETS = (10, 30, 100, 300, 1000, 3000, 10000, 30000, 100000, 300000, 1000000)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    """A metric family: one value per combination of label values."""
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[LabelValues, float] = {}
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in values]
+
+
+class Counter(_Metric):
+    """Monotonic total; set() mirrors a counter kept elsewhere, such as the cache's."""
+    kind = "counter"
+
+
+class Gauge(_Metric):
+    """Current value that can go up and down."""
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Observations counted into cumulative `le` buckets, with their sum and count."""
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Sequence[float],
+        labelnames: Sequence[str] = ()
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        self._histograms: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            # Per-bucket counts, then sum and count
+            counts = self._histograms.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            counts[-2] += value
+            counts[-1] += 1
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            histograms = sorted((key, list(counts)) for key, counts in self._histograms.items())
+        lines = []
+        for key, counts in histograms:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {_format_value(cumulative)}")
+            le = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {_format_value(counts[-1])}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(counts[-2])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(counts[-1])}")
+        return lines
+
+
+M = TypeVar("M", bound=_Metric)
+
+
+class Registry:
+    """Metric families of this process, rendered together."""
+
+    def __init__(self) -> None:
+        self.metrics: List[_Metric] = []
+
+    def register(self, metric: M) -> M:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+SOLVES = REGISTRY.register(Counter(
+    "solver_solves_total", "Finished optimization requests by status", ["status", "cached"]
+))
+BUILD_SECONDS = REGISTRY.register(Histogram(
+    "solver_build_seconds", "Ingestion, eligibility, model and greedy roster build time", TIME_BUCKETS
+))
+SOLVE_SECONDS = REGISTRY.register(Histogram(
+    "solver_solve_seconds", "CP-SAT search time, with unsat core and relaxed solves", TIME_BUCKETS
+))
+EXTRACT_SECONDS = REGISTRY.register(Histogram(
+    "solver_extract_seconds", "Time reading assignments back from the solution", TIME_BUCKETS
+))
+REQUEST_EMPLOYEES = REGISTRY.register(Histogram(
+    "solver_request_employees", "Employees per request", SIZE_BUCKETS
+))
+REQUEST_SHIFTS = REGISTRY.register(Histogram(
+    "solver_request_shifts", "Open shifts per request", SIZE_BUCKETS
+))
+MODEL_VARIABLES = REGISTRY.register(Histogram(
+    "solver_model_variables", "CP-SAT variables per request, summed over parts", SIZE_BUCKETS
+))
+MODEL_CONSTRAINTS = REGISTRY.register(Histogram(
+    "solver_model_constraints", "CP-SAT constraints per request, summed over parts", SIZE_BUCKETS
+))
+IN_FLIGHT = REGISTRY.register(Gauge(
+    "solver_solves_in_flight", "Solves running in this process or submitted to the pool", ["source"]
+))
+JOBS = REGISTRY.register(Gauge(
+    "solver_jobs", "Jobs holding a pool slot, by state", ["state"]
+))
+CACHE_HITS = REGISTRY.register(Counter(
+    "solver_cache_hits_total", "Cache hits of this process by tier", ["tier"]
+))
+CACHE_MISSES = REGISTRY.register(Counter(
+    "solver_cache_misses_total", "Cache misses of this process by tier", ["tier"]
+))
+CACHE_ENTRIES = REGISTRY.register(Gauge(
+    "solver_cache_entries", "Entries in this process's in-memory cache tiers", ["tier"]
+))
+STARTUP_SECONDS = REGISTRY.register(Gauge(
+    "solver_startup_seconds", "Service module import and warm-up solve time of this process", ["phase"]
+))
+READY = REGISTRY.register(Gauge(
+    "solver_ready", "1 once this process's warm-up solve has finished"
+))
+
+
+def observe_solve(status: OptimizeStatus, stats: Optional["SolveStats"], cached: bool = False) -> None:
+    """Record a finished request; cached results and failures have no phase timings."""
+    SOLVES.inc(status=status.value, cached=str(cached).lower())
+    if stats is None or cached:
+        return
+    BUILD_SECONDS.observe(stats.build_seconds)
+    SOLVE_SECONDS.observe(stats.solve_seconds)
+    EXTRACT_SECONDS.observe(stats.extract_seconds)
+    REQUEST_EMPLOYEES.observe(stats.employees)
+    REQUEST_SHIFTS.observe(stats.shifts)
+    if stats.variables:
+        # Fast mode builds no model
+        MODEL_VARIABLES.observe(stats.variables)
+        MODEL_CONSTRAINTS.observe(stats.constraints)
+
+
+def observe_result(result: "OptimizationResult") -> None:
+    observe_solve(result.status, result.stats, result.diagnostics.cached)
+
+
+def observe_cache(stats: Dict[str, Dict]) -> None:
+    """Mirror SolverCache.stats() into the cache metrics."""
+    for tier, tier_stats in stats.items():
+        CACHE_HITS.set(tier_stats["hits"], tier=tier)
+        CACHE_MISSES.set(tier_stats["misses"], tier=tier)
+        if "entries" in tier_stats:
+            CACHE_ENTRIES.set(tier_stats["entries"], tier=tier)
+
+
+def observe_jobs(counts: Optional[Dict[str, int]]) -> None:
+    """Queued and running jobs, all zero before the job pool starts."""
+    for state in ("queued", "running"):
+        JOBS.set((counts or {}).get(state, 0), state=state)
@@ -0,0 +1,127 @@
+# solver/app/model_builder.py
+# Bulk CP-SAT model construction from precomputed index and coefficient arrays
+
+from typing import Optional, Sequence
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+
+def new_bool_vars(model: cp_model.CpModel, count: int) -> np.ndarray:
+    """Append `count` Boolean variables to the model; returns their indices."""
+    variables = model.Proto().variables
+    first = len(variables)
+    for _ in range(count):
+        variables.add().domain.extend((0, 1))
+    return np.arange(first, first + count, dtype=np.int32)
+
+
+def new_int_vars(model: cp_model.CpModel, upper_bounds: np.ndarray) -> np.ndarray:
+    """Append integer variables with domains [0, bound], one per bound; returns their indices."""
+    variables = model.Proto().variables
+    first = len(variables)
+    for bound in upper_bounds.tolist():
+        variables.add().domain.extend((0, bound))
+    return np.arange(first, first + len(upper_bounds), dtype=np.int32)
+
+
+def add_exactly_one(model: cp_model.CpModel, literals: Sequence[int]) -> None:
+    """Exactly one of the given Boolean variable indices is true."""
+    model.Proto().constraints.add().exactly_one.literals.extend(literals)
+
+
+def add_at_most_one(model: cp_model.CpModel, literals: Sequence[int]) -> None:
+    """At most one of the given Boolean variable indices is true."""
+    model.Proto().constraints.add().at_most_one.literals.extend(literals)
+
+
+def add_linear(
+    model: cp_model.CpModel,
+    variables: Sequence[int],
+    coeffs: Sequence[int],
+    lower: int,
+    upper: int,
+    enforcement: Optional[int] = None
+) -> None:
+    """lower <= sum(coeffs * variables) <= upper, whenever `enforcement` is true if given."""
+    constraint = model.Proto().constraints.add()
+    if enforcement is not None:
+        constraint.enforcement_literal.append(enforcement)
+    constraint.linear.vars.extend(variables)
+    constraint.linear.coeffs.extend(coeffs)
+    constraint.linear.domain.extend((lower, upper))
+
+
+def add_implications(model: cp_model.CpModel, conditions: np.ndarray, literals: np.ndarray) -> None:
+    """Each condition variable implies the literal at the same position."""
+    constraints = model.Proto().constraints
+    for condition, literal in zip(conditions.tolist(), literals.tolist()):
+        constraint = constraints.add()
+        constraint.enforcement_literal.append(condition)
+        constraint.bool_and.literals.append(literal)
+
+
+def set_objective(
+    model: cp_model.CpModel,
+    variables: np.ndarray,
+    coeffs: np.ndarray,
+    maximize: bool
+) -> None:
+    """
+    Set the objective to the weighted sum of variables, replacing any previous one.
+
+    CP-SAT objectives are minimized; a maximization is stored with negated
+    coefficients and a scaling factor of -1, as CpModel.Maximize does.
+    """
+    proto = model.Proto()
+    proto.ClearField("objective")
+    proto.ClearField("floating_point_objective")
+
+    keep = coeffs != 0
+    objective = proto.objective
+    objective.vars.extend(variables[keep].tolist())
+    if maximize:
+        objective.coeffs.extend((-coeffs[keep]).tolist())
+        objective.scaling_factor = -1
+    else:
+        objective.coeffs.extend(coeffs[keep].tolist())
+
+
+def fix_vars(model: cp_model.CpModel, variables: np.ndarray, value: int) -> None:
+    """Restrict the given variables to a single value."""
+    proto_vars = model.Proto().variables
+    for var in variables.tolist():
+        domain = proto_vars[var].domain
+        del domain[:]
+        domain.extend((value, value))
+
+
+def free_bool_vars(model: cp_model.CpModel, variables: np.ndarray) -> None:
+    """Give the given variables back their full Boolean domain."""
+    proto_vars = model.Proto().variables
+    for var in variables.tolist():
+        domain = proto_vars[var].domain
+        del domain[:]
+        domain.extend((0, 1))
+
+
+def set_assumptions(model: cp_model.CpModel, literals: Sequence[int]) -> None:
+    """
+    Replace the model's assumptions with the given literal indices.
+
+    CpModel.AddAssumptions reads plain ints as constants, not indices.
+    """
+    assumptions = model.Proto().assumptions
+    del assumptions[:]
+    assumptions.extend(literals)
+
+
+def add_hints(model: cp_model.CpModel, variables: np.ndarray, values: np.ndarray) -> None:
+    """Append solution hints for the given variables."""
+    if len(variables) == 0:
+        # Even an empty solution_hint message is kept in the proto, and CP-SAT
+        # then spends time on hint handling: about 2x on a 100x1400 roster
+        return
+    hint = model.Proto().solution_hint
+    hint.vars.extend(variables.tolist())
+    hint.values.extend(values.tolist())
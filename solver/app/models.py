@@ -1,7 +1,7 @@
 # solver/app/models.py
 # Pydantic models for solver request/response
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator, model_validator
 from typing import List, Dict, Optional, Any
 from enum import Enum
 
@@ -22,6 +22,19 @@ class OptimizeStatus(str, Enum):
     ERROR = "ERROR"
 
 
+class SolveMode(str, Enum):
+    EXACT = "exact"
+    FAST = "fast"
+
+
+class JobStatus(str, Enum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+    CANCELLED = "CANCELLED"
+
+
 class AvailabilityWindow(BaseModel):
     start: str
     end: str
@@ -43,6 +56,13 @@ class OpenShift(BaseModel):
     duration_hours: float
     start_time: Optional[str] = None
     end_time: Optional[str] = None
+    # Employees the shift needs; each filled seat is one Assignment with this shift's id
+    headcount: int = Field(default=1, ge=1)
+
+
+class AssignmentRef(BaseModel):
+    shift_id: str
+    employee_id: str
 
 
 class OptimizeWeights(BaseModel):
@@ -53,18 +73,170 @@ class OptimizeWeights(BaseModel):
 
 class OptimizeSettings(BaseModel):
     unassigned_penalty: int = 100
-    max_shifts_per_day: int = 1
+    max_shifts_per_day: int = Field(default=1, ge=1)
+    # Cap on an employee's duration_hours in any 7 consecutive days, by shift day
+    max_hours_per_week: Optional[float] = Field(default=None, gt=0)
+    # Least hours between the end of an employee's shift and the start of their next
+    min_rest_hours: float = Field(default=0, ge=0)
     timeout_seconds: int = 30
+    random_seed: int = 0
+    # "fast" returns the greedy roster without running CP-SAT, for interactive previews
+    mode: SolveMode = SolveMode.EXACT
+    # Solve long ranges in windows of this many days instead of one model
+    horizon_days: Optional[int] = Field(default=None, ge=1)
+    horizon_overlap_days: int = Field(default=1, ge=0)
+    # Run the relaxed solve alongside the primary when locks might conflict
+    relaxed_concurrently: bool = False
+    # Share of timeout_seconds the unsat-core search may use on infeasible requests
+    unsat_core_time_fraction: float = 0.2
+    # Report per-phase timings and CP-SAT figures in diagnostics.profile
+    profile: bool = False
     weights: OptimizeWeights = Field(default_factory=OptimizeWeights)
 
+    @model_validator(mode="after")
+    def _check_horizon(self) -> "OptimizeSettings":
+        if self.horizon_days is not None and self.horizon_overlap_days >= self.horizon_days:
+            raise ValueError("horizon_overlap_days must be less than horizon_days")
+        return self
+
 
 class OptimizeRequest(BaseModel):
     team_id: str
     date_from: str
     date_to: str
+    # IANA zone for shift wall-clock times and availability timestamps without an offset
+    timezone: str = "UTC"
     employees: List[Employee]
     open_shifts: List[OpenShift]
     settings: OptimizeSettings = Field(default_factory=OptimizeSettings)
+    # Existing roster to warm-start from; assignments of a previous response can be sent as-is
+    previous_assignments: List[AssignmentRef] = Field(default_factory=list)
+    # Assignments kept as they are, even if the employee is no longer eligible
+    locked_assignments: List[AssignmentRef] = Field(default_factory=list)
+
+    @field_validator("timezone")
+    @classmethod
+    def _check_timezone(cls, name: str) -> str:
+        return _valid_timezone(name)
+
+
+def _valid_timezone(name: str) -> str:
+    """An IANA zone name the solver can resolve; dateutil is loaded on first use."""
+    from .timeline import resolve_timezone
+    resolve_timezone(name)
+    return name
+
+
+def _check_offsets(name: str, offsets: Optional[List[int]], rows: int, values: int) -> None:
+    """Offsets of `rows` rows into a column of `values` entries: rows + 1 non-decreasing positions."""
+    if offsets is None:
+        if values:
+            raise ValueError(f"{name} is required when its values are given")
+        return
+    if len(offsets) != rows + 1 or offsets[0] != 0 or offsets[-1] != values:
+        raise ValueError(f"{name} must have {rows + 1} entries from 0 to {values}")
+    if any(a > b for a, b in zip(offsets, offsets[1:])):
+        raise ValueError(f"{name} must be non-decreasing")
+
+
+def _check_positions(name: str, positions: List[int], size: int) -> None:
+    if positions and (min(positions) < 0 or max(positions) >= size):
+        raise ValueError(f"{name} must hold positions below {size}")
+
+
+class ColumnarRequest(BaseModel):
+    """
+    An OptimizeRequest as parallel columns, for large rosters.
+
+    Strings that repeat (skills, shift codes, days) are sent once in a table
+    and referred to by position. Row i of a variable-length column (an
+    employee's skills, windows or preferences, a shift's skills) is
+    values[offsets[i]:offsets[i + 1]]; omitted offsets mean no values for
+    any row. Times are integer minutes since the Unix epoch (UTC).
+    """
+    team_id: str
+    date_from: str
+    date_to: str
+    # IANA zone the roster is rendered in; times below are already UTC
+    timezone: str = "UTC"
+    settings: OptimizeSettings = Field(default_factory=OptimizeSettings)
+
+    skills: List[str] = Field(default_factory=list)
+    shift_codes: List[str] = Field(default_factory=list)
+    days: List[str] = Field(default_factory=list)
+
+    employee_ids: List[str]
+    employee_skill_offsets: Optional[List[int]] = None
+    employee_skills: List[int] = Field(default_factory=list)
+    availability_offsets: Optional[List[int]] = None
+    availability_start: List[int] = Field(default_factory=list)
+    availability_end: List[int] = Field(default_factory=list)
+    availability_type: List[AvailabilityType] = Field(default_factory=list)
+    # Preference weights by shift code position
+    preference_offsets: Optional[List[int]] = None
+    preference_codes: List[int] = Field(default_factory=list)
+    preference_values: List[int] = Field(default_factory=list)
+
+    shift_ids: List[str]
+    shift_day: List[int]
+    shift_code: List[int]
+    shift_start: List[int]
+    shift_end: List[int]
+    # Paid hours per shift; the length of the shift when omitted
+    shift_hours: Optional[List[float]] = None
+    shift_skill_offsets: Optional[List[int]] = None
+    shift_skills: List[int] = Field(default_factory=list)
+    # Employees each shift needs; one per shift when omitted
+    shift_headcount: Optional[List[int]] = None
+
+    # Assignments as (shift position, employee position) columns
+    previous_shift: List[int] = Field(default_factory=list)
+    previous_employee: List[int] = Field(default_factory=list)
+    locked_shift: List[int] = Field(default_factory=list)
+    locked_employee: List[int] = Field(default_factory=list)
+
+    @field_validator("timezone")
+    @classmethod
+    def _check_timezone(cls, name: str) -> str:
+        return _valid_timezone(name)
+
+    @model_validator(mode="after")
+    def _check_columns(self) -> "ColumnarRequest":
+        num_employees, num_shifts = len(self.employee_ids), len(self.shift_ids)
+        columns = {
+            "availability_end": (self.availability_end, len(self.availability_start)),
+            "availability_type": (self.availability_type, len(self.availability_start)),
+            "preference_values": (self.preference_values, len(self.preference_codes)),
+            "shift_day": (self.shift_day, num_shifts),
+            "shift_code": (self.shift_code, num_shifts),
+            "shift_start": (self.shift_start, num_shifts),
+            "shift_end": (self.shift_end, num_shifts),
+            "shift_hours": (self.shift_hours or [], num_shifts if self.shift_hours else 0),
+            "shift_headcount": (self.shift_headcount or [], num_shifts if self.shift_headcount else 0),
+            "previous_employee": (self.previous_employee, len(self.previous_shift)),
+            "locked_employee": (self.locked_employee, len(self.locked_shift)),
+        }
+        for name, (column, length) in columns.items():
+            if len(column) != length:
+                raise ValueError(f"{name} must have {length} entries, got {len(column)}")
+
+        _check_offsets("employee_skill_offsets", self.employee_skill_offsets, num_employees, len(self.employee_skills))
+        _check_offsets("availability_offsets", self.availability_offsets, num_employees, len(self.availability_start))
+        _check_offsets("preference_offsets", self.preference_offsets, num_employees, len(self.preference_codes))
+        _check_offsets("shift_skill_offsets", self.shift_skill_offsets, num_shifts, len(self.shift_skills))
+
+        _check_positions("employee_skills", self.employee_skills, len(self.skills))
+        _check_positions("shift_skills", self.shift_skills, len(self.skills))
+        _check_positions("preference_codes", self.preference_codes, len(self.shift_codes))
+        _check_positions("shift_day", self.shift_day, len(self.days))
+        _check_positions("shift_code", self.shift_code, len(self.shift_codes))
+        _check_positions("previous_shift", self.previous_shift, num_shifts)
+        _check_positions("previous_employee", self.previous_employee, num_employees)
+        _check_positions("locked_shift", self.locked_shift, num_shifts)
+        _check_positions("locked_employee", self.locked_employee, num_employees)
+        if self.shift_headcount is not None and any(h < 1 for h in self.shift_headcount):
+            raise ValueError("shift_headcount entries must be at least 1")
+        return self
 
 
 class Assignment(BaseModel):
@@ -75,6 +247,31 @@ class Assignment(BaseModel):
     notes: Optional[str] = None
 
 
+class HorizonWindow(BaseModel):
+    date_from: str
+    date_to: str
+    status: OptimizeStatus
+    total_shifts: int
+    assigned_shifts: int
+    solve_time_ms: int
+
+
+class SolveProfile(BaseModel):
+    # Milliseconds per phase (ingest, eligibility, decompose, constraints,
+    # objective, heuristic, presolve, search, extraction, unsat_core, relaxed);
+    # phases that did not run are left out. Parts solved separately add up.
+    phases_ms: Dict[str, float]
+    variables: int
+    constraints: int
+    # From CP-SAT's log; None when no CP-SAT search ran, e.g. in fast mode
+    presolved_variables: Optional[int] = None
+    presolved_constraints: Optional[int] = None
+    incumbents: Optional[int] = None
+    # Best proven objective bound and its relative gap to the fitness
+    best_bound: Optional[float] = None
+    gap: Optional[float] = None
+
+
 class Diagnostics(BaseModel):
     relaxed: bool = False
     unsat_core: Optional[List[str]] = None
@@ -84,6 +281,17 @@ class Diagnostics(BaseModel):
     total_shifts: Optional[int] = None
     assigned_shifts: Optional[int] = None
     unfilled_shifts: Optional[int] = None
+    cached: bool = False
+    # Fitness of the greedy roster built before CP-SAT; the optimum is at least this
+    heuristic_fitness: Optional[int] = None
+    # CP-SAT found no solution in time and the greedy roster was returned instead
+    fallback: bool = False
+    # Number of independent parts solved separately, when the problem was split
+    subproblems: Optional[int] = None
+    # Per-window outcome of a rolling-horizon solve
+    windows: Optional[List[HorizonWindow]] = None
+    # With settings.profile
+    profile: Optional[SolveProfile] = None
 
 
 class Suggestion(BaseModel):
@@ -107,3 +315,46 @@ class OptimizeResponse(BaseModel):
     suggestions: Optional[List[Suggestion]] = None
     relaxed_solution: Optional[RelaxedSolution] = None
 
+
+class Incumbent(BaseModel):
+    fitness: int
+    assigned_shifts: int
+    total_shifts: int
+    elapsed_ms: int
+    assignments: List[Assignment]
+
+
+class StreamEvent(BaseModel):
+    # "incumbent" while searching, then one final "result" or "error"
+    type: str
+    incumbent: Optional[Incumbent] = None
+    result: Optional[OptimizeResponse] = None
+    detail: Optional[str] = None
+
+
+class BatchRequest(BaseModel):
+    # Validated one by one in the workers, so an invalid request fails only its own item
+    requests: List[Dict[str, Any]]
+    # Time budget of the whole batch; each request keeps its own timeout when unset
+    timeout_seconds: Optional[int] = None
+
+
+class BatchItem(BaseModel):
+    # Position of the request in the batch; items arrive in completion order
+    index: int
+    team_id: Optional[str] = None
+    # "result" or "error"
+    type: str
+    result: Optional[OptimizeResponse] = None
+    detail: Optional[str] = None
+
+
+class JobResponse(BaseModel):
+    job_id: str
+    status: JobStatus
+    team_id: str
+    submitted_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    result: Optional[OptimizeResponse] = None
+    error: Optional[str] = None
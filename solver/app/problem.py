@@ -0,0 +1,378 @@
+# solver/app/problem.py
+# Request normalized once at ingestion into the solver's internal columns
+
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import tzinfo
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple, TypeVar, Union
+
+from .availability import AvailabilityIndex
+from .models import AssignmentRef, ColumnarRequest, OptimizeRequest, OptimizeSettings
+from .skills import SkillTable
+from .timeline import format_minutes, resolve_timezone, shift_epoch_minutes
+
+V = TypeVar("V")
+
+
+@dataclass
+class ProblemData:
+    """
+    An optimization request as parallel per-employee and per-shift columns.
+
+    All times are integer minutes since the Unix epoch (UTC); ISO strings are
+    only rendered again when building Assignment output.
+
+    A shift here is a slot with one or more seats. Request shifts that are
+    interchangeable (same day, code, skills, hours and times) are collapsed
+    into one shift, and a request shift's headcount gives it that many
+    seats, so the model has one variable per employee and shift however
+    many seats it has. shift_seats lists each shift's seats as positions in
+    request_shift_ids; shift_ids holds the id of each shift's first seat.
+    """
+    team_id: str
+    date_from: str
+    date_to: str
+    settings: OptimizeSettings
+    tz: tzinfo
+
+    # Skills are interned per request; skill sets are bitmasks over the table
+    skills: SkillTable
+
+    employee_ids: List[str]
+    employee_skill_masks: List[int]
+    employee_preferences: List[Dict[str, int]]
+    availability: AvailabilityIndex
+
+    shift_ids: List[str]
+    shift_days: List[str]
+    shift_codes: List[str]
+    shift_skill_masks: List[int]
+    shift_hours: List[float]
+    shift_start: List[int]
+    shift_end: List[int]
+    request_shift_ids: List[str]
+    shift_seats: List[List[int]]
+
+    # (employee index, shift index) pairs of the previous roster and of pinned assignments
+    previous: List[Tuple[int, int]] = field(default_factory=list)
+    locked: List[Tuple[int, int]] = field(default_factory=list)
+    # Request shift position each previous pair held, so it keeps that seat's id
+    previous_seats: Dict[Tuple[int, int], int] = field(default_factory=dict)
+
+    @property
+    def num_employees(self) -> int:
+        return len(self.employee_ids)
+
+    @property
+    def num_shifts(self) -> int:
+        return len(self.shift_ids)
+
+    @property
+    def shift_headcount(self) -> List[int]:
+        return [len(seats) for seats in self.shift_seats]
+
+    @property
+    def num_seats(self) -> int:
+        return sum(len(seats) for seats in self.shift_seats)
+
+    def subset(self, emp_idx: List[int], shift_idx: List[int], settings: OptimizeSettings) -> "ProblemData":
+        """
+        The problem restricted to the given employees and shifts, renumbered in
+        that order. Previous and locked assignments outside the subset are dropped.
+        """
+        emp_pos = {e: i for i, e in enumerate(emp_idx)}
+        shift_pos = {s: i for i, s in enumerate(shift_idx)}
+
+        def remap(refs: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+            return [(emp_pos[e], shift_pos[s]) for e, s in refs if e in emp_pos and s in shift_pos]
+
+        return ProblemData(
+            team_id=self.team_id,
+            date_from=self.date_from,
+            date_to=self.date_to,
+            settings=settings,
+            tz=self.tz,
+            skills=self.skills,
+            employee_ids=[self.employee_ids[e] for e in emp_idx],
+            employee_skill_masks=[self.employee_skill_masks[e] for e in emp_idx],
+            employee_preferences=[self.employee_preferences[e] for e in emp_idx],
+            availability=self.availability.subset(emp_idx),
+            shift_ids=[self.shift_ids[s] for s in shift_idx],
+            shift_days=[self.shift_days[s] for s in shift_idx],
+            shift_codes=[self.shift_codes[s] for s in shift_idx],
+            shift_skill_masks=[self.shift_skill_masks[s] for s in shift_idx],
+            shift_hours=[self.shift_hours[s] for s in shift_idx],
+            shift_start=[self.shift_start[s] for s in shift_idx],
+            shift_end=[self.shift_end[s] for s in shift_idx],
+            request_shift_ids=self.request_shift_ids,
+            shift_seats=[self.shift_seats[s] for s in shift_idx],
+            previous=remap(self.previous),
+            locked=remap(self.locked),
+            previous_seats={
+                (emp_pos[e], shift_pos[s]): pos for (e, s), pos in self.previous_seats.items()
+                if e in emp_pos and s in shift_pos
+            },
+        )
+
+    def shift_times_iso(self, shift_idx: int) -> Tuple[str, str]:
+        """Render a shift's start and end as local ISO strings."""
+        return (
+            format_minutes(self.shift_start[shift_idx], self.tz),
+            format_minutes(self.shift_end[shift_idx], self.tz),
+        )
+
+    def seat_positions(self, shift_idx: int, emp_idx: List[int]) -> List[int]:
+        """
+        Request shift positions of the seats of a shift handed to the given
+        employees: each keeps the seat they held in the previous roster while
+        it is free, the others take the remaining seats in request order.
+        """
+        seats = self.shift_seats[shift_idx]
+        if seats[0] == seats[-1]:
+            return seats[:len(emp_idx)]
+        free = list(seats)
+        kept: List[Optional[int]] = []
+        for e_idx in emp_idx:
+            pos = self.previous_seats.get((e_idx, shift_idx))
+            if pos is not None and pos in free:
+                free.remove(pos)
+            else:
+                pos = None
+            kept.append(pos)
+        rest = iter(free)
+        return [pos if pos is not None else next(rest) for pos in kept]
+
+
+def ingest_request(request: Union[OptimizeRequest, ColumnarRequest]) -> ProblemData:
+    """Normalize a request: parse every timestamp exactly once."""
+    if isinstance(request, ColumnarRequest):
+        return ingest_columnar(request)
+    local_tz = resolve_timezone(request.timezone)
+
+    # Most shifts of a roster share a handful of (day, start, end) combinations
+    times_cache: Dict[Tuple, Tuple[int, int]] = {}
+    shift_start: List[int] = []
+    shift_end: List[int] = []
+    for shift in request.open_shifts:
+        key = (shift.day, shift.start_time, shift.end_time, shift.duration_hours)
+        times = times_cache.get(key)
+        if times is None:
+            times = shift_epoch_minutes(
+                shift.day, shift.start_time, shift.end_time, shift.duration_hours, local_tz
+            )
+            times_cache[key] = times
+        shift_start.append(times[0])
+        shift_end.append(times[1])
+
+    employees = request.employees
+    shifts = request.open_shifts
+
+    # Only skills some shift requires matter for eligibility
+    skills = SkillTable()
+    shift_skill_masks = [skills.intern_mask(s.required_skills) for s in shifts]
+
+    employee_pos = {e.id: i for i, e in enumerate(employees)}
+    shift_pos = {s.id: i for i, s in enumerate(shifts)}
+
+    # A previous roster may mention employees or shifts that are gone; skip those
+    previous = [
+        (employee_pos[a.employee_id], shift_pos[a.shift_id])
+        for a in request.previous_assignments
+        if a.employee_id in employee_pos and a.shift_id in shift_pos
+    ]
+    shift_ids = [s.id for s in shifts]
+    headcount = [s.headcount for s in shifts]
+    locked = _unique_locks(_resolve_locked(request.locked_assignments, employee_pos, shift_pos), shift_ids, headcount)
+
+    first, shift_seats, shift_of = _collapse_shifts(
+        list(zip(
+            (s.day for s in shifts), (s.shift_code for s in shifts), shift_skill_masks,
+            (s.duration_hours for s in shifts), shift_start, shift_end,
+        )),
+        headcount,
+        locked,
+    )
+
+    return ProblemData(
+        team_id=request.team_id,
+        date_from=request.date_from,
+        date_to=request.date_to,
+        settings=request.settings,
+        tz=local_tz,
+        skills=skills,
+        employee_ids=[e.id for e in employees],
+        employee_skill_masks=[skills.mask(e.skills) for e in employees],
+        employee_preferences=[e.preferences for e in employees],
+        availability=AvailabilityIndex.from_employees(employees, local_tz),
+        shift_ids=[shift_ids[pos] for pos in first],
+        shift_days=[shifts[pos].day for pos in first],
+        shift_codes=[shifts[pos].shift_code for pos in first],
+        shift_skill_masks=[shift_skill_masks[pos] for pos in first],
+        shift_hours=[shifts[pos].duration_hours for pos in first],
+        shift_start=[shift_start[pos] for pos in first],
+        shift_end=[shift_end[pos] for pos in first],
+        request_shift_ids=shift_ids,
+        shift_seats=shift_seats,
+        previous=[(e_idx, shift_of[pos]) for e_idx, pos in previous],
+        locked=[(e_idx, shift_of[pos]) for e_idx, pos in locked],
+        previous_seats=_previous_seats(previous, shift_of),
+    )
+
+
+def ingest_columnar(request: ColumnarRequest) -> ProblemData:
+    """Columns of a columnar request taken over as they are; only tables are looked up."""
+    num_employees, num_shifts = len(request.employee_ids), len(request.shift_ids)
+
+    def rows(offsets: Optional[List[int]], values: Sequence[V], num_rows: int) -> List[Sequence[V]]:
+        if offsets is None:
+            return [[] for _ in range(num_rows)]
+        return [values[a:b] for a, b in zip(offsets, offsets[1:])]
+
+    # Only skills some shift requires matter for eligibility; each table entry
+    # maps to its bit, or to 0 for skills no shift requires
+    skills = SkillTable()
+    shift_skill_masks = [
+        skills.intern_mask(request.skills[k] for k in row)
+        for row in rows(request.shift_skill_offsets, request.shift_skills, num_shifts)
+    ]
+    bits = [skills.mask([name]) for name in request.skills]
+    employee_skill_masks = []
+    for row in rows(request.employee_skill_offsets, request.employee_skills, num_employees):
+        mask = 0
+        for k in row:
+            mask |= bits[k]
+        employee_skill_masks.append(mask)
+
+    codes = request.shift_codes
+    employee_preferences = [
+        {codes[c]: v for c, v in zip(row_codes, row_values)}
+        for row_codes, row_values in zip(
+            rows(request.preference_offsets, request.preference_codes, num_employees),
+            rows(request.preference_offsets, request.preference_values, num_employees),
+        )
+    ]
+
+    shift_hours = request.shift_hours
+    if shift_hours is None:
+        shift_hours = [(end - start) / 60 for start, end in zip(request.shift_start, request.shift_end)]
+    headcount = request.shift_headcount
+    if headcount is None:
+        headcount = [1] * num_shifts
+
+    previous = list(zip(request.previous_employee, request.previous_shift))
+    locked = _unique_locks(list(zip(request.locked_employee, request.locked_shift)), request.shift_ids, headcount)
+
+    first, shift_seats, shift_of = _collapse_shifts(
+        list(zip(
+            request.shift_day, request.shift_code, shift_skill_masks,
+            shift_hours, request.shift_start, request.shift_end,
+        )),
+        headcount,
+        locked,
+    )
+
+    return ProblemData(
+        team_id=request.team_id,
+        date_from=request.date_from,
+        date_to=request.date_to,
+        settings=request.settings,
+        tz=resolve_timezone(request.timezone),
+        skills=skills,
+        employee_ids=list(request.employee_ids),
+        employee_skill_masks=employee_skill_masks,
+        employee_preferences=employee_preferences,
+        availability=AvailabilityIndex.from_columns(
+            request.availability_offsets,
+            request.availability_start,
+            request.availability_end,
+            request.availability_type,
+            num_employees,
+        ),
+        shift_ids=[request.shift_ids[pos] for pos in first],
+        shift_days=[request.days[request.shift_day[pos]] for pos in first],
+        shift_codes=[codes[request.shift_code[pos]] for pos in first],
+        shift_skill_masks=[shift_skill_masks[pos] for pos in first],
+        shift_hours=[shift_hours[pos] for pos in first],
+        shift_start=[request.shift_start[pos] for pos in first],
+        shift_end=[request.shift_end[pos] for pos in first],
+        request_shift_ids=list(request.shift_ids),
+        shift_seats=shift_seats,
+        previous=[(e_idx, shift_of[pos]) for e_idx, pos in previous],
+        locked=[(e_idx, shift_of[pos]) for e_idx, pos in locked],
+        previous_seats=_previous_seats(previous, shift_of),
+    )
+
+
+def _collapse_shifts(
+    keys: List[Hashable],
+    headcount: List[int],
+    locked: List[Tuple[int, int]]
+) -> Tuple[List[int], List[List[int]], List[int]]:
+    """
+    Group request shifts into the solver's shifts.
+
+    Request shifts with equal keys are interchangeable and share one shift,
+    with a seat per unit of their headcounts. Locked request shifts keep a
+    shift of their own, so that each lock, and its name in an unsat core,
+    stays tied to one request shift. Returns the first request position of
+    each shift, each shift's seats as request positions, and the shift of
+    every request position.
+    """
+    locked_pos = {pos for _, pos in locked}
+    first: List[int] = []
+    seats: List[List[int]] = []
+    shift_of: List[int] = []
+    shift_by_key: Dict[Hashable, int] = {}
+    for pos, (key, count) in enumerate(zip(keys, headcount)):
+        s_idx = shift_by_key.get(key) if pos not in locked_pos else None
+        if s_idx is None:
+            s_idx = len(first)
+            first.append(pos)
+            seats.append([])
+            if pos not in locked_pos:
+                shift_by_key[key] = s_idx
+        seats[s_idx].extend([pos] * count)
+        shift_of.append(s_idx)
+    return first, seats, shift_of
+
+
+def _previous_seats(previous: List[Tuple[int, int]], shift_of: List[int]) -> Dict[Tuple[int, int], int]:
+    """
+    The request shift position of each previous (employee, shift) pair. An
+    employee listed on several copies of a shift keeps the first copy in the
+    request, whatever the order of previous_assignments: cache keys sort them.
+    """
+    seats: Dict[Tuple[int, int], int] = {}
+    for e_idx, pos in previous:
+        key = (e_idx, shift_of[pos])
+        seats[key] = min(seats.get(key, pos), pos)
+    return seats
+
+
+def _resolve_locked(
+    locked_assignments: List[AssignmentRef],
+    employee_pos: Dict[str, int],
+    shift_pos: Dict[str, int]
+) -> List[Tuple[int, int]]:
+    """Index pairs of locked assignments; unknown ids are errors."""
+    for a in locked_assignments:
+        if a.employee_id not in employee_pos:
+            raise ValueError(f"Locked assignment references unknown employee {a.employee_id}")
+        if a.shift_id not in shift_pos:
+            raise ValueError(f"Locked assignment references unknown shift {a.shift_id}")
+    return [(employee_pos[a.employee_id], shift_pos[a.shift_id]) for a in locked_assignments]
+
+
+def _unique_locks(
+    locked: List[Tuple[int, int]],
+    shift_ids: List[str],
+    headcount: List[int]
+) -> List[Tuple[int, int]]:
+    """Locks without repeats; a shift locked to more employees than its headcount is an error."""
+    unique = list(dict.fromkeys(locked))
+    per_shift = Counter(s_idx for _, s_idx in unique)
+    for s_idx, count in per_shift.items():
+        if count > headcount[s_idx]:
+            limit = "one employee" if headcount[s_idx] == 1 else f"{headcount[s_idx]} employees"
+            raise ValueError(f"Shift {shift_ids[s_idx]} is locked to more than {limit}")
+    return unique
@@ -0,0 +1,74 @@
+# solver/app/skills.py
+# Skill names interned to bit positions for one optimization request
+
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+
+class SkillTable:
+    """
+    Skill names interned to integer ids, with skill sets as int bitmasks.
+
+    Bit i of a mask is set when the set contains the skill with id i. Masks
+    are plain Python ints, so any number of skills fits; pack() converts a
+    batch of them to uint64 words for vectorized checks.
+    """
+
+    def __init__(self) -> None:
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def intern(self, name: str) -> int:
+        """Get the id of a skill, assigning the next free one if it is new."""
+        skill_id = self._ids.get(name)
+        if skill_id is None:
+            skill_id = len(self._names)
+            self._ids[name] = skill_id
+            self._names.append(name)
+        return skill_id
+
+    def intern_mask(self, skills: Iterable[str]) -> int:
+        """Bitmask of a skill set, interning any new names."""
+        mask = 0
+        for name in skills:
+            mask |= 1 << self.intern(name)
+        return mask
+
+    def mask(self, skills: Iterable[str]) -> int:
+        """Bitmask of a skill set; names never interned are ignored."""
+        mask = 0
+        for name in skills:
+            skill_id = self._ids.get(name)
+            if skill_id is not None:
+                mask |= 1 << skill_id
+        return mask
+
+    def names(self, mask: int) -> List[str]:
+        """Skill names in a bitmask, in id order."""
+        return [name for skill_id, name in enumerate(self._names) if mask >> skill_id & 1]
+
+    def pack(self, masks: List[int]) -> np.ndarray:
+        """Pack bitmasks into a (len(masks), words) uint64 array."""
+        num_words = max(1, (len(self._names) + 63) // 64)
+        words = np.zeros((len(masks), num_words), dtype=np.uint64)
+        for w in range(num_words):
+            shift = 64 * w
+            words[:, w] = [(mask >> shift) & 0xFFFFFFFFFFFFFFFF for mask in masks]
+        return words
+
+
+def covers(employee_words: np.ndarray, required_words: np.ndarray) -> np.ndarray:
+    """
+    Boolean (required x employee) matrix of "employee has every required skill".
+
+    Both arguments are packed with the same SkillTable.
+    """
+    ok = np.ones((len(required_words), len(employee_words)), dtype=bool)
+    for w in range(required_words.shape[1]):
+        required = required_words[:, None, w]
+        ok &= (employee_words[None, :, w] & required) == required
+    return ok
@@ -0,0 +1,78 @@
+# solver/app/solver_log.py
+# Figures read from CP-SAT's search log: presolve time, presolved model size, incumbents
+
+import re
+from typing import Callable, Optional
+
+from ortools.sat.python import cp_model
+
+_STARTING = re.compile(r"^Starting (presolve|search) at ([\d.]+)s")
+_INCUMBENT = re.compile(r"^#\d+\s")
+_COUNT = re.compile(r"^#(\w+): ([\d']+)")
+
+
+def _int(text: str) -> int:
+    # CP-SAT groups digits with apostrophes: 21'238
+    return int(text.replace("'", ""))
+
+
+class SolverLog:
+    """
+    Reads a CpSolver's log as it is written, through log_callback.
+
+    Times are seconds since the solve started, as CP-SAT reports them. Lines
+    are passed on to `forward` when one is given.
+    """
+
+    def __init__(self, forward: Optional[Callable[[str], None]] = None):
+        self.forward = forward
+        self.presolve_start: Optional[float] = None
+        self.search_start: Optional[float] = None
+        self.presolved_variables: Optional[int] = None
+        self.presolved_constraints: Optional[int] = None
+        self.incumbents = 0
+        self._in_presolved_model = False
+
+    def attach(self, solver: cp_model.CpSolver) -> None:
+        """Route the solver's log here instead of stdout."""
+        solver.parameters.log_search_progress = True
+        solver.parameters.log_to_stdout = False
+        solver.log_callback = self
+
+    @property
+    def presolve_seconds(self) -> Optional[float]:
+        if self.presolve_start is None or self.search_start is None:
+            return None
+        return self.search_start - self.presolve_start
+
+    def __call__(self, text: str) -> None:
+        for line in text.splitlines():
+            self._read(line)
+            if self.forward is not None:
+                self.forward(line)
+
+    def _read(self, line: str) -> None:
+        if self._in_presolved_model:
+            # The presolved model's summary: "#Variables: N ..." then "#kAtMostOne: N ..." lines
+            match = _COUNT.match(line)
+            if match is not None:
+                if match.group(1) == "Variables":
+                    self.presolved_variables = _int(match.group(2))
+                else:
+                    self.presolved_constraints = (self.presolved_constraints or 0) + _int(match.group(2))
+                return
+            if not line.startswith("  -"):
+                self._in_presolved_model = False
+
+        if line.startswith("Presolved optimization model"):
+            self._in_presolved_model = True
+            self.presolved_constraints = 0
+        elif _INCUMBENT.match(line):
+            self.incumbents += 1
+        else:
+            match = _STARTING.match(line)
+            if match is not None:
+                if match.group(1) == "presolve":
+                    self.presolve_start = float(match.group(2))
+                else:
+                    self.search_start = float(match.group(2))
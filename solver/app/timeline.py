@@ -0,0 +1,67 @@
+# solver/app/timeline.py
+# Integer epoch-minute time representation used throughout the solver
+
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Optional, Tuple
+
+from dateutil import parser as date_parser
+from dateutil import tz as date_tz
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Shifts without explicit times start at this local time
+DEFAULT_SHIFT_START = "09:00"
+
+
+def resolve_timezone(name: str) -> tzinfo:
+    """Resolve an IANA timezone name, raising ValueError if it is unknown."""
+    if name.upper() == "UTC":
+        return timezone.utc
+    zone = date_tz.gettz(name)
+    if zone is None:
+        raise ValueError(f"Unknown timezone: {name}")
+    return zone
+
+
+def to_epoch_minutes(dt: datetime, local_tz: tzinfo) -> int:
+    """Convert a datetime to minutes since the Unix epoch (UTC)."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=local_tz)
+    return int((dt - EPOCH).total_seconds()) // 60
+
+
+def parse_epoch_minutes(value: str, local_tz: tzinfo) -> int:
+    """Parse an ISO datetime string; naive values are read as local_tz wall-clock time."""
+    return to_epoch_minutes(date_parser.isoparse(value), local_tz)
+
+
+def shift_epoch_minutes(
+    day: str,
+    start_time: Optional[str],
+    end_time: Optional[str],
+    duration_hours: float,
+    local_tz: tzinfo
+) -> Tuple[int, int]:
+    """
+    Get start and end of a shift in epoch minutes.
+
+    Shift times are local wall-clock times on `day`. An end at or before the
+    start is an overnight shift ending on the following day.
+    """
+    if start_time and end_time:
+        start = datetime.fromisoformat(f"{day}T{start_time}")
+        end = datetime.fromisoformat(f"{day}T{end_time}")
+        if end <= start:
+            end += timedelta(days=1)
+        return to_epoch_minutes(start, local_tz), to_epoch_minutes(end, local_tz)
+
+    # Default to a standard start time and the declared duration
+    start = datetime.fromisoformat(f"{day}T{DEFAULT_SHIFT_START}")
+    start_min = to_epoch_minutes(start, local_tz)
+    return start_min, start_min + round(duration_hours * 60)
+
+
+def format_minutes(minutes: int, local_tz: tzinfo) -> str:
+    """Render epoch minutes as a local wall-clock ISO string (no offset)."""
+    local = (EPOCH + timedelta(minutes=minutes)).astimezone(local_tz)
+    return local.replace(tzinfo=None).isoformat()
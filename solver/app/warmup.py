@@ -0,0 +1,121 @@
+# solver/app/warmup.py
+# Warm-up solve on a bundled tiny roster: the process is ready once it has solved one
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from .metrics import READY, STARTUP_SECONDS
+from .models import OptimizeRequest, OptimizeStatus
+
+logger = logging.getLogger(__name__)
+
+# Three employees and six shifts over two days: enough for eligibility, the
+# CP-SAT model, the greedy roster and a search, small enough to solve at once
+WARMUP_REQUEST: Dict[str, Any] = {
+    "team_id": "warmup",
+    "date_from": "2025-12-01",
+    "date_to": "2025-12-02",
+    "employees": [
+        {
+            "id": "w0",
+            "skills": ["cashier", "stock"],
+            "availability": [
+                {"start": "2025-12-01T06:00:00", "end": "2025-12-02T23:00:00", "type": "PREFERRED"},
+            ],
+            "preferences": {"morning": 2},
+        },
+        {
+            "id": "w1",
+            "skills": ["cashier"],
+            "availability": [
+                {"start": "2025-12-01T00:00:00", "end": "2025-12-01T23:59:00", "type": "BLACKOUT"},
+                {"start": "2025-12-02T06:00:00", "end": "2025-12-03T08:00:00", "type": "NEUTRAL"},
+            ],
+            "preferences": {"night": -1},
+        },
+        {
+            "id": "w2",
+            "skills": ["stock"],
+            "availability": [
+                {"start": "2025-12-01T06:00:00", "end": "2025-12-03T08:00:00", "type": "AVOIDED"},
+            ],
+        },
+    ],
+    "open_shifts": [
+        {"id": f"{day}-{code}", "day": f"2025-12-0{day}", "shift_code": code, "required_skills": [skill],
+         "duration_hours": 8, "start_time": start, "end_time": end}
+        for day in (1, 2)
+        for code, skill, start, end in (
+            ("morning", "cashier", "06:00", "14:00"),
+            ("evening", "stock", "14:00", "22:00"),
+            ("night", "cashier", "22:00", "06:00"),
+        )
+    ],
+}
+
+
+def warmup_enabled() -> bool:
+    return os.getenv("SOLVER_WARMUP", "1") != "0"
+
+
+class Readiness:
+    """
+    Whether this process can take solves at full speed.
+
+    The first solve of a process pays for loading OR-Tools and for CP-SAT's
+    one-time native setup; warm_up() pays for them on WARMUP_REQUEST instead,
+    before the process reports ready. With SOLVER_WARMUP=0 it is ready at once.
+    """
+
+    def __init__(self) -> None:
+        self.state = "starting"
+        self.error: Optional[str] = None
+        self.warmup_seconds: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def warm_up(self) -> None:
+        """Solve the bundled roster once; repeated calls do nothing."""
+        with self._lock:
+            if self.state != "starting":
+                return
+            self.state = "warming"
+        if not warmup_enabled():
+            self._finish("ready")
+            return
+
+        start = time.perf_counter()
+        try:
+            # The first import of optimize loads OR-Tools, NumPy and dateutil
+            from .optimize import run_optimization
+            result = run_optimization(OptimizeRequest.model_validate(WARMUP_REQUEST))
+            if result.status not in (OptimizeStatus.OPTIMAL, OptimizeStatus.FEASIBLE):
+                raise RuntimeError(f"warm-up solve ended {result.status.value}")
+        except Exception as e:
+            logger.exception("Warm-up solve failed")
+            self._finish("failed", error=str(e))
+            return
+        self.warmup_seconds = time.perf_counter() - start
+        STARTUP_SECONDS.set(self.warmup_seconds, phase="warmup")
+        logger.info(f"Warm-up solve done in {self.warmup_seconds:.2f}s, ready")
+        self._finish("ready")
+
+    def _finish(self, state: str, error: Optional[str] = None) -> None:
+        with self._lock:
+            self.state = state
+            self.error = error
+        READY.set(1 if state == "ready" else 0)
+
+
+_readiness = Readiness()
+
+
+def get_readiness() -> Readiness:
+    """Process-wide Readiness."""
+    return _readiness
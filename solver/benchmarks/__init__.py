@@ -0,0 +1,2 @@
+# solver/benchmarks/__init__.py
+# Solver performance benchmarks
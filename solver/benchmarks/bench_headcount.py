@@ -0,0 +1,85 @@
+# solver/benchmarks/bench_headcount.py
+# Model size and solve time with identical shifts collapsed into seats, against one shift per seat
+#
+# Usage: python -m benchmarks.bench_headcount [--employees N] [--days N] [--shifts-per-day N] [--timeout S]
+
+import argparse
+import time
+from dataclasses import replace
+from typing import List
+
+from ortools.sat.python import cp_model
+
+from app.eligibility import build_pairs
+from app.optimize import prepare_model, solve_model
+from app.problem import ProblemData, ingest_request
+from benchmarks.workload import WorkloadSpec, generate_request
+
+
+def per_seat(problem: ProblemData) -> ProblemData:
+    """The problem with every seat a shift of its own, as before shifts were collapsed."""
+    idx = [s_idx for s_idx, seats in enumerate(problem.shift_seats) for _ in seats]
+    positions = [pos for seats in problem.shift_seats for pos in seats]
+    return replace(
+        problem,
+        shift_ids=[problem.request_shift_ids[pos] for pos in positions],
+        shift_days=[problem.shift_days[s] for s in idx],
+        shift_codes=[problem.shift_codes[s] for s in idx],
+        shift_skill_masks=[problem.shift_skill_masks[s] for s in idx],
+        shift_hours=[problem.shift_hours[s] for s in idx],
+        shift_start=[problem.shift_start[s] for s in idx],
+        shift_end=[problem.shift_end[s] for s in idx],
+        shift_seats=[[pos] for pos in positions],
+        previous=[],
+        locked=[],
+        previous_seats={},
+    )
+
+
+def run(problem: ProblemData, timeout: float) -> dict:
+    start = time.perf_counter()
+    pairs = build_pairs(problem, problem.settings.weights)
+    prepared = prepare_model(problem, pairs)
+    build = time.perf_counter() - start
+
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = timeout
+    solver.parameters.num_workers = 1
+    start = time.perf_counter()
+    status = solve_model(solver, prepared.model, None)
+    proto = prepared.model.Proto()
+    return {
+        "shifts": problem.num_shifts,
+        "variables": len(proto.variables),
+        "constraints": len(proto.constraints),
+        "build_ms": build * 1000,
+        "solve_ms": (time.perf_counter() - start) * 1000,
+        "status": solver.StatusName(status),
+        "fitness": int(solver.ObjectiveValue()) if status in (cp_model.OPTIMAL, cp_model.FEASIBLE) else None,
+    }
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare collapsed and per-seat models on a retail-style roster")
+    parser.add_argument("--employees", type=int, default=100)
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--shifts-per-day", type=int, default=60)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    spec = WorkloadSpec(employees=args.employees, days=args.days, shifts_per_day=args.shifts_per_day)
+    collapsed = ingest_request(generate_request(spec, seed=args.seed))
+
+    print(f"instance: {args.employees} employees x {spec.num_shifts} seats over {args.days} days")
+    print(f"{'model':<10} {'shifts':>7} {'variables':>10} {'constraints':>12} {'build ms':>9} {'solve ms':>9}  status    fitness")
+    for name, problem in (("per seat", per_seat(collapsed)), ("collapsed", collapsed)):
+        r = run(problem, args.timeout)
+        print(
+            f"{name:<10} {r['shifts']:>7} {r['variables']:>10,} {r['constraints']:>12,} "
+            f"{r['build_ms']:>9.1f} {r['solve_ms']:>9.1f}  {r['status']:<9} {r['fitness']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# solver/benchmarks/bench_labor_rules.py
+# Model build time with the per-day, weekly-hours and minimum-rest rules
+#
+# Usage: python -m benchmarks.bench_labor_rules [--employees N] [--days N] [--shifts-per-day N]
+
+import argparse
+import time
+from dataclasses import replace
+from datetime import date
+from typing import List, Tuple
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from app.constraints import WEEK_DAYS, shift_minutes
+from app.eligibility import PairTable, build_pairs
+from app.model_builder import add_linear
+from app.optimize import _build_model
+from app.problem import ProblemData, ingest_request
+from benchmarks.workload import WorkloadSpec, generate_request
+
+
+def build_pairwise_model(problem: ProblemData, pairs: PairTable) -> cp_model.CpModel:
+    """
+    The same rules enumerated pair by pair: one constraint per two shifts of
+    an employee too close together, and every pair of a 7-day window in
+    that window's hours sum.
+    """
+    settings = problem.settings
+    base = problem.settings.model_copy(update={"max_hours_per_week": None, "min_rest_hours": 0})
+    model, _, _ = _build_model(replace(problem, settings=base), pairs)
+    proto = model.Proto()
+
+    rest = round(settings.min_rest_hours * 60)
+    starts = np.asarray(problem.shift_start, dtype=np.int64)
+    ends = np.asarray(problem.shift_end, dtype=np.int64)
+    minutes = shift_minutes(problem)
+    ordinals = np.asarray([date.fromisoformat(day[:10]).toordinal() for day in problem.shift_days])
+    cap = round(settings.max_hours_per_week * 60)
+    pair_vars = pairs.var.tolist()
+
+    for group in pairs.by_employee(starts):
+        shifts = pairs.shift[group]
+        group_vars = [pair_vars[p] for p in group.tolist()]
+        # Shifts sorted by start: each conflicts with the later ones starting before its end plus rest
+        reach = np.searchsorted(starts[shifts], ends[shifts] + rest, side="left")
+        for i, j in enumerate(reach.tolist()):
+            for k in range(i + 1, j):
+                proto.constraints.add().at_most_one.literals.extend((group_vars[i], group_vars[k]))
+        days = ordinals[shifts]
+        for first in np.unique(days).tolist():
+            window = np.flatnonzero((days >= first) & (days < first + WEEK_DAYS))
+            add_linear(model, [group_vars[i] for i in window.tolist()], minutes[shifts[window]].tolist(), 0, cap)
+    return model
+
+
+def build_sliding_model(problem: ProblemData, pairs: PairTable) -> cp_model.CpModel:
+    """The production build path: rest cliques and per-day sums under window caps."""
+    model, _, _ = _build_model(problem, pairs)
+    return model
+
+
+def _terms(model: cp_model.CpModel) -> int:
+    return sum(
+        len(c.linear.vars) + len(c.at_most_one.literals) + len(c.exactly_one.literals) + len(c.bool_and.literals)
+        for c in model.Proto().constraints
+    )
+
+
+def _time_build(build, problem: ProblemData, pairs: PairTable, repeats: int) -> Tuple[float, cp_model.CpModel]:
+    best = float("inf")
+    model = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model = build(problem, pairs)
+        best = min(best, time.perf_counter() - start)
+    return best, model
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Time the model build with labor rules on a 4-week roster")
+    parser.add_argument("--employees", type=int, default=500)
+    parser.add_argument("--days", type=int, default=28)
+    parser.add_argument("--shifts-per-day", type=int, default=20)
+    parser.add_argument("--max-shifts-per-day", type=int, default=2)
+    parser.add_argument("--max-hours-per-week", type=float, default=40)
+    parser.add_argument("--min-rest-hours", type=float, default=11)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--pairwise", action="store_true", help="Also time pair-by-pair enumeration")
+    args = parser.parse_args(argv)
+
+    spec = WorkloadSpec(employees=args.employees, days=args.days, shifts_per_day=args.shifts_per_day)
+    request = generate_request(spec)
+    plain = ingest_request(request)
+    pairs = build_pairs(plain, plain.settings.weights)
+    ruled = ingest_request(request.model_copy(update={"settings": request.settings.model_copy(update={
+        "max_shifts_per_day": args.max_shifts_per_day,
+        "max_hours_per_week": args.max_hours_per_week,
+        "min_rest_hours": args.min_rest_hours,
+    })}))
+
+    plain_time, plain_model = _time_build(build_sliding_model, plain, pairs, args.repeats)
+    ruled_time, ruled_model = _time_build(build_sliding_model, ruled, pairs, args.repeats)
+
+    print(f"instance: {args.employees} employees x {spec.num_shifts} shifts over {args.days} days, {len(pairs):,} pairs")
+    print(f"rules: {args.max_shifts_per_day}/day, {args.max_hours_per_week:g} h/week, {args.min_rest_hours:g} h rest")
+    print(f"without rules:   {plain_time * 1000:9.1f} ms  {_terms(plain_model):>12,} terms")
+    print(f"with rules:      {ruled_time * 1000:9.1f} ms  {_terms(ruled_model):>12,} terms")
+    if args.pairwise:
+        pairwise_time, pairwise_model = _time_build(build_pairwise_model, ruled, pairs, 1)
+        print(f"pairwise rules:  {pairwise_time * 1000:9.1f} ms  {_terms(pairwise_model):>12,} terms")
+    print(f"under a second:  {'yes' if ruled_time < 1 else 'no'}")
+
+
+if __name__ == "__main__":
+    main()
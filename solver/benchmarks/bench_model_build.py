@@ -0,0 +1,101 @@
+# solver/benchmarks/bench_model_build.py
+# Model build time: bulk array construction vs. per-term expression building
+#
+# Usage: python -m benchmarks.bench_model_build [--employees N] [--shifts N]
+
+import argparse
+import time
+from typing import Callable, List, Tuple
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from app.eligibility import PairTable, build_pairs
+from app.intervals import overlap_cliques
+from app.model_builder import set_objective
+from app.optimize import _build_model
+from app.problem import ProblemData, ingest_request
+from tests.factories import make_request
+
+
+def build_expression_model(problem: ProblemData, pairs: PairTable) -> cp_model.CpModel:
+    """The same model built term by term through the CpModel expression API."""
+    model = cp_model.CpModel()
+    settings = problem.settings
+    x = [
+        model.NewBoolVar(f"x_{e_idx}_{s_idx}")
+        for e_idx, s_idx in zip(pairs.emp.tolist(), pairs.shift.tolist())
+    ]
+    headcount = problem.shift_headcount
+    unfilled = [model.NewIntVar(0, seats, f"unfilled_{s_idx}") for s_idx, seats in enumerate(headcount)]
+
+    for s_idx, seats in enumerate(headcount):
+        model.Add(sum(x[p] for p in pairs.shift_pairs(s_idx)) + unfilled[s_idx] == seats)
+
+    days, day_of_shift = np.unique(np.asarray(problem.shift_days), return_inverse=True)
+    day_keys = pairs.emp.astype(np.int64) * len(days) + day_of_shift.reshape(-1)[pairs.shift]
+    for group in pairs.group_by(day_keys):
+        if len(group) > 1:
+            model.AddAtMostOne([x[p] for p in group.tolist()])
+
+    starts = np.asarray(problem.shift_start, dtype=np.int64)
+    ends = np.asarray(problem.shift_end, dtype=np.int64)
+    pair_start = starts[pairs.shift].tolist()
+    pair_end = ends[pairs.shift].tolist()
+    for group in pairs.by_employee(starts):
+        for clique in overlap_cliques(group.tolist(), pair_start, pair_end):
+            model.AddAtMostOne([x[p] for p in clique])
+
+    objective_terms = [coef * var for coef, var in zip(pairs.coef.tolist(), x)]
+    objective_terms += [-settings.unassigned_penalty * var for var in unfilled]
+    model.Maximize(sum(objective_terms))
+    return model
+
+
+def build_bulk_model(problem: ProblemData, pairs: PairTable) -> cp_model.CpModel:
+    """The production build path: constraints and objective written from arrays."""
+    model, unfilled, _ = _build_model(problem, pairs)
+    penalty = np.full(problem.num_shifts, -problem.settings.unassigned_penalty, dtype=np.int64)
+    set_objective(
+        model,
+        np.concatenate([pairs.var, unfilled]),
+        np.concatenate([pairs.coef, penalty]),
+        maximize=True,
+    )
+    return model
+
+
+def _time_build(build: Callable[[ProblemData, PairTable], cp_model.CpModel],
+                problem: ProblemData, pairs: PairTable, repeats: int) -> Tuple[float, cp_model.CpModel]:
+    best = float("inf")
+    model = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model = build(problem, pairs)
+        best = min(best, time.perf_counter() - start)
+    return best, model
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare model build paths on a 100k-variable roster")
+    parser.add_argument("--employees", type=int, default=100)
+    parser.add_argument("--shifts", type=int, default=1400)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    problem = ingest_request(make_request(args.employees, args.shifts))
+    pairs = build_pairs(problem, problem.settings.weights)
+
+    expr_time, expr_model = _time_build(build_expression_model, problem, pairs, args.repeats)
+    bulk_time, bulk_model = _time_build(build_bulk_model, problem, pairs, args.repeats)
+
+    proto = bulk_model.Proto()
+    print(f"instance: {args.employees} employees x {args.shifts} shifts")
+    print(f"variables: {len(proto.variables):,}  constraints: {len(proto.constraints):,}")
+    print(f"expression API build: {expr_time * 1000:9.1f} ms")
+    print(f"bulk array build:     {bulk_time * 1000:9.1f} ms")
+    print(f"speedup:              {expr_time / bulk_time:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+# solver/benchmarks/bench_scaling.py
+# Build time, solve time, peak memory and roster quality across roster sizes
+#
+# Usage: python -m benchmarks.bench_scaling [--max-employees N] [--output FILE] [--compare BASELINE]
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from ortools import __version__ as ortools_version
+
+from app.optimize import run_optimization
+from benchmarks.workload import WorkloadSpec, generate_request
+
+# Employees, days, shifts per day: 10 x 50 up to 1,000 x 20,000
+SIZES: List[Tuple[int, int, int]] = [
+    (10, 5, 10),
+    (50, 10, 30),
+    (100, 14, 100),
+    (250, 25, 200),
+    (500, 40, 250),
+    (1000, 40, 500),
+]
+
+# Timings and memory regress when they grow by more than the threshold and by more than this much
+NOISE_FLOOR = {"build_ms": 50.0, "solve_ms": 50.0, "peak_rss_mb": 20.0}
+
+
+def size_key(employees: int, shifts: int) -> str:
+    return f"{employees}x{shifts}"
+
+
+def run_instance(spec: WorkloadSpec, seed: int, timeout: int) -> Dict:
+    """Generate and solve one roster; run in a fresh process so peak RSS is its own."""
+    request = generate_request(spec, seed)
+    request.settings.profile = True
+    request.settings.timeout_seconds = timeout
+
+    start = time.perf_counter()
+    result = run_optimization(request)
+    elapsed = time.perf_counter() - start
+
+    stats = result.stats
+    profile = result.diagnostics.profile
+    # TIMEOUT and INFEASIBLE runs return no roster: every shift counts as unfilled
+    assigned_shifts = result.diagnostics.assigned_shifts or 0
+    return {
+        "employees": spec.employees,
+        "shifts": spec.num_shifts,
+        "days": spec.days,
+        "variables": stats.variables,
+        "constraints": stats.constraints,
+        "build_ms": round(stats.build_seconds * 1000, 1),
+        "solve_ms": round(stats.solve_seconds * 1000, 1),
+        "extract_ms": round(stats.extract_seconds * 1000, 1),
+        "total_ms": round(elapsed * 1000, 1),
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "status": result.status.value,
+        "fitness": result.fitness,
+        "best_bound": profile.best_bound if profile else None,
+        "gap": profile.gap if profile else None,
+        "fill_rate": round(assigned_shifts / max(spec.num_shifts, 1), 4),
+    }
+
+
+def compare(baseline: Dict[str, Dict], current: Dict[str, Dict],
+            threshold: float, quality_threshold: float) -> List[str]:
+    """
+    Regressions of `current` against `baseline`, keyed by size.
+
+    Times and peak RSS regress when they grow by more than `threshold` (a
+    share of the baseline) and by more than the noise floor. Quality
+    regresses when an optimal roster is no longer proven optimal, or when
+    fitness or fill rate drop by more than `quality_threshold`, or when a
+    size with a baseline roster now ends without one. Sizes run on only one
+    side are skipped.
+    """
+    regressions = []
+    for key, cur in current.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        for metric, floor in NOISE_FLOOR.items():
+            before, after = base[metric], cur[metric]
+            if after > before * (1 + threshold) and after - before > floor:
+                change = (after - before) / before if before else float("inf")
+                regressions.append(f"{key}: {metric} {before:g} -> {after:g} (+{change:.0%})")
+        if base["status"] == "OPTIMAL" and cur["status"] != "OPTIMAL":
+            regressions.append(f"{key}: status OPTIMAL -> {cur['status']}")
+        if base["fitness"] is not None:
+            if cur["fitness"] is None:
+                regressions.append(f"{key}: fitness {base['fitness']} -> none ({cur['status']})")
+            elif cur["fitness"] < base["fitness"] - quality_threshold * max(abs(base["fitness"]), 1):
+                regressions.append(f"{key}: fitness {base['fitness']} -> {cur['fitness']}")
+        if cur["fill_rate"] < base["fill_rate"] - quality_threshold:
+            regressions.append(f"{key}: fill rate {base['fill_rate']:.2%} -> {cur['fill_rate']:.2%}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Sweep roster sizes and record a scaling baseline")
+    parser.add_argument("--max-employees", type=int, default=SIZES[-1][0],
+                        help="Skip sizes with more employees than this")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=int, default=30, help="Solve timeout per size, seconds")
+    parser.add_argument("--output", help="Write the results as a JSON baseline")
+    parser.add_argument("--compare", help="Baseline JSON to check the results against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed relative growth of build time, solve time and peak RSS")
+    parser.add_argument("--quality-threshold", type=float, default=0.01,
+                        help="Allowed relative fitness drop and absolute fill rate drop")
+    args = parser.parse_args(argv)
+
+    # A fresh interpreter per size: peak RSS is a high-water mark and never comes back down
+    context = multiprocessing.get_context("spawn")
+    results: Dict[str, Dict] = {}
+    print(f"{'size':>12} {'vars':>10} {'build ms':>10} {'solve ms':>10} {'rss MB':>8} {'status':>10} {'fitness':>10} {'fill':>7}")
+    for employees, days, per_day in SIZES:
+        if employees > args.max_employees:
+            continue
+        spec = WorkloadSpec(employees=employees, days=days, shifts_per_day=per_day)
+        with context.Pool(1) as pool:
+            record = pool.apply(run_instance, (spec, args.seed, args.timeout))
+        key = size_key(employees, spec.num_shifts)
+        results[key] = record
+        fitness = record["fitness"] if record["fitness"] is not None else "-"
+        print(
+            f"{key:>12} {record['variables']:>10,} {record['build_ms']:>10.1f} {record['solve_ms']:>10.1f} "
+            f"{record['peak_rss_mb']:>8.1f} {record['status']:>10} {fitness:>10} {record['fill_rate']:>7.1%}"
+        )
+
+    if args.output:
+        baseline = {
+            "meta": {
+                "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "ortools": ortools_version,
+                "cpus": os.cpu_count(),
+                "seed": args.seed,
+                "timeout": args.timeout,
+            },
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"baseline written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline["results"], results, args.threshold, args.quality_threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
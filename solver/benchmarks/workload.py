@@ -0,0 +1,115 @@
+# solver/benchmarks/workload.py
+# Seeded generator of realistic rosters for tests and scaling benchmarks
+
+import random
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import List, Tuple
+
+from app.models import AvailabilityType, AvailabilityWindow, Employee, OpenShift, OptimizeRequest
+
+# Shift templates: code, start, end; an end before the start is an overnight shift
+DAY_SHIFTS: List[Tuple[str, str, str]] = [
+    ("early", "06:00", "14:00"),
+    ("day", "09:00", "17:00"),
+    ("late", "14:00", "22:00"),
+    ("short", "10:00", "14:00"),
+]
+NIGHT_SHIFT = ("night", "22:00", "06:00")
+
+AVAILABILITY_MIX = [
+    (AvailabilityType.PREFERRED, 0.3),
+    (AvailabilityType.NEUTRAL, 0.5),
+    (AvailabilityType.AVOIDED, 0.2),
+]
+
+
+@dataclass
+class WorkloadSpec:
+    """Shape of a generated roster."""
+    employees: int = 50
+    days: int = 14
+    shifts_per_day: int = 20
+    start_date: str = "2025-12-01"
+    # Skill 0 is held by everyone; skill k by a share (1 - skill_rarity) ** k of employees
+    skills: int = 6
+    skill_rarity: float = 0.4
+    # Share of employee-days with an availability window
+    availability_density: float = 0.8
+    # Share of shifts that run overnight
+    overnight_share: float = 0.1
+    # Share of employee-days blacked out, on top of the availability windows
+    blackout_rate: float = 0.05
+
+    @property
+    def num_shifts(self) -> int:
+        return self.days * self.shifts_per_day
+
+
+def generate_request(spec: WorkloadSpec, seed: int = 0) -> OptimizeRequest:
+    """
+    A roster of `spec.days` days: the same seed and spec give the same request.
+
+    Shifts need one skill, drawn in proportion to how many employees hold
+    it, so rare skills are also rarely needed. Employees are available on
+    most days in a window covering that day's shifts and the night after;
+    blackouts are listed first so they win over the regular window.
+    """
+    rng = random.Random(seed)
+    first_day = date.fromisoformat(spec.start_date)
+    days = [first_day + timedelta(days=d) for d in range(spec.days)]
+    skill_names = [f"skill{k}" for k in range(spec.skills)]
+    prevalence = [(1 - spec.skill_rarity) ** k for k in range(spec.skills)]
+    codes = [code for code, _, _ in DAY_SHIFTS] + [NIGHT_SHIFT[0]]
+
+    employees = []
+    for e in range(spec.employees):
+        skills = [name for name, share in zip(skill_names, prevalence) if rng.random() < share]
+        blackouts, windows = [], []
+        for day in days:
+            if rng.random() < spec.blackout_rate:
+                blackouts.append(AvailabilityWindow(
+                    start=f"{day.isoformat()}T00:00:00",
+                    end=f"{(day + timedelta(days=1)).isoformat()}T07:00:00",
+                    type=AvailabilityType.BLACKOUT,
+                ))
+            if rng.random() < spec.availability_density:
+                windows.append(AvailabilityWindow(
+                    start=f"{day.isoformat()}T05:00:00",
+                    end=f"{(day + timedelta(days=1)).isoformat()}T07:00:00",
+                    type=_pick(rng, AVAILABILITY_MIX),
+                ))
+        employees.append(Employee(
+            id=f"e{e}",
+            skills=skills,
+            availability=blackouts + windows,
+            preferences={code: rng.randint(-5, 5) for code in rng.sample(codes, 2)},
+        ))
+
+    shifts = []
+    for day in days:
+        for _ in range(spec.shifts_per_day):
+            code, start, end = NIGHT_SHIFT if rng.random() < spec.overnight_share else rng.choice(DAY_SHIFTS)
+            hours = (int(end[:2]) - int(start[:2])) % 24
+            shifts.append(OpenShift(
+                id=f"s{len(shifts)}",
+                day=day.isoformat(),
+                shift_code=code,
+                required_skills=[_pick(rng, list(zip(skill_names, prevalence)))],
+                duration_hours=hours,
+                start_time=start,
+                end_time=end,
+            ))
+
+    return OptimizeRequest(
+        team_id=f"workload-{seed}",
+        date_from=days[0].isoformat(),
+        date_to=days[-1].isoformat(),
+        employees=employees,
+        open_shifts=shifts,
+    )
+
+
+def _pick(rng: random.Random, weighted: list):
+    values, weights = zip(*weighted)
+    return rng.choices(values, weights=weights)[0]
@@ -0,0 +1,47 @@
+# solver/tests/factories.py
+# Request factories shared by the tests and the model build benchmark
+
+import random
+
+from app.models import AvailabilityType, AvailabilityWindow, Employee, OpenShift, OptimizeRequest
+
+
+def make_request(num_employees: int, num_shifts: int, seed: int = 0) -> OptimizeRequest:
+    """A two-week roster where roughly half of all pairs are eligible."""
+    rng = random.Random(seed)
+    skills = ["cashier", "stock"]
+    employees = [
+        Employee(
+            id=f"e{e}",
+            skills=rng.sample(skills, rng.randint(1, 2)),
+            availability=[
+                AvailabilityWindow(
+                    start=f"2025-12-{day:02d}T06:00:00",
+                    end=f"2025-12-{day:02d}T23:00:00",
+                    type=rng.choice([AvailabilityType.PREFERRED, AvailabilityType.NEUTRAL, AvailabilityType.AVOIDED]),
+                )
+                for day in range(1, 15)
+            ],
+            preferences={"morning": rng.randint(-5, 5)},
+        )
+        for e in range(num_employees)
+    ]
+    shifts = []
+    for s in range(num_shifts):
+        start = rng.randint(6, 18)
+        shifts.append(OpenShift(
+            id=f"s{s}",
+            day=f"2025-12-{rng.randint(1, 14):02d}",
+            shift_code=rng.choice(["morning", "evening"]),
+            required_skills=[rng.choice(skills)],
+            duration_hours=4,
+            start_time=f"{start:02d}:00",
+            end_time=f"{start + 4:02d}:00",
+        ))
+    return OptimizeRequest(
+        team_id="bench",
+        date_from="2025-12-01",
+        date_to="2025-12-14",
+        employees=employees,
+        open_shifts=shifts,
+    )
@@ -0,0 +1,82 @@
+# solver/tests/test_batch.py
+# Tests for batch optimization across the solver process pool
+
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import jobs
+from app.batch import run_batch
+from app.jobs import JobManager
+from app.main import app
+from app.models import AssignmentRef, OptimizeStatus
+from tests.factories import make_request
+
+client = TestClient(app)
+
+
+@pytest.fixture(scope="module")
+def manager():
+    manager = JobManager(max_workers=1, queue_size=0)
+    yield manager
+    manager.shutdown()
+
+
+def _batch():
+    """Two solvable requests, one that fails validation and one that fails to solve."""
+    unknown_lock = make_request(num_employees=4, num_shifts=8, seed=3)
+    unknown_lock.locked_assignments = [AssignmentRef(shift_id="missing", employee_id="e0")]
+    return [
+        make_request(num_employees=4, num_shifts=8, seed=1).model_dump(mode="json"),
+        {"team_id": "broken", "employees": []},
+        unknown_lock.model_dump(mode="json"),
+        make_request(num_employees=6, num_shifts=20, seed=2).model_dump(mode="json"),
+    ]
+
+
+def test_failed_items_do_not_fail_the_batch(manager):
+    """Every request gets exactly one item; invalid and failing ones become errors."""
+    items = {item.index: item for item in run_batch(_batch(), None, manager.executor, 2)}
+
+    assert sorted(items) == [0, 1, 2, 3]
+    assert [items[i].type for i in range(4)] == ["result", "error", "error", "result"]
+    assert items[1].team_id == "broken"
+    assert "missing" in items[2].detail
+    assert items[3].result.status == OptimizeStatus.OPTIMAL
+
+
+def test_batch_budget_caps_request_timeouts(manager):
+    """A slow request is cut to the batch budget and still returns a roster."""
+    slow = make_request(num_employees=100, num_shifts=1400, seed=1)
+    slow.settings.timeout_seconds = 60
+
+    started = time.time()
+    items = list(run_batch([slow.model_dump(mode="json")], 3, manager.executor, 1))
+
+    assert time.time() - started < 20
+    assert items[0].result.status == OptimizeStatus.FEASIBLE
+    assert items[0].result.assignments
+
+
+def test_malformed_item_fails_alone_under_a_batch_budget(manager):
+    """Sizing items for the budget does not trip over fields validation will reject."""
+    requests = _batch()
+    requests[1] = {"team_id": "broken", "employees": 5, "open_shifts": None}
+
+    items = {item.index: item for item in run_batch(requests, 10, manager.executor, 2)}
+
+    assert [items[i].type for i in range(4)] == ["result", "error", "error", "result"]
+    assert items[1].team_id == "broken"
+
+
+def test_batch_endpoint_streams_json_array(manager, monkeypatch):
+    """The endpoint returns one JSON array with an item per request."""
+    monkeypatch.setattr(jobs, "_manager", manager)
+
+    response = client.post("/optimize/batch", json={"requests": _batch()})
+
+    assert response.status_code == 200
+    items = response.json()
+    assert sorted(item["index"] for item in items) == [0, 1, 2, 3]
+    assert sum(item["type"] == "error" for item in items) == 2
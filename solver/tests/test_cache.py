@@ -0,0 +1,124 @@
+# solver/tests/test_cache.py
+# Tests for the content-addressed result and model cache
+
+from fastapi.testclient import TestClient
+
+from app.cache import LRUCache, SolverCache, request_keys
+from app.main import app
+from app.optimize import run_optimization
+from tests.factories import make_request
+
+client = TestClient(app)
+
+
+def test_keys_ignore_list_order_but_not_window_order():
+    """Reordering employees, shifts and skills keeps the key; reordering windows does not."""
+    request = make_request(num_employees=5, num_shifts=10, seed=1)
+    reordered = request.model_copy(deep=True)
+    reordered.employees.reverse()
+    reordered.open_shifts.reverse()
+    for employee in reordered.employees:
+        employee.skills.reverse()
+
+    assert request_keys(reordered) == request_keys(request)
+
+    windows = request.model_copy(deep=True)
+    windows.employees[0].availability.reverse()
+    assert request_keys(windows).result != request_keys(request).result
+
+
+def test_search_settings_change_only_the_result_key():
+    """timeout_seconds and random_seed are part of the result key, not the model key."""
+    request = make_request(num_employees=5, num_shifts=10, seed=1)
+    other = request.model_copy(deep=True)
+    other.settings.timeout_seconds += 5
+    other.settings.random_seed = 7
+
+    assert request_keys(other).model == request_keys(request).model
+    assert request_keys(other).result != request_keys(request).result
+
+    other.settings.unassigned_penalty += 1
+    assert request_keys(other).model != request_keys(request).model
+
+
+def test_lru_evicts_least_recently_used_and_expires():
+    """The oldest unused entry is evicted first; expired entries count as misses."""
+    cache = LRUCache(max_entries=2, ttl_seconds=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+    expired = LRUCache(max_entries=2, ttl_seconds=-1)
+    expired.put("a", 1)
+    assert expired.get("a") is None
+    assert expired.stats()["expirations"] == 1
+
+
+def test_result_and_model_tiers():
+    """A repeated request is served from cache; a new timeout reuses the built model."""
+    cache = SolverCache()
+    request = make_request(num_employees=6, num_shifts=20, seed=3)
+
+    first = run_optimization(request, cache=cache)
+    second = run_optimization(request, cache=cache)
+    assert not first.diagnostics.cached
+    assert second.diagnostics.cached
+    assert second.assignments == first.assignments
+
+    request.settings.timeout_seconds = 10
+    third = run_optimization(request, cache=cache)
+    assert not third.diagnostics.cached
+    assert third.fitness == first.fitness
+    assert cache.stats()["model"]["hits"] == 1
+
+
+def test_stored_results_are_not_changed_by_their_solve():
+    """Changing a result after it was stored, as the rolling horizon does, leaves the cache entry alone."""
+    cache = SolverCache()
+    request = make_request(num_employees=6, num_shifts=20, seed=3)
+
+    first = run_optimization(request, cache=cache)
+    assignments = list(first.assignments)
+    first.diagnostics.reason = "Window 2025-12-01 to 2025-12-07: changed"
+    first.assignments.clear()
+
+    second = run_optimization(request, cache=cache)
+    assert second.diagnostics.cached
+    assert second.diagnostics.reason is None
+    assert second.assignments == assignments
+
+
+def test_interrupted_solves_are_not_stored():
+    """A search stopped early is not cached as the request's answer."""
+    cache = SolverCache()
+    request = make_request(num_employees=6, num_shifts=20, seed=3)
+
+    run_optimization(request, should_stop=lambda: True, cache=cache)
+
+    assert cache.stats()["result"]["entries"] == 0
+
+
+def test_disk_tier_survives_a_new_cache(tmp_path):
+    """Results written to the cache directory are found by a fresh cache instance."""
+    request = make_request(num_employees=6, num_shifts=20, seed=3)
+    first = run_optimization(request, cache=SolverCache(disk_dir=str(tmp_path)))
+
+    restarted = SolverCache(disk_dir=str(tmp_path))
+    second = run_optimization(request, cache=restarted)
+
+    assert second.diagnostics.cached
+    assert second.fitness == first.fitness
+    assert restarted.stats()["disk"]["hits"] == 1
+
+
+def test_cache_stats_endpoint():
+    """The stats endpoint reports both in-memory tiers."""
+    data = client.get("/cache/stats").json()
+
+    assert {"hits", "misses", "entries"} <= set(data["result"])
+    assert {"hits", "misses", "entries"} <= set(data["model"])
@@ -0,0 +1,104 @@
+# solver/tests/test_codec.py
+# Tests for content negotiation and compression on /optimize
+
+import gzip
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import codec
+from app.codec import negotiate, response_data
+from app.main import app
+from app.optimize import build_response, run_optimization
+from tests.factories import make_request
+
+client = TestClient(app)
+
+
+def _body(request) -> bytes:
+    return request.model_dump_json().encode()
+
+
+def test_gzip_request_and_response():
+    """A gzip body is read, and a client accepting gzip gets a compressed response."""
+    request = make_request(num_employees=6, num_shifts=20, seed=1)
+
+    response = client.post(
+        "/optimize",
+        content=gzip.compress(_body(request)),
+        headers={"Content-Type": "application/json", "Content-Encoding": "gzip", "Accept-Encoding": "gzip"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json()["assignments"]
+
+
+def test_response_matches_model_dump():
+    """Rows written directly equal pydantic's own serialization."""
+    request = make_request(num_employees=6, num_shifts=20, seed=2)
+    response = build_response(run_optimization(request))
+
+    assert response_data(response) == response.model_dump(mode="json")
+
+    http_response = client.post("/optimize", content=_body(request), headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in http_response.headers
+    assert http_response.json()["assignments"] == response_data(response)["assignments"]
+
+
+@pytest.mark.parametrize("headers, status", [
+    ({"Content-Type": "text/csv"}, 415),
+    ({"Content-Type": "application/json", "Content-Encoding": "br"}, 415),
+    ({"Content-Type": "application/json", "Content-Encoding": "gzip"}, 400),
+])
+def test_unreadable_bodies_are_rejected(headers, status):
+    """Unknown formats are 415; a body that is not what it claims is 400."""
+    response = client.post("/optimize", content=b"{}", headers=headers)
+
+    assert response.status_code == status
+
+
+def test_oversized_gzip_body_is_rejected(monkeypatch):
+    """A gzip body that inflates beyond the cap is refused before it is fully decompressed."""
+    monkeypatch.setattr(codec, "MAX_DECOMPRESSED_BYTES", 1024)
+    body = gzip.compress(b" " * 10_000 + b"{}")
+
+    response = client.post(
+        "/optimize", content=body, headers={"Content-Type": "application/json", "Content-Encoding": "gzip"}
+    )
+
+    assert len(body) < 1024
+    assert response.status_code == 400
+    assert "exceeds 1024 bytes" in response.json()["detail"]
+
+
+def test_invalid_body_is_a_validation_error():
+    """A readable body that fails validation gets FastAPI's usual 422."""
+    response = client.post("/optimize", content=json.dumps({"employees": []}))
+
+    assert response.status_code == 422
+    assert response.json()["detail"]
+
+
+def test_negotiation_prefers_json_without_msgpack_accept():
+    """JSON is the default; gzip is chosen only when accepted."""
+    assert negotiate(None, None) == ("application/json", None)
+    assert negotiate("application/json", "gzip;q=0, deflate") == ("application/json", None)
+    assert negotiate("*/*", "gzip, deflate")[1] in ("gzip", "zstd")
+
+
+def test_msgpack_round_trip():
+    """msgpack bodies are read and written when the extra is installed."""
+    msgpack = pytest.importorskip("msgpack")
+    request = make_request(num_employees=6, num_shifts=20, seed=1)
+
+    response = client.post(
+        "/optimize",
+        content=msgpack.packb(request.model_dump(mode="json")),
+        headers={"Content-Type": "application/msgpack", "Accept": "application/msgpack"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/msgpack"
+    assert msgpack.unpackb(response.content)["assignments"]
@@ -0,0 +1,83 @@
+# solver/tests/test_columnar.py
+# Tests for the columnar request format
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from app.columnar import to_columnar, to_request
+from app.main import app
+from app.models import AssignmentRef, ColumnarRequest
+from app.optimize import run_optimization
+from app.problem import ingest_request
+from tests.factories import make_request
+
+client = TestClient(app)
+
+
+def _request(seed: int = 1):
+    request = make_request(num_employees=12, num_shifts=60, seed=seed)
+    request.timezone = "Europe/Berlin"
+    request.open_shifts[0].start_time, request.open_shifts[0].end_time = "22:00", "06:00"
+    request.locked_assignments = [AssignmentRef(shift_id="s1", employee_id="e1")]
+    request.previous_assignments = [AssignmentRef(shift_id="s2", employee_id="e2")]
+    return request
+
+
+def test_columnar_ingests_to_the_same_problem():
+    """Both formats end up in the same internal columns."""
+    request = _request()
+    nested, columnar = ingest_request(request), ingest_request(to_columnar(request))
+
+    assert columnar.employee_ids == nested.employee_ids
+    assert columnar.employee_skill_masks == nested.employee_skill_masks
+    assert columnar.employee_preferences == nested.employee_preferences
+    assert columnar.shift_days == nested.shift_days
+    assert columnar.shift_codes == nested.shift_codes
+    assert columnar.shift_skill_masks == nested.shift_skill_masks
+    assert columnar.shift_start == nested.shift_start
+    assert columnar.shift_end == nested.shift_end
+    assert columnar.previous == nested.previous
+    assert columnar.locked == nested.locked
+    for e_idx in range(nested.num_employees):
+        for s_idx in range(nested.num_shifts):
+            start, end = nested.shift_start[s_idx], nested.shift_end[s_idx]
+            assert columnar.availability.lookup(e_idx, start, end) == nested.availability.lookup(e_idx, start, end)
+
+
+def test_columnar_solves_to_the_same_roster():
+    """The same roster and fitness, including through the rolling horizon's conversion."""
+    request = _request(seed=2)
+    request.settings.horizon_days = 7
+
+    nested = run_optimization(request)
+    columnar = run_optimization(to_columnar(request))
+
+    assert columnar.fitness == nested.fitness
+    assert columnar.assignments == nested.assignments
+    assert len(to_request(to_columnar(request)).open_shifts) == len(request.open_shifts)
+
+
+def test_inconsistent_columns_are_rejected():
+    """Column lengths, offsets and table positions are checked on validation."""
+    data = to_columnar(_request()).model_dump(mode="json")
+
+    for change in (
+        {"shift_start": data["shift_start"][:-1]},
+        {"employee_skill_offsets": data["employee_skill_offsets"][:-1]},
+        {"shift_code": [len(data["shift_codes"])] * len(data["shift_ids"])},
+        {"locked_employee": [len(data["employee_ids"])]},
+    ):
+        with pytest.raises(ValidationError):
+            ColumnarRequest.model_validate({**data, **change})
+
+
+def test_columnar_endpoint():
+    """The endpoint answers a columnar body like /optimize answers the nested one."""
+    request = make_request(num_employees=6, num_shifts=20, seed=3)
+
+    nested = client.post("/optimize", content=request.model_dump_json()).json()
+    columnar = client.post("/optimize/columnar", content=to_columnar(request).model_dump_json()).json()
+
+    assert columnar["status"] == nested["status"]
+    assert columnar["assignments"] == nested["assignments"]
@@ -0,0 +1,172 @@
+# solver/tests/test_decompose.py
+# Tests for splitting problems into independent parts
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from app.decompose import find_components, shutdown_component_pool, time_budgets
+from app.eligibility import build_pairs
+from app.jobs import job_pool_workers
+from app.models import AssignmentRef, Employee, OpenShift, OptimizeRequest, OptimizeStatus
+from app.optimize import run_optimization
+from app.problem import ingest_request
+from tests.factories import make_request
+
+
+def _sites(num_sites: int, num_employees: int, num_shifts: int) -> OptimizeRequest:
+    """Independent rosters glued together, with skills unique to each site."""
+    employees, shifts = [], []
+    for site in range(num_sites):
+        request = make_request(num_employees, num_shifts, seed=site)
+        for e in request.employees:
+            e.id = f"{e.id}@{site}"
+            e.skills = [f"{skill}@{site}" for skill in e.skills]
+        for s in request.open_shifts:
+            s.id = f"{s.id}@{site}"
+            s.required_skills = [f"{skill}@{site}" for skill in s.required_skills]
+        employees += request.employees
+        shifts += request.open_shifts
+    return OptimizeRequest(
+        team_id="sites",
+        date_from="2025-12-01",
+        date_to="2025-12-14",
+        employees=employees,
+        open_shifts=shifts,
+    )
+
+
+def _components(request):
+    problem = ingest_request(request)
+    pairs = build_pairs(problem, problem.settings.weights)
+    return [sorted(problem.shift_ids[s] for s in c) for c in find_components(problem, pairs)]
+
+
+def _shift(shift_id, day, start, end):
+    return OpenShift(id=shift_id, day=day, shift_code="x", required_skills=[],
+                     duration_hours=4, start_time=start, end_time=end)
+
+
+def test_components_split_by_day_and_join_overnight():
+    """Days are independent unless an overnight shift overlaps the next day's."""
+    request = OptimizeRequest(
+        team_id="t",
+        date_from="2025-12-01",
+        date_to="2025-12-03",
+        employees=[Employee(id="e1", skills=[], availability=[])],
+        open_shifts=[
+            _shift("a", "2025-12-01", "09:00", "13:00"),
+            _shift("b", "2025-12-01", "14:00", "18:00"),
+            _shift("night", "2025-12-02", "22:00", "06:00"),
+            _shift("early", "2025-12-03", "05:00", "09:00"),
+        ],
+    )
+
+    assert sorted(_components(request)) == [["a", "b"], ["early", "night"]]
+
+
+def test_components_split_by_disjoint_skills():
+    """Shifts nobody shares an employee for end up in different components."""
+    components = _components(_sites(2, 4, 20))
+
+    for shift_ids in components:
+        assert len({shift_id.split("@")[1] for shift_id in shift_ids}) == 1
+
+
+def test_time_budgets_follow_size():
+    """Larger parts get more time, never more than the timeout or less than a second."""
+    assert time_budgets([100, 300], 20, concurrency=1) == [5, 15]
+    assert time_budgets([100, 300], 20, concurrency=2) == [10, 20]
+    assert time_budgets([1, 10000], 20, concurrency=1) == [1, 20]
+
+
+@pytest.fixture(autouse=True)
+def decompose(monkeypatch):
+    monkeypatch.setenv("SOLVER_DECOMPOSE", "1")
+
+
+@pytest.fixture
+def pool_every_part(monkeypatch):
+    monkeypatch.setenv("SOLVER_DECOMPOSE_INLINE_PAIRS", "1")
+
+
+def test_decomposed_solve_matches_whole_solve(monkeypatch):
+    """Splitting gives the same optimum and the assignments stay in shift order."""
+    request = _sites(2, 6, 40)
+
+    split = run_optimization(request)
+    monkeypatch.setenv("SOLVER_DECOMPOSE", "0")
+    whole = run_optimization(request)
+
+    assert split.diagnostics.subproblems > 1
+    assert whole.diagnostics.subproblems is None
+    assert split.status == whole.status == OptimizeStatus.OPTIMAL
+    assert split.fitness == whole.fitness
+    assert split.diagnostics.assigned_shifts == whole.diagnostics.assigned_shifts
+    order = {s.id: i for i, s in enumerate(request.open_shifts)}
+    positions = [order[a.shift_id] for a in split.assignments]
+    assert positions == sorted(positions)
+
+
+def test_decomposed_solve_on_component_pool(pool_every_part):
+    """Large parts solved in worker processes merge into the same optimum."""
+    request = _sites(2, 6, 40)
+    inline = run_optimization(request)
+
+    pool = ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        pooled = run_optimization(request, component_pool=pool)
+    finally:
+        pool.shutdown()
+
+    assert pooled.fitness == inline.fitness
+    assert pooled.diagnostics.subproblems == inline.diagnostics.subproblems
+
+
+def test_stopped_solve_stops_pooled_parts(pool_every_part):
+    """Stopping the solve reaches parts in worker processes instead of waiting for them."""
+    request = _sites(2, 6, 40)
+
+    pool = ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        result = run_optimization(request, should_stop=lambda: True, component_pool=pool)
+    finally:
+        pool.shutdown()
+        shutdown_component_pool()
+
+    assert result.status == OptimizeStatus.TIMEOUT
+    assert result.assignments == []
+
+
+def test_infeasible_part_is_explained_with_its_core():
+    """Conflicting locks in one part are explained; the other parts still fill the relaxed roster."""
+    request = _sites(2, 6, 40)
+    first = request.open_shifts[0]
+    twin = request.open_shifts[1]
+    twin.day, twin.start_time, twin.end_time = first.day, first.start_time, first.end_time
+    employee_id = request.employees[0].id
+    request.locked_assignments = [
+        AssignmentRef(shift_id=first.id, employee_id=employee_id),
+        AssignmentRef(shift_id=twin.id, employee_id=employee_id),
+    ]
+
+    result = run_optimization(request)
+
+    assert result.status == OptimizeStatus.INFEASIBLE
+    assert {f"locked:{first.id}", f"locked:{twin.id}"} <= set(result.diagnostics.unsat_core)
+    assert result.diagnostics.subproblems >= 2
+    relaxed = result.relaxed_solution
+    assert relaxed is not None
+    assert {a.shift_id.split("@")[1] for a in relaxed.assignments} == {"0", "1"}
+
+
+def test_splitting_is_opt_in_and_shares_the_pool_budget(monkeypatch):
+    """Without SOLVER_DECOMPOSE nothing is split; with it, component workers come out of the job pool."""
+    monkeypatch.setenv("SOLVER_POOL_WORKERS", "8")
+    monkeypatch.setenv("SOLVER_DECOMPOSE_WORKERS", "3")
+    assert job_pool_workers() == 5
+
+    monkeypatch.delenv("SOLVER_DECOMPOSE")
+    assert job_pool_workers() == 8
+    assert run_optimization(_sites(2, 6, 40)).diagnostics.subproblems is None
@@ -0,0 +1,239 @@
+# solver/tests/test_eligibility.py
+# Tests for the vectorized eligibility stage
+
+import random
+
+import numpy as np
+
+from app.eligibility import PairTable, build_eligibility, build_pairs
+from app.models import (
+    AssignmentRef,
+    OptimizeRequest,
+    Employee,
+    OpenShift,
+    AvailabilityWindow,
+    AvailabilityType,
+    OptimizeWeights,
+)
+from app.optimize import run_relaxed_optimization
+from app.problem import ingest_request
+
+
+def _random_request(seed: int, num_employees: int = 12, num_shifts: int = 30) -> OptimizeRequest:
+    rng = random.Random(seed)
+    skills = ["cashier", "forklift", "inventory", "supervisor"]
+    types = list(AvailabilityType)
+
+    employees = []
+    for e in range(num_employees):
+        windows = []
+        for day in range(1, 4):
+            start = rng.randint(6, 12)
+            end = rng.randint(start + 1, 23)
+            windows.append(AvailabilityWindow(
+                start=f"2025-12-0{day}T{start:02d}:00:00",
+                end=f"2025-12-0{day}T{end:02d}:00:00",
+                type=rng.choice(types),
+            ))
+        employees.append(Employee(
+            id=f"e{e}",
+            skills=rng.sample(skills, rng.randint(0, len(skills))),
+            availability=windows,
+            preferences={"morning": rng.randint(-5, 5)},
+        ))
+
+    shifts = []
+    for s in range(num_shifts):
+        start = rng.randint(6, 18)
+        shifts.append(OpenShift(
+            id=f"s{s}",
+            day=f"2025-12-0{rng.randint(1, 3)}",
+            shift_code=rng.choice(["morning", "evening"]),
+            required_skills=rng.sample(skills, rng.randint(0, 2)),
+            duration_hours=4,
+            start_time=f"{start:02d}:00",
+            end_time=f"{start + 4:02d}:00",
+        ))
+
+    return OptimizeRequest(
+        team_id="team-1",
+        date_from="2025-12-01",
+        date_to="2025-12-03",
+        employees=employees,
+        open_shifts=shifts,
+    )
+
+
+def test_matches_pairwise_evaluation():
+    """Vectorized matrices agree with evaluating every pair one by one."""
+    request = _random_request(seed=7)
+    problem = ingest_request(request)
+    weights = OptimizeWeights(preferred=10, neutral=0, avoided=-10)
+    type_weight = {
+        AvailabilityType.PREFERRED: weights.preferred,
+        AvailabilityType.AVOIDED: weights.avoided,
+    }
+
+    eligibility = build_eligibility(problem, weights)
+
+    for e_idx, emp in enumerate(request.employees):
+        for s_idx, shift in enumerate(request.open_shifts):
+            avail_type = problem.availability.lookup(
+                e_idx, problem.shift_start[s_idx], problem.shift_end[s_idx]
+            )
+            expected = (
+                set(shift.required_skills) <= set(emp.skills)
+                and avail_type != AvailabilityType.BLACKOUT
+            )
+            assert eligibility.matrix[e_idx, s_idx] == expected
+            if expected:
+                weight = type_weight.get(avail_type, weights.neutral)
+                weight += emp.preferences.get(shift.shift_code, 0)
+                assert eligibility.weights[e_idx, s_idx] == weight
+
+
+def test_overlapping_windows_first_listed_wins():
+    """Overlapping windows fall back to the first-listed-wins rule."""
+    request = _random_request(seed=1, num_employees=1, num_shifts=0)
+    request.employees[0].availability = [
+        AvailabilityWindow(start="2025-12-01T10:00:00", end="2025-12-01T14:00:00", type=AvailabilityType.BLACKOUT),
+        AvailabilityWindow(start="2025-12-01T06:00:00", end="2025-12-01T22:00:00", type=AvailabilityType.PREFERRED),
+    ]
+    request.employees[0].skills = []
+    request.open_shifts = [
+        OpenShift(id="inside", day="2025-12-01", shift_code="x", required_skills=[],
+                  duration_hours=2, start_time="11:00", end_time="13:00"),
+        OpenShift(id="outside", day="2025-12-01", shift_code="x", required_skills=[],
+                  duration_hours=2, start_time="15:00", end_time="17:00"),
+    ]
+    problem = ingest_request(request)
+
+    eligibility = build_eligibility(problem, OptimizeWeights())
+
+    assert eligibility.matrix[0].tolist() == [False, True]
+
+
+def test_skill_bitmask_spans_multiple_words():
+    """More than 64 distinct skills are packed across several words."""
+    skills = [f"skill_{i}" for i in range(100)]
+    request = OptimizeRequest(
+        team_id="team-1",
+        date_from="2025-12-01",
+        date_to="2025-12-01",
+        employees=[
+            Employee(id="all", skills=skills, availability=[]),
+            Employee(id="low", skills=skills[:64], availability=[]),
+        ],
+        open_shifts=[
+            OpenShift(id="s_low", day="2025-12-01", shift_code="x",
+                      required_skills=["skill_3", "skill_63"], duration_hours=4),
+            OpenShift(id="s_high", day="2025-12-01", shift_code="x",
+                      required_skills=["skill_3", "skill_99"], duration_hours=4),
+        ],
+    )
+
+    eligibility = build_eligibility(ingest_request(request), OptimizeWeights())
+
+    assert eligibility.matrix.tolist() == [[True, True], [True, False]]
+
+
+def test_pairs_are_ordered_by_shift():
+    """Eligible pairs come out shift-major, matching the model build order."""
+    problem = ingest_request(_random_request(seed=3))
+    emp_idx, shift_idx = build_eligibility(problem, OptimizeWeights()).pairs()
+
+    keys = list(zip(shift_idx.tolist(), emp_idx.tolist()))
+    assert keys == sorted(keys)
+
+
+def test_pair_table_matches_matrices():
+    """The pair table holds exactly the eligible pairs with their weights."""
+    problem = ingest_request(_random_request(seed=5))
+    eligibility = build_eligibility(problem, OptimizeWeights(preferred=7, avoided=-3))
+
+    pairs = PairTable.from_eligibility(eligibility)
+
+    assert len(pairs) == int(eligibility.matrix.sum())
+    for s_idx in range(problem.num_shifts):
+        emps = pairs.emp[list(pairs.shift_pairs(s_idx))].tolist()
+        assert emps == np.flatnonzero(eligibility.matrix[:, s_idx]).tolist()
+    assert pairs.coef.tolist() == eligibility.weights[pairs.emp, pairs.shift].tolist()
+    assert pairs.avail.tolist() == eligibility.availability[pairs.emp, pairs.shift].tolist()
+
+
+def test_blockwise_pairs_match_dense_build():
+    """Pairs built a few shifts at a time match the dense build, locks included."""
+    request = _random_request(seed=11)
+    request.locked_assignments = [
+        AssignmentRef(shift_id="s4", employee_id="e0"),
+        AssignmentRef(shift_id="s17", employee_id="e5"),
+    ]
+    problem = ingest_request(request)
+    weights = OptimizeWeights(preferred=7, avoided=-3)
+    dense = PairTable.from_eligibility(build_eligibility(problem, weights))
+
+    # 25 cells over 12 employees: two shifts per block
+    pairs = build_pairs(problem, weights, block_cells=25)
+
+    for name in ("emp", "shift", "coef", "avail", "shift_ptr"):
+        assert getattr(pairs, name).tolist() == getattr(dense, name).tolist()
+        assert getattr(pairs, name).dtype == getattr(dense, name).dtype
+
+
+def test_pair_table_groups_by_employee_in_start_order():
+    """by_employee returns each employee's pairs sorted by shift start."""
+    problem = ingest_request(_random_request(seed=9))
+    pairs = PairTable.from_eligibility(build_eligibility(problem, OptimizeWeights()))
+    starts = np.asarray(problem.shift_start)
+
+    groups = pairs.by_employee(starts)
+
+    assert sum(len(g) for g in groups) == len(pairs)
+    for group in groups:
+        assert len(set(pairs.emp[group].tolist())) == 1
+        assert np.all(np.diff(starts[pairs.shift[group]]) >= 0)
+
+
+def test_relaxed_solve_notes_avoided_assignments():
+    """The relaxed solve reuses the pair table and flags AVOIDED assignments."""
+    request = OptimizeRequest(
+        team_id="team-1",
+        date_from="2025-12-01",
+        date_to="2025-12-01",
+        employees=[
+            Employee(id="e1", skills=[], availability=[
+                AvailabilityWindow(start="2025-12-01T08:00:00", end="2025-12-01T18:00:00",
+                                   type=AvailabilityType.AVOIDED),
+            ]),
+        ],
+        open_shifts=[
+            OpenShift(id="s1", day="2025-12-01", shift_code="x", required_skills=[],
+                      duration_hours=4, start_time="09:00", end_time="13:00"),
+        ],
+    )
+    problem = ingest_request(request)
+    pairs = PairTable.from_eligibility(build_eligibility(problem, request.settings.weights))
+
+    relaxed = run_relaxed_optimization(problem, pairs)
+
+    assert relaxed is not None
+    assert [a.employee_id for a in relaxed.assignments] == ["e1"]
+    assert relaxed.assignments[0].notes == "Assigned despite AVOIDED preference"
+
+
+def test_pair_table_find():
+    """find maps (employee, shift) to pair indices and -1 for ineligible pairs."""
+    problem = ingest_request(_random_request(seed=9))
+    eligibility = build_eligibility(problem, OptimizeWeights())
+    table = PairTable.from_eligibility(eligibility)
+
+    emp_idx, shift_idx = np.meshgrid(
+        np.arange(problem.num_employees + 1), np.arange(problem.num_shifts), indexing="ij"
+    )
+    found = table.find(emp_idx.ravel(), shift_idx.ravel())
+
+    for e, s, p in zip(emp_idx.ravel().tolist(), shift_idx.ravel().tolist(), found.tolist()):
+        if e < problem.num_employees and eligibility.matrix[e, s]:
+            assert (table.emp[p], table.shift[p]) == (e, s)
+        else:
+            assert p == -1
@@ -0,0 +1,153 @@
+# solver/tests/test_headcount.py
+# Tests for shift headcounts and the collapsing of identical shifts
+
+from collections import Counter
+from datetime import date, timedelta
+
+import pytest
+
+from app.columnar import to_columnar, to_request
+from app.eligibility import build_pairs
+from app.models import AssignmentRef, Employee, OpenShift, OptimizeRequest, OptimizeSettings, OptimizeStatus, SolveMode
+from app.optimize import run_optimization
+from app.problem import ingest_request
+
+
+def _shift(shift_id: str, day: int = 0, headcount: int = 1, start: str = "09:00", end: str = "17:00") -> OpenShift:
+    return OpenShift(
+        id=shift_id, day=(date(2025, 12, 1) + timedelta(days=day)).isoformat(), shift_code="x",
+        required_skills=[], duration_hours=8, start_time=start, end_time=end, headcount=headcount,
+    )
+
+
+def _request(shifts, employees: int, **settings) -> OptimizeRequest:
+    return OptimizeRequest(
+        team_id="t",
+        date_from="2025-12-01",
+        date_to="2025-12-31",
+        employees=[Employee(id=f"e{e}", skills=[], availability=[]) for e in range(employees)],
+        open_shifts=shifts,
+        settings=OptimizeSettings(**settings),
+    )
+
+
+def test_headcount_expands_into_seats():
+    """A shift needing three gets three rows with its id, each for another employee."""
+    result = run_optimization(_request([_shift("till", headcount=3)], employees=4))
+
+    assert result.status == OptimizeStatus.OPTIMAL
+    assert [a.shift_id for a in result.assignments] == ["till"] * 3
+    assert len({a.employee_id for a in result.assignments}) == 3
+    assert result.diagnostics.total_shifts == 3 and result.diagnostics.unfilled_shifts == 0
+
+
+def test_unfilled_seats_are_counted_and_penalized():
+    result = run_optimization(_request([_shift("till", headcount=3)], employees=2, unassigned_penalty=50))
+
+    assert len(result.assignments) == 2
+    assert result.diagnostics.unfilled_shifts == 1
+    assert result.fitness == -50
+
+
+def test_identical_shifts_collapse_into_one():
+    """Ten copies of a shift build the model of one shift with ten seats."""
+    copies = ingest_request(_request([_shift(f"s{i}") for i in range(10)], employees=12))
+    counted = ingest_request(_request([_shift("s0", headcount=10)], employees=12))
+    pairs = [build_pairs(p, p.settings.weights) for p in (copies, counted)]
+
+    assert copies.num_shifts == counted.num_shifts == 1
+    assert copies.num_seats == counted.num_seats == 10
+    assert len(pairs[0]) == len(pairs[1]) == 12
+
+    result = run_optimization(_request([_shift(f"s{i}") for i in range(10)], employees=12))
+    assert [a.shift_id for a in result.assignments] == [f"s{i}" for i in range(10)]
+    assert len({a.employee_id for a in result.assignments}) == 10
+
+
+def test_shifts_that_differ_stay_apart():
+    shifts = [_shift("a"), _shift("b", start="10:00", end="18:00"), _shift("c", day=1), _shift("d")]
+
+    problem = ingest_request(_request(shifts, employees=2))
+
+    assert problem.shift_ids == ["a", "b", "c"]
+    assert problem.shift_seats == [[0, 3], [1], [2]]
+
+
+def test_previous_seats_are_kept():
+    """Employees keep the copy of a collapsed shift they held before."""
+    request = _request([_shift(f"s{i}") for i in range(3)], employees=3)
+    request.previous_assignments = [
+        AssignmentRef(shift_id="s0", employee_id="e2"),
+        AssignmentRef(shift_id="s1", employee_id="e0"),
+        AssignmentRef(shift_id="s2", employee_id="e1"),
+    ]
+
+    result = run_optimization(request)
+
+    assert {(a.shift_id, a.employee_id) for a in result.assignments} == {("s0", "e2"), ("s1", "e0"), ("s2", "e1")}
+
+
+def test_previous_seats_do_not_depend_on_listing_order():
+    """Requests that differ only in the order of previous assignments share a cache key and a roster."""
+    results = []
+    for order in (["s0", "s1"], ["s1", "s0"]):
+        request = _request([_shift("s0"), _shift("s1")], employees=1)
+        request.previous_assignments = [AssignmentRef(shift_id=s, employee_id="e0") for s in order]
+        results.append([(a.shift_id, a.employee_id) for a in run_optimization(request).assignments])
+
+    assert results[0] == results[1] == [("s0", "e0")]
+
+
+def test_locks_fill_some_seats():
+    """Locked employees take seats of a shift; the other seats stay open to everyone."""
+    request = _request([_shift("till", headcount=3)], employees=5)
+    request.locked_assignments = [
+        AssignmentRef(shift_id="till", employee_id="e3"),
+        AssignmentRef(shift_id="till", employee_id="e4"),
+    ]
+
+    result = run_optimization(request)
+
+    employees = [a.employee_id for a in result.assignments]
+    assert len(employees) == 3 and {"e3", "e4"} <= set(employees)
+
+    request.locked_assignments.append(AssignmentRef(shift_id="till", employee_id="e0"))
+    request.locked_assignments.append(AssignmentRef(shift_id="till", employee_id="e1"))
+    with pytest.raises(ValueError, match="more than 3 employees"):
+        run_optimization(request)
+
+
+def test_columnar_keeps_headcounts():
+    request = _request([_shift("a", headcount=2), _shift("b", day=1, headcount=3)], employees=4)
+
+    columnar = to_columnar(request)
+
+    assert columnar.shift_headcount == [2, 3]
+    assert [s.headcount for s in to_request(columnar).open_shifts] == [2, 3]
+    assert run_optimization(columnar).fitness == run_optimization(request).fitness
+
+
+def test_greedy_roster_respects_headcounts():
+    shifts = [_shift(f"d{day}", day=day, headcount=2 + day % 2) for day in range(5)]
+    request = _request(shifts, employees=4, mode=SolveMode.FAST)
+
+    result = run_optimization(request)
+
+    seats = Counter(a.shift_id for a in result.assignments)
+    assert seats == {s.id: s.headcount for s in shifts}
+    assert result.fitness == run_optimization(_request(shifts, employees=4)).fitness
+
+
+def test_rolling_horizon_fills_seats():
+    """Windows lock the committed seats of the day before, and no shift gets more than its headcount."""
+    shifts = [_shift(f"d{day}", day=day, headcount=2, start="18:00", end="02:00") for day in range(6)]
+    request = _request(shifts, employees=3, min_rest_hours=20, horizon_days=2, horizon_overlap_days=1)
+
+    result = run_optimization(request)
+
+    seats = Counter(a.shift_id for a in result.assignments)
+    assert max(seats.values()) <= 2
+    assert result.diagnostics.total_shifts == 12
+    # 16 hours between two nights are less than the rest, also across window boundaries
+    nights = {(a.employee_id, int(a.shift_id[1:])) for a in result.assignments}
+    assert not any((e, day + 1) in nights for e, day in nights)
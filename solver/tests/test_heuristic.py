@@ -0,0 +1,94 @@
+# solver/tests/test_heuristic.py
+# Tests for the greedy roster and its use as a fallback and fast mode
+
+import pytest
+from ortools.sat.python import cp_model
+
+from app.eligibility import build_pairs
+from app.heuristic import solve_heuristic
+from app.model_builder import fix_vars
+from app.models import AssignmentRef, OptimizeStatus, SolveMode
+from app.optimize import prepare_model, run_optimization
+from app.problem import ingest_request
+from tests.factories import make_request
+
+
+def _overnight(request):
+    """Turn every fifth shift into an overnight shift spilling into the next day."""
+    for shift in request.open_shifts[::5]:
+        shift.start_time, shift.end_time = "22:00", "06:00"
+    return request
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_greedy_roster_is_feasible_with_its_fitness(seed):
+    """Fixing the model to the greedy roster is feasible and scores the reported fitness."""
+    request = _overnight(make_request(num_employees=10, num_shifts=80, seed=seed))
+    problem = ingest_request(request)
+    pairs = build_pairs(problem, problem.settings.weights)
+    prepared = prepare_model(problem, pairs)
+    roster = prepared.heuristic
+
+    chosen = set(roster.chosen.tolist())
+    fix_vars(prepared.model, pairs.var[roster.chosen], 1)
+    fix_vars(prepared.model, pairs.var[[p for p in range(len(pairs)) if p not in chosen]], 0)
+    solver = cp_model.CpSolver()
+
+    assert solver.Solve(prepared.model) == cp_model.OPTIMAL
+    assert int(solver.ObjectiveValue()) == roster.fitness
+
+
+def test_local_repair_improves_on_greedy():
+    """The repair passes never lose fitness and stay below the exact optimum."""
+    request = make_request(num_employees=20, num_shifts=200, seed=2)
+    problem = ingest_request(request)
+    pairs = build_pairs(problem, problem.settings.weights)
+
+    greedy = solve_heuristic(problem, pairs, max_passes=0)
+    repaired = solve_heuristic(problem, pairs)
+
+    assert greedy.fitness < repaired.fitness <= run_optimization(request).fitness
+
+
+def test_conflicting_locks_have_no_greedy_roster():
+    """Two locks on overlapping shifts of one employee leave the exact solver to explain them."""
+    request = make_request(num_employees=4, num_shifts=10, seed=1)
+    first, second = request.open_shifts[:2]
+    second.day, second.start_time, second.end_time = first.day, first.start_time, first.end_time
+    employee_id = request.employees[0].id
+    request.locked_assignments = [
+        AssignmentRef(shift_id=first.id, employee_id=employee_id),
+        AssignmentRef(shift_id=second.id, employee_id=employee_id),
+    ]
+    problem = ingest_request(request)
+    pairs = build_pairs(problem, problem.settings.weights)
+
+    assert solve_heuristic(problem, pairs) is None
+
+    request.settings.mode = SolveMode.FAST
+    assert run_optimization(request).status == OptimizeStatus.INFEASIBLE
+
+
+def test_fast_mode_returns_greedy_roster():
+    """Fast mode skips CP-SAT and reports the greedy fitness."""
+    request = make_request(num_employees=20, num_shifts=200, seed=2)
+    exact = run_optimization(request)
+
+    request.settings.mode = SolveMode.FAST
+    fast = run_optimization(request)
+
+    assert fast.status == OptimizeStatus.FEASIBLE
+    assert fast.fitness == fast.diagnostics.heuristic_fitness == exact.diagnostics.heuristic_fitness
+    assert not fast.diagnostics.fallback
+
+
+def test_stopped_solve_falls_back_to_greedy_roster():
+    """A search stopped before any solution returns the greedy roster instead of nothing."""
+    request = make_request(num_employees=50, num_shifts=500, seed=3)
+
+    result = run_optimization(request, should_stop=lambda: True)
+
+    assert result.status == OptimizeStatus.FEASIBLE
+    assert result.diagnostics.fallback
+    assert result.assignments
+    assert result.fitness == result.diagnostics.heuristic_fitness
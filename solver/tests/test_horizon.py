@@ -0,0 +1,88 @@
+# solver/tests/test_horizon.py
+# Tests for rolling-horizon solving of long date ranges
+
+from collections import Counter
+from datetime import date
+
+from fastapi.testclient import TestClient
+
+from app.horizon import plan_windows
+from app.main import app
+from app.models import Employee, OpenShift, OptimizeRequest, OptimizeStatus
+from app.optimize import run_optimization
+from tests.factories import make_request
+
+
+def test_windows_overlap_and_commit_every_day_once():
+    """Consecutive windows share the overlap; committed days tile the range."""
+    windows = plan_windows(date(2025, 12, 1), date(2025, 12, 31), horizon_days=7, overlap_days=1)
+
+    assert [w.start.day for w in windows] == [1, 7, 13, 19, 25]
+    assert windows[-1].end == windows[-1].commit_end == date(2025, 12, 31)
+    for prev, nxt in zip(windows, windows[1:]):
+        assert prev.commit_end == nxt.start
+        assert (prev.end - nxt.start).days == 1
+
+
+def test_rolling_horizon_stitches_windows():
+    """Without cross-day constraints, stitched windows reach the whole-range optimum."""
+    request = make_request(num_employees=8, num_shifts=60, seed=4)
+    whole = run_optimization(request)
+
+    request.settings.horizon_days = 5
+    rolling = run_optimization(request)
+
+    assert rolling.status == OptimizeStatus.FEASIBLE
+    assert rolling.fitness == whole.fitness
+    windows = rolling.diagnostics.windows
+    assert len(windows) == 4
+    assert sum(w.total_shifts for w in windows) == len(request.open_shifts)
+    assert sum(w.assigned_shifts for w in windows) == rolling.diagnostics.assigned_shifts
+
+    day = {s.id: s.day for s in request.open_shifts}
+    assert len({a.shift_id for a in rolling.assignments}) == len(rolling.assignments)
+    per_day = Counter((a.employee_id, day[a.shift_id]) for a in rolling.assignments)
+    assert max(per_day.values()) <= request.settings.max_shifts_per_day
+    order = {s.id: i for i, s in enumerate(request.open_shifts)}
+    positions = [order[a.shift_id] for a in rolling.assignments]
+    assert positions == sorted(positions)
+
+
+def test_committed_assignments_constrain_next_window():
+    """An overnight shift kept by one window blocks an overlapping shift in the next."""
+    def shift(shift_id, day, start, end):
+        return OpenShift(
+            id=shift_id, day=day, shift_code="x", required_skills=[],
+            duration_hours=4, start_time=start, end_time=end,
+        )
+
+    request = OptimizeRequest(
+        team_id="t",
+        date_from="2025-12-01",
+        date_to="2025-12-03",
+        employees=[Employee(id="e1", skills=[], availability=[])],
+        open_shifts=[
+            shift("night", "2025-12-01", "22:00", "06:00"),
+            shift("early", "2025-12-02", "05:00", "09:00"),
+            shift("late", "2025-12-03", "14:00", "18:00"),
+        ],
+    )
+    request.settings.horizon_days = 2
+
+    result = run_optimization(request)
+
+    assert len(result.diagnostics.windows) == 2
+    assigned = {a.shift_id for a in result.assignments}
+    assert "late" in assigned
+    assert len(assigned & {"night", "early"}) == 1
+
+
+def test_invalid_horizon_is_a_validation_error():
+    """Windows that plan_windows cannot lay out are rejected with the request."""
+    client = TestClient(app)
+    body = make_request(num_employees=2, num_shifts=4, seed=1).model_dump(mode="json")
+
+    for horizon in ({"horizon_days": 0}, {"horizon_days": 3, "horizon_overlap_days": -1},
+                    {"horizon_days": 2, "horizon_overlap_days": 2}):
+        body["settings"] = horizon
+        assert client.post("/optimize", json=body).status_code == 422
@@ -0,0 +1,50 @@
+# solver/tests/test_intervals.py
+# Tests for sweep-line interval helpers
+
+import itertools
+import random
+
+from app.intervals import overlap_cliques
+
+
+def _overlaps(starts, ends, a, b):
+    return starts[a] < ends[b] and starts[b] < ends[a]
+
+
+def test_cliques_cover_every_overlapping_pair():
+    """Each clique is pairwise overlapping and every overlapping pair is covered."""
+    rng = random.Random(42)
+    starts = [rng.randint(0, 2000) for _ in range(200)]
+    ends = [start + rng.randint(30, 600) for start in starts]
+    shifts = sorted(range(len(starts)), key=lambda s: starts[s])
+
+    cliques = overlap_cliques(shifts, starts, ends)
+
+    covered = set()
+    for clique in cliques:
+        assert len(clique) > 1
+        for a, b in itertools.combinations(clique, 2):
+            assert _overlaps(starts, ends, a, b)
+            covered.add(frozenset((a, b)))
+
+    for a, b in itertools.combinations(range(len(starts)), 2):
+        if _overlaps(starts, ends, a, b):
+            assert frozenset((a, b)) in covered
+
+
+def test_touching_intervals_do_not_overlap():
+    """Back-to-back shifts are not grouped together."""
+    starts = [0, 60, 120]
+    ends = [60, 120, 180]
+
+    assert overlap_cliques([0, 1, 2], starts, ends) == []
+
+
+def test_nested_intervals_form_one_clique():
+    """Intervals all overlapping one long interval form a single group per point."""
+    starts = [0, 10, 20, 100]
+    ends = [500, 50, 60, 120]
+
+    cliques = overlap_cliques([0, 1, 2, 3], starts, ends)
+
+    assert sorted(map(sorted, cliques)) == [[0, 1, 2], [0, 3]]
@@ -0,0 +1,99 @@
+# solver/tests/test_jobs.py
+# Tests for background solve jobs on the process pool
+
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import jobs
+from app.jobs import JobFinishedError, JobManager, QueueFullError
+from app.main import app
+from app.models import JobStatus, OptimizeStatus
+from tests.factories import make_request
+
+client = TestClient(app)
+
+
+@pytest.fixture(scope="module")
+def manager():
+    # One worker and one queue slot, so the bounds are easy to hit
+    manager = JobManager(max_workers=1, queue_size=1)
+    yield manager
+    manager.shutdown()
+
+
+def _small_request():
+    return make_request(num_employees=4, num_shifts=8, seed=1)
+
+
+def _slow_request():
+    request = make_request(num_employees=100, num_shifts=1400, seed=1)
+    request.settings.timeout_seconds = 60
+    return request
+
+
+def _wait_for(manager, job_id, statuses, timeout=60.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = manager.get(job_id)
+        if job.status in statuses:
+            return job
+        time.sleep(0.1)
+    raise AssertionError(f"job {job_id} still {job.status} after {timeout}s")
+
+
+def test_job_completes_with_result(manager):
+    """A submitted job runs in the pool and reports the optimization result."""
+    job = manager.submit(_small_request())
+    assert job.status in (JobStatus.QUEUED, JobStatus.RUNNING)
+
+    job = manager.wait(job.job_id, timeout=60.0)
+
+    assert job.status == JobStatus.COMPLETED
+    assert job.result.status == OptimizeStatus.OPTIMAL
+    assert job.started_at is not None and job.finished_at is not None
+    with pytest.raises(JobFinishedError):
+        manager.cancel(job.job_id)
+
+
+def test_queue_bound_and_cancellation(manager):
+    """A full queue rejects jobs; cancelling frees both the queue and the worker."""
+    running = manager.submit(_slow_request())
+    queued = manager.submit(_small_request())
+    with pytest.raises(QueueFullError):
+        manager.submit(_small_request())
+
+    assert manager.cancel(queued.job_id).status == JobStatus.CANCELLED
+    _wait_for(manager, running.job_id, [JobStatus.RUNNING])
+    started = time.time()
+    assert manager.cancel(running.job_id).status == JobStatus.CANCELLED
+
+    # Both cancelled jobs hold their slots until their worker lets go; the
+    # running solve stops early, so the next job finishes long before the
+    # cancelled one would have
+    manager.wait(queued.job_id, timeout=15.0)
+    manager.wait(running.job_id, timeout=15.0)
+    job = manager.submit(_small_request())
+    job = manager.wait(job.job_id, timeout=15.0)
+    assert job.status == JobStatus.COMPLETED
+    assert time.time() - started < 15.0
+    assert manager.get(running.job_id).status == JobStatus.CANCELLED
+
+
+def test_jobs_api(manager, monkeypatch):
+    """Submit, poll and cancel through the HTTP endpoints."""
+    monkeypatch.setattr(jobs, "_manager", manager)
+
+    response = client.post("/jobs", json=_small_request().model_dump())
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    manager.wait(job_id, timeout=60.0)
+    body = client.get(f"/jobs/{job_id}").json()
+    assert body["status"] == "COMPLETED"
+    assert body["result"]["status"] == "OPTIMAL"
+
+    assert client.delete(f"/jobs/{job_id}").status_code == 409
+    assert client.get("/jobs/missing").status_code == 404
+    assert client.delete("/jobs/missing").status_code == 404
@@ -0,0 +1,147 @@
+# solver/tests/test_labor_rules.py
+# Tests for the shifts-per-day cap, the weekly hours cap and the minimum rest
+
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+from app.constraints import weekly_hours
+from app.eligibility import build_pairs
+from app.models import AssignmentRef, Employee, OpenShift, OptimizeRequest, OptimizeSettings, OptimizeStatus, SolveMode
+from app.optimize import run_optimization
+from app.problem import ingest_request
+from benchmarks.workload import WorkloadSpec, generate_request
+
+
+def _shift(shift_id: str, day: int, start: str, end: str, hours: float = 8) -> OpenShift:
+    return OpenShift(
+        id=shift_id, day=(date(2025, 12, 1) + timedelta(days=day)).isoformat(), shift_code="x",
+        required_skills=[], duration_hours=hours, start_time=start, end_time=end,
+    )
+
+
+def _request(shifts, employees: int = 1, **settings) -> OptimizeRequest:
+    return OptimizeRequest(
+        team_id="t",
+        date_from="2025-12-01",
+        date_to="2025-12-31",
+        employees=[Employee(id=f"e{e}", skills=[], availability=[]) for e in range(employees)],
+        open_shifts=shifts,
+        settings=OptimizeSettings(**settings),
+    )
+
+
+def _week_hours(request: OptimizeRequest, assignments) -> int:
+    """Most hours any employee works in 7 consecutive days."""
+    shifts = {s.id: s for s in request.open_shifts}
+    worked = Counter()
+    for a in assignments:
+        shift = shifts[a.shift_id]
+        day = date.fromisoformat(shift.day)
+        for first in range(7):
+            worked[(a.employee_id, day - timedelta(days=first))] += shift.duration_hours
+    return max(worked.values(), default=0)
+
+
+def test_max_shifts_per_day_is_a_count():
+    """Three short shifts on one day: two are worked with a cap of two."""
+    shifts = [_shift("a", 0, "06:00", "10:00", 4), _shift("b", 0, "11:00", "15:00", 4), _shift("c", 0, "16:00", "20:00", 4)]
+
+    assert len(run_optimization(_request(shifts, max_shifts_per_day=2)).assignments) == 2
+    assert len(run_optimization(_request(shifts, max_shifts_per_day=3)).assignments) == 3
+
+
+def test_min_rest_spans_midnight():
+    """A night shift and the next morning's shift need the rest between them."""
+    shifts = [_shift("night", 0, "18:00", "02:00"), _shift("morning", 1, "10:00", "14:00", 4)]
+
+    assert len(run_optimization(_request(shifts)).assignments) == 2
+    assert len(run_optimization(_request(shifts, min_rest_hours=11)).assignments) == 1
+    assert len(run_optimization(_request(shifts, min_rest_hours=8)).assignments) == 2
+
+
+def test_weekly_hours_cap_rolls():
+    """Every window of 7 consecutive days stays under the cap, not just calendar weeks."""
+    shifts = [_shift(f"s{day}", day, "09:00", "17:00") for day in range(14)]
+    request = _request(shifts, max_hours_per_week=24)
+
+    result = run_optimization(request)
+
+    assert result.status == OptimizeStatus.OPTIMAL
+    assert len(result.assignments) == 6
+    assert _week_hours(request, result.assignments) <= 24
+
+
+def test_weekly_windows_only_where_the_cap_binds():
+    """Employee-days that cannot exceed the cap get no sum and no window."""
+    shifts = [_shift(f"s{day}", day, "09:00", "17:00") for day in range(10)]
+    shifts.append(_shift("later", 25, "09:00", "17:00"))
+
+    loose = ingest_request(_request(shifts, max_hours_per_week=100))
+    tight = ingest_request(_request(shifts, max_hours_per_week=24))
+    windows = [weekly_hours(p, build_pairs(p, p.settings.weights)) for p in (loose, tight)]
+
+    assert windows[0].windows == []
+    # Windows from days 0-3 reach three days past the cap; later ones hold fewer shifts than the one before
+    assert windows[1].window_start == ["2025-12-01", "2025-12-02", "2025-12-03", "2025-12-04"]
+    assert len(windows[1].day_pairs) == 10
+
+
+def test_greedy_roster_follows_the_rules():
+    request = generate_request(WorkloadSpec(employees=15, days=14, shifts_per_day=12, overnight_share=0.3), seed=5)
+    request.settings = OptimizeSettings(
+        mode=SolveMode.FAST, max_shifts_per_day=2, max_hours_per_week=30, min_rest_hours=10
+    )
+
+    result = run_optimization(request)
+
+    shifts = {s.id: s for s in request.open_shifts}
+    per_day = Counter((a.employee_id, shifts[a.shift_id].day) for a in result.assignments)
+    assert result.assignments and max(per_day.values()) <= 2
+    assert _week_hours(request, result.assignments) <= 30
+    last_end = {}
+    for a in sorted(result.assignments, key=lambda a: datetime.fromisoformat(a.start)):
+        if a.employee_id in last_end:
+            rest = datetime.fromisoformat(a.start) - last_end[a.employee_id]
+            assert rest >= timedelta(hours=10)
+        last_end[a.employee_id] = datetime.fromisoformat(a.end)
+
+
+def test_locks_over_the_weekly_cap_explained():
+    """Locks beyond the weekly cap give an unsat core naming the cap, and a suggestion."""
+    shifts = [_shift(f"s{day}", day, "09:00", "17:00") for day in range(4)]
+    request = _request(shifts, max_hours_per_week=24)
+    request.locked_assignments = [AssignmentRef(shift_id=s.id, employee_id="e0") for s in shifts]
+
+    result = run_optimization(request)
+
+    assert result.status == OptimizeStatus.INFEASIBLE
+    assert any(name.startswith("max_hours_per_week:e0:") for name in result.diagnostics.unsat_core)
+    assert any(s.type == "raise_max_hours_per_week" for s in result.suggestions)
+    assert "max_hours_per_week:e0:2025-12-01" in result.relaxed_solution.relaxed_constraints
+
+
+def test_rolling_horizon_carries_weekly_hours():
+    """Windows see the hours committed in the six days before them."""
+    shifts = [_shift(f"s{day}", day, "09:00", "17:00") for day in range(14)]
+    request = _request(shifts, max_hours_per_week=24, horizon_days=4, horizon_overlap_days=1)
+
+    result = run_optimization(request)
+
+    assert _week_hours(request, result.assignments) <= 24
+
+
+def test_weekly_cap_leaves_the_day_cap_droppable():
+    """With a weekly cap too, locks over the day cap are explained by, and relaxed through, the day cap."""
+    shifts = [_shift("a", 0, "06:00", "10:00", 4), _shift("b", 0, "11:00", "15:00", 4), _shift("c", 1, "09:00", "17:00")]
+    # With day 1 the window can exceed the cap, so day 0 gets its minutes variable
+    request = _request(shifts, max_hours_per_week=10)
+    request.locked_assignments = [AssignmentRef(shift_id=s.id, employee_id="e0") for s in shifts[:2]]
+
+    result = run_optimization(request)
+
+    assert result.status == OptimizeStatus.INFEASIBLE
+    assert "max_shifts_per_day:e0:2025-12-01" in result.diagnostics.unsat_core
+    dropped = result.relaxed_solution.relaxed_constraints
+    assert "max_shifts_per_day:e0:2025-12-01" in dropped
+    assert not any(name.startswith("locked:") for name in dropped)
+    assert len(result.relaxed_solution.assignments) == 2
@@ -0,0 +1,84 @@
+# solver/tests/test_metrics.py
+# Tests for solve statistics and the /metrics endpoint
+
+import re
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.metrics import Counter, Histogram, Registry
+from app.models import SolveMode
+from app.optimize import run_optimization
+from tests.factories import make_request
+
+client = TestClient(app)
+
+
+def _sample(text: str, name: str) -> float:
+    """Value of one sample line of rendered metrics; 0 when absent."""
+    match = re.search(rf"^{re.escape(name)} (\S+)$", text, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+def test_registry_renders_exposition_format():
+    """Counters by label and cumulative histogram buckets with sum and count."""
+    registry = Registry()
+    counter = registry.register(Counter("demo_total", "Demo counter", ["status"]))
+    histogram = registry.register(Histogram("demo_seconds", "Demo histogram", [0.1, 1]))
+    counter.inc(status="OPTIMAL")
+    counter.inc(2, status="OPTIMAL")
+    for value in (0.05, 0.5, 5):
+        histogram.observe(value)
+
+    text = registry.render()
+
+    assert "# TYPE demo_total counter" in text
+    assert _sample(text, 'demo_total{status="OPTIMAL"}') == 3
+    assert _sample(text, 'demo_seconds_bucket{le="0.1"}') == 1
+    assert _sample(text, 'demo_seconds_bucket{le="1"}') == 2
+    assert _sample(text, 'demo_seconds_bucket{le="+Inf"}') == 3
+    assert _sample(text, "demo_seconds_sum") == 5.55
+    assert _sample(text, "demo_seconds_count") == 3
+
+
+def test_stats_cover_sizes_and_phases(monkeypatch):
+    """Sizes are the request's; split problems add up their parts' models."""
+    monkeypatch.setenv("SOLVER_DECOMPOSE", "1")
+    request = make_request(num_employees=20, num_shifts=200, seed=2)
+    request.employees[0].skills = ["forklift"]
+    request.open_shifts[0].required_skills = ["forklift"]
+
+    result = run_optimization(request)
+    fast = run_optimization(request.model_copy(update={
+        "settings": request.settings.model_copy(update={"mode": SolveMode.FAST})
+    }))
+
+    assert result.diagnostics.subproblems >= 2
+    assert (result.stats.employees, result.stats.shifts) == (20, 200)
+    assert result.stats.variables > 200 and result.stats.constraints > 0
+    assert result.stats.build_seconds > 0 and result.stats.solve_seconds > 0
+    assert fast.stats.variables == 0 and fast.stats.build_seconds > 0
+
+
+def test_metrics_endpoint_counts_solves():
+    """A solve and a cache hit show up as counts, histograms and cache counters."""
+    before = client.get("/metrics").text
+    request = make_request(num_employees=6, num_shifts=20, seed=11)
+
+    for _ in range(2):
+        assert client.post("/optimize", content=request.model_dump_json()).status_code == 200
+    response = client.get("/metrics")
+    after = response.text
+
+    assert response.headers["content-type"].startswith("text/plain")
+
+    def delta(name: str) -> float:
+        return _sample(after, name) - _sample(before, name)
+
+    assert delta('solver_solves_total{status="OPTIMAL",cached="false"}') == 1
+    assert delta('solver_solves_total{status="OPTIMAL",cached="true"}') == 1
+    assert delta("solver_solve_seconds_count") == 1
+    assert delta('solver_request_shifts_bucket{le="30"}') == 1
+    assert delta('solver_cache_hits_total{tier="result"}') == 1
+    assert _sample(after, 'solver_solves_in_flight{source="request"}') == 0
+    assert _sample(after, 'solver_jobs{state="queued"}') == 0
@@ -0,0 +1,51 @@
+# solver/tests/test_model_builder.py
+# Tests for bulk CP-SAT model construction
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from app.eligibility import build_pairs
+from app.model_builder import add_at_most_one, add_exactly_one, new_bool_vars, set_objective
+from app.problem import ingest_request
+from benchmarks.bench_model_build import build_bulk_model, build_expression_model, make_request
+
+
+def _solve(model: cp_model.CpModel) -> cp_model.CpSolver:
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = 10
+    assert solver.Solve(model) == cp_model.OPTIMAL
+    return solver
+
+
+def test_bulk_model_matches_expression_model():
+    """Both build paths produce the same model optimum."""
+    problem = ingest_request(make_request(num_employees=8, num_shifts=40, seed=3))
+    pairs = build_pairs(problem, problem.settings.weights)
+
+    expression = _solve(build_expression_model(problem, pairs))
+    bulk = _solve(build_bulk_model(problem, pairs))
+
+    assert bulk.ObjectiveValue() == expression.ObjectiveValue()
+
+
+def test_maximize_objective_reports_original_sign():
+    """A maximized objective is reported in its original, unnegated scale."""
+    model = cp_model.CpModel()
+    x = new_bool_vars(model, 3)
+    add_exactly_one(model, x[:2].tolist())
+    add_at_most_one(model, x[1:].tolist())
+    set_objective(model, x, np.array([5, 7, -2], dtype=np.int64), maximize=True)
+
+    solver = _solve(model)
+
+    assert solver.ObjectiveValue() == 7
+
+
+def test_set_objective_replaces_previous_objective():
+    """Setting a new objective clears the old one."""
+    model = cp_model.CpModel()
+    x = new_bool_vars(model, 2)
+    set_objective(model, x, np.array([1, 1], dtype=np.int64), maximize=True)
+    set_objective(model, x, np.array([1, 1], dtype=np.int64), maximize=False)
+
+    assert _solve(model).ObjectiveValue() == 0
@@ -1,34 +1,38 @@
 # solver/tests/test_optimize.py
 # Unit and integration tests for the OR-Tools constraint solver
 
+import json
+from datetime import datetime, timezone
+
 import pytest
 from fastapi.testclient import TestClient
-from datetime import datetime, timedelta
 
+from app.availability import AvailabilityIndex
 from app.main import app
 from app.models import (
-    OptimizeRequest,
+    AvailabilityType,
+    AvailabilityWindow,
     Employee,
     OpenShift,
-    AvailabilityWindow,
-    AvailabilityType,
+    OptimizeRequest,
     OptimizeSettings,
     OptimizeWeights,
-    OptimizeStatus,
-)
-from app.optimize import (
-    run_optimization,
-    has_required_skills,
-    get_availability_for_shift,
-    check_availability_overlap,
 )
-
+from app.optimize import run_optimization
+from app.skills import SkillTable, covers
+from app.timeline import format_minutes, resolve_timezone, shift_epoch_minutes, to_epoch_minutes
+from tests.factories import make_request
 
 client = TestClient(app)
 
 
 class TestConstraintHelpers:
-    """Test helper functions for constraint checking."""
+    """Test the skill and availability checks behind eligibility."""
+
+    def _has_skills(self, employee, required_skills):
+        table = SkillTable()
+        employee_words = table.pack([table.intern_mask(employee.skills)])
+        return bool(covers(employee_words, table.pack([table.intern_mask(required_skills)]))[0, 0])
 
     def test_has_required_skills_all_skills(self):
         """Employee with all required skills should pass."""
@@ -38,8 +42,8 @@ class TestConstraintHelpers:
             availability=[],
             preferences={},
         )
-        assert has_required_skills(employee, ["skill_cashier"]) is True
-        assert has_required_skills(employee, ["skill_cashier", "skill_forklift"]) is True
+        assert self._has_skills(employee, ["skill_cashier"]) is True
+        assert self._has_skills(employee, ["skill_cashier", "skill_forklift"]) is True
 
     def test_has_required_skills_missing_skills(self):
         """Employee missing required skills should fail."""
@@ -49,8 +53,8 @@ class TestConstraintHelpers:
             availability=[],
             preferences={},
         )
-        assert has_required_skills(employee, ["skill_forklift"]) is False
-        assert has_required_skills(employee, ["skill_cashier", "skill_forklift"]) is False
+        assert self._has_skills(employee, ["skill_forklift"]) is False
+        assert self._has_skills(employee, ["skill_cashier", "skill_forklift"]) is False
 
     def test_has_required_skills_no_requirements(self):
         """No skill requirements should always pass."""
@@ -60,7 +64,13 @@ class TestConstraintHelpers:
             availability=[],
             preferences={},
         )
-        assert has_required_skills(employee, []) is True
+        assert self._has_skills(employee, []) is True
+
+    def _lookup(self, avail):
+        employee = Employee(id="e1", skills=[], availability=[avail], preferences={})
+        index = AvailabilityIndex.from_employees([employee], timezone.utc)
+        start, end = shift_epoch_minutes("2025-12-01", "09:00", "13:00", 4, timezone.utc)
+        return index.lookup(0, start, end)
 
     def test_availability_overlap_contained(self):
         """Availability window that fully contains shift should match."""
@@ -69,12 +79,7 @@ class TestConstraintHelpers:
             end="2025-12-01T18:00:00",
             type=AvailabilityType.PREFERRED,
         )
-        shift_start = datetime(2025, 12, 1, 9, 0)
-        shift_end = datetime(2025, 12, 1, 13, 0)
-        
-        overlaps, avail_type = check_availability_overlap(avail, shift_start, shift_end)
-        assert overlaps is True
-        assert avail_type == AvailabilityType.PREFERRED
+        assert self._lookup(avail) == AvailabilityType.PREFERRED
 
     def test_availability_overlap_partial(self):
         """Partial overlap should not match (we need full containment)."""
@@ -83,11 +88,92 @@ class TestConstraintHelpers:
             end="2025-12-01T14:00:00",
             type=AvailabilityType.PREFERRED,
         )
-        shift_start = datetime(2025, 12, 1, 9, 0)
-        shift_end = datetime(2025, 12, 1, 13, 0)
-        
-        overlaps, _ = check_availability_overlap(avail, shift_start, shift_end)
-        assert overlaps is False  # Partial overlap doesn't count as covering
+        assert self._lookup(avail) is None  # Partial overlap doesn't count as covering
+
+
+class TestAvailabilityIndex:
+    """Test the pre-parsed availability index used by the solver."""
+
+    def _employee(self, windows):
+        return Employee(
+            id="e1",
+            skills=[],
+            availability=[
+                AvailabilityWindow(start=start, end=end, type=avail_type)
+                for start, end, avail_type in windows
+            ],
+            preferences={},
+        )
+
+    def _minutes(self, day, hour):
+        return to_epoch_minutes(datetime(2025, 12, day, hour, 0), timezone.utc)
+
+    def test_lookup_picks_covering_window(self):
+        """A shift gets the type of the window covering it, or None without one."""
+        employee = self._employee([
+            ("2025-12-02T08:00:00", "2025-12-02T18:00:00", AvailabilityType.AVOIDED),
+            ("2025-12-01T08:00:00", "2025-12-01T12:00:00", AvailabilityType.PREFERRED),
+            ("2025-12-01T12:00:00", "2025-12-01T20:00:00", AvailabilityType.BLACKOUT),
+        ])
+        index = AvailabilityIndex.from_employees([employee], timezone.utc)
+        expected = {
+            (1, 9, 11): AvailabilityType.PREFERRED,
+            (1, 13, 17): AvailabilityType.BLACKOUT,
+            (2, 9, 11): AvailabilityType.AVOIDED,
+            (2, 13, 17): AvailabilityType.AVOIDED,
+            (2, 10, 14): AvailabilityType.AVOIDED,
+        }
+
+        for day in (1, 2, 3):
+            for start_hour, end_hour in ((9, 11), (13, 17), (10, 14)):
+                assert index.lookup(
+                    0, self._minutes(day, start_hour), self._minutes(day, end_hour)
+                ) == expected.get((day, start_hour, end_hour))
+
+    def test_lookup_first_listed_window_wins(self):
+        """When several windows cover a shift, the first one listed wins."""
+        employee = self._employee([
+            ("2025-12-01T10:00:00", "2025-12-01T14:00:00", AvailabilityType.PREFERRED),
+            ("2025-12-01T06:00:00", "2025-12-01T22:00:00", AvailabilityType.AVOIDED),
+        ])
+        index = AvailabilityIndex.from_employees([employee], timezone.utc)
+
+        assert index.lookup(0, self._minutes(1, 11), self._minutes(1, 13)) == AvailabilityType.PREFERRED
+        assert index.lookup(0, self._minutes(1, 7), self._minutes(1, 9)) == AvailabilityType.AVOIDED
+
+    def test_lookup_mixes_offsets_and_local_time(self):
+        """Offset-aware windows compare correctly against local shift times."""
+        employee = self._employee([
+            ("2025-12-01T03:30:00Z", "2025-12-01T11:30:00Z", AvailabilityType.PREFERRED),
+        ])
+        kolkata = resolve_timezone("Asia/Kolkata")
+        index = AvailabilityIndex.from_employees([employee], kolkata)
+
+        start, end = shift_epoch_minutes("2025-12-01", "09:00", "17:00", 8, kolkata)
+        assert index.lookup(0, start, end) == AvailabilityType.PREFERRED
+
+
+class TestTimeline:
+    """Test epoch-minute conversion of shift times."""
+
+    def test_overnight_shift_ends_next_day(self):
+        """An end time at or before the start rolls over to the next day."""
+        start, end = shift_epoch_minutes("2025-12-01", "22:00", "06:00", 8, timezone.utc)
+        assert end - start == 8 * 60
+        assert format_minutes(end, timezone.utc) == "2025-12-02T06:00:00"
+
+    def test_overnight_shift_across_dst_change(self):
+        """Durations are measured in real minutes across DST transitions."""
+        berlin = resolve_timezone("Europe/Berlin")
+        start, end = shift_epoch_minutes("2025-10-25", "22:00", "06:00", 8, berlin)
+        assert end - start == 9 * 60
+        assert format_minutes(start, berlin) == "2025-10-25T22:00:00"
+
+    def test_default_shift_start(self):
+        """Shifts without times start at 09:00 local and last duration_hours."""
+        start, end = shift_epoch_minutes("2025-12-01", None, None, 4.5, timezone.utc)
+        assert format_minutes(start, timezone.utc) == "2025-12-01T09:00:00"
+        assert end - start == 270
 
 
 class TestOptimizationConstraints:
@@ -276,6 +362,83 @@ class TestOptimizationConstraints:
         assert len(e1_assignments) <= 1
 
 
+    def test_solver_no_overlap_for_overnight_shift(self):
+        """An overnight shift blocks an overlapping shift on the next day."""
+        request = OptimizeRequest(
+            team_id="team-1",
+            date_from="2025-12-01",
+            date_to="2025-12-02",
+            employees=[
+                Employee(id="e1", skills=["skill_guard"], availability=[], preferences={})
+            ],
+            open_shifts=[
+                OpenShift(
+                    id="night",
+                    day="2025-12-01",
+                    shift_code="shift_night",
+                    required_skills=["skill_guard"],
+                    duration_hours=8,
+                    start_time="22:00",
+                    end_time="06:00",
+                ),
+                OpenShift(
+                    id="early",
+                    day="2025-12-02",
+                    shift_code="shift_early",
+                    required_skills=["skill_guard"],
+                    duration_hours=4,
+                    start_time="04:00",
+                    end_time="08:00",
+                ),
+            ],
+            settings=OptimizeSettings(max_shifts_per_day=1),
+        )
+
+        result = run_optimization(request)
+
+        assert len(result.assignments) == 1
+        assert result.diagnostics.unfilled_shifts == 1
+
+    def test_solver_reads_shift_times_in_request_timezone(self):
+        """Shift wall-clock times are compared in the request timezone."""
+        request = OptimizeRequest(
+            team_id="team-1",
+            date_from="2025-12-01",
+            date_to="2025-12-01",
+            timezone="Asia/Kolkata",
+            employees=[
+                Employee(
+                    id="e1",
+                    skills=["skill_cashier"],
+                    availability=[
+                        AvailabilityWindow(
+                            start="2025-12-01T03:30:00Z",  # 09:00 in Kolkata
+                            end="2025-12-01T07:30:00Z",
+                            type=AvailabilityType.BLACKOUT,
+                        )
+                    ],
+                    preferences={},
+                )
+            ],
+            open_shifts=[
+                OpenShift(
+                    id="s1",
+                    day="2025-12-01",
+                    shift_code="shift_morning",
+                    required_skills=["skill_cashier"],
+                    duration_hours=4,
+                    start_time="09:00",
+                    end_time="13:00",
+                )
+            ],
+        )
+
+        result = run_optimization(request)
+
+        assert len(result.assignments) == 0
+        assert result.diagnostics.unfilled_shifts == 1
+
+
 class TestOptimizationEndToEnd:
     """End-to-end integration tests for the optimization API."""
 
@@ -333,6 +496,8 @@ class TestOptimizationEndToEnd:
         assert data["assignments"][0]["employee_id"] == "e1"
         assert data["diagnostics"]["assigned_shifts"] == 1
         assert data["diagnostics"]["unfilled_shifts"] == 0
+        # PREFERRED weight plus the employee's shift_morning preference
+        assert data["fitness"] == 20
 
     def test_optimize_endpoint_infeasible(self):
         """Optimization with no feasible solution should return INFEASIBLE with diagnostics."""
@@ -362,6 +527,36 @@ class TestOptimizationEndToEnd:
         # With no employees, all shifts unfilled but model is still "optimal" (just bad score)
         assert data["diagnostics"]["unfilled_shifts"] == 1
 
+    def test_optimize_endpoint_rejects_unknown_locks(self):
+        """Locks the request cannot satisfy are a client error, not a server error."""
+        request = make_request(num_employees=3, num_shifts=4, seed=1)
+        shift_id = request.open_shifts[0].id
+        for locks in (
+            [{"shift_id": "missing", "employee_id": "e0"}],
+            [{"shift_id": shift_id, "employee_id": "nobody"}],
+            [{"shift_id": shift_id, "employee_id": "e0"}, {"shift_id": shift_id, "employee_id": "e1"}],
+        ):
+            body = request.model_dump(mode="json")
+            body["locked_assignments"] = locks
+
+            response = client.post("/optimize", json=body)
+            assert response.status_code == 400
+            assert "locked" in response.json()["detail"].lower()
+
+    def test_optimize_endpoint_rejects_unknown_timezone(self):
+        """An unknown zone name fails validation on both request forms."""
+        body = make_request(num_employees=2, num_shifts=2, seed=1).model_dump(mode="json")
+        body["timezone"] = "Mars/Olympus_Mons"
+
+        response = client.post("/optimize", json=body)
+        assert response.status_code == 422
+        assert "Unknown timezone" in json.dumps(response.json())
+        response = client.post("/optimize/columnar", json={
+            "team_id": "t", "date_from": "2025-12-01", "date_to": "2025-12-01",
+            "timezone": "Mars/Olympus_Mons", "employee_ids": [], "shift_ids": [],
+        })
+        assert response.status_code == 422
+
     def test_example_payload_from_docs(self):
         """Test with the example payload from documentation."""
         # This mirrors the example from infra/examples/optimize-request.json
@@ -440,6 +635,35 @@ class TestOptimizationEndToEnd:
         assert "shift-001" in assigned_shift_ids
         assert "shift-002" in assigned_shift_ids
 
+    def test_incumbents_improve_up_to_final_fitness(self):
+        """Each published incumbent improves on the last and the last matches the result."""
+        request = make_request(num_employees=10, num_shifts=60, seed=5)
+        incumbents = []
+
+        result = run_optimization(request, on_solution=incumbents.append)
+
+        assert incumbents
+        fitnesses = [incumbent.fitness for incumbent in incumbents]
+        assert fitnesses == sorted(set(fitnesses))
+        assert fitnesses[-1] == result.fitness
+        assert incumbents[-1].assigned_shifts == len(incumbents[-1].assignments)
+
+    def test_optimize_stream_endpoint(self):
+        """The stream emits incumbents as NDJSON lines, then the final result."""
+        request = make_request(num_employees=10, num_shifts=60, seed=5)
+
+        with client.stream("POST", "/optimize/stream", json=request.model_dump()) as response:
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("application/x-ndjson")
+            events = [json.loads(line) for line in response.iter_lines() if line]
+
+        assert [event["type"] for event in events[:-1]] == ["incumbent"] * (len(events) - 1)
+        assert len(events) > 1
+        final = events[-1]
+        assert final["type"] == "result"
+        assert final["result"]["status"] == "OPTIMAL"
+        assert final["result"]["fitness"] == events[-2]["incumbent"]["fitness"]
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
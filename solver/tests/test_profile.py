@@ -0,0 +1,80 @@
+# solver/tests/test_profile.py
+# Tests for per-phase profiles in diagnostics
+
+import pytest
+
+from app.models import AssignmentRef, OptimizeStatus
+from app.optimize import run_optimization
+from app.solver_log import SolverLog
+from tests.factories import make_request
+
+LOG = """\
+Starting presolve at 0.01s
+Presolved optimization model '': (model_fingerprint: 0xf9f92f7b6b059831)
+#Variables: 19'941 (#bools: 399 in objective) (399 primary variables)
+  - 399 Booleans in [0,1]
+#kAtMostOne: 138 (#literals: 764)
+#kBoolAnd: 24 (#enforced: 24) (#literals: 48)
+[Symmetry] Graph for symmetry has 635 nodes and 910 arcs.
+
+#Bound   0.02s best:-inf  next:[-5051,33434] initial_domain
+Starting search at 0.25s with 1 workers.
+#1       0.30s best:322   next:[323,332]  main
+#2       0.40s best:324   next:[325,332]  main
+#Done    0.40s main
+"""
+
+
+def test_solver_log_figures():
+    """Presolve time, presolved model size and incumbents are read from the log."""
+    lines = []
+    log = SolverLog(forward=lines.append)
+    log(LOG)
+
+    assert log.presolve_seconds == pytest.approx(0.24)
+    assert log.presolved_variables == 19941
+    assert log.presolved_constraints == 162
+    assert log.incumbents == 2
+    assert len(lines) == len(LOG.splitlines())
+
+
+def test_profile_is_opt_in():
+    """Without settings.profile the diagnostics carry no profile."""
+    request = make_request(num_employees=6, num_shifts=20, seed=1)
+
+    assert run_optimization(request).diagnostics.profile is None
+
+
+def test_profile_of_an_optimal_solve():
+    """Every phase is timed, CP-SAT figures are read and an optimum has no gap."""
+    request = make_request(num_employees=20, num_shifts=200, seed=2)
+    request.settings.profile = True
+
+    result = run_optimization(request)
+    profile = result.diagnostics.profile
+
+    assert result.status == OptimizeStatus.OPTIMAL
+    for phase in ("ingest", "eligibility", "constraints", "objective", "heuristic", "presolve", "search", "extraction"):
+        assert profile.phases_ms[phase] >= 0
+    assert sum(profile.phases_ms.values()) <= result.diagnostics.solve_time_ms + 1
+    assert profile.variables > profile.presolved_variables > 0
+    assert profile.incumbents >= 1
+    assert profile.best_bound == result.fitness and profile.gap == 0
+
+
+def test_profile_of_an_infeasible_solve():
+    """Conflicting locks add the unsat core and relaxed solve phases."""
+    request = make_request(num_employees=4, num_shifts=10, seed=1)
+    first, second = request.open_shifts[:2]
+    second.day, second.start_time, second.end_time = first.day, first.start_time, first.end_time
+    request.locked_assignments = [
+        AssignmentRef(shift_id=first.id, employee_id="e0"),
+        AssignmentRef(shift_id=second.id, employee_id="e0"),
+    ]
+    request.settings.profile = True
+
+    result = run_optimization(request)
+
+    assert result.status == OptimizeStatus.INFEASIBLE
+    assert {"unsat_core", "relaxed"} <= set(result.diagnostics.profile.phases_ms)
+    assert result.diagnostics.profile.gap is None
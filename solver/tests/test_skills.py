@@ -0,0 +1,54 @@
+# solver/tests/test_skills.py
+# Tests for interned skill bitmasks
+
+from app.models import OptimizeRequest, Employee, OpenShift
+from app.optimize import build_suggestions
+from app.problem import ingest_request
+from app.skills import SkillTable, covers
+
+
+def test_intern_and_names_round_trip():
+    """Interned masks decode back to the same skills, in id order."""
+    table = SkillTable()
+    mask = table.intern_mask(["forklift", "cashier"])
+
+    assert len(table) == 2
+    assert table.names(mask) == ["forklift", "cashier"]
+    assert table.mask(["cashier", "unknown"]) == 1 << table.intern("cashier")
+
+
+def test_pack_and_covers_beyond_64_skills():
+    """Packed words keep skills above bit 63 and the subset check holds."""
+    table = SkillTable()
+    everything = table.intern_mask(f"skill_{i}" for i in range(130))
+    low = table.mask(f"skill_{i}" for i in range(64))
+    needs_high = table.mask(["skill_0", "skill_129"])
+
+    words = table.pack([everything, low])
+    assert words.shape == (2, 3)
+
+    ok = covers(words, table.pack([needs_high, low]))
+    assert ok.tolist() == [[True, False], [True, True]]
+
+
+def test_suggestions_name_missing_skills():
+    """The skill-gap suggestion lists required skills nobody has."""
+    request = OptimizeRequest(
+        team_id="team-1",
+        date_from="2025-12-01",
+        date_to="2025-12-01",
+        employees=[Employee(id="e1", skills=["cashier", "barista"], availability=[])],
+        open_shifts=[
+            OpenShift(id="s1", day="2025-12-01", shift_code="x",
+                      required_skills=["cashier", "forklift"], duration_hours=4),
+            OpenShift(id="s2", day="2025-12-01", shift_code="x",
+                      required_skills=["first_aid"], duration_hours=4),
+        ],
+    )
+    problem = ingest_request(request)
+
+    suggestions = build_suggestions(problem, [0, 1])
+
+    training = [s for s in suggestions if s.type == "train_employees"]
+    assert len(training) == 1
+    assert "['forklift', 'first_aid']" in training[0].description
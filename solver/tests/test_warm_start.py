@@ -0,0 +1,153 @@
+# solver/tests/test_warm_start.py
+# Tests for previous-roster hints and locked assignments
+
+import numpy as np
+import pytest
+
+from app.eligibility import build_eligibility, build_pairs
+from app.models import AssignmentRef, OptimizeStatus
+from app.optimize import _build_assignments, _build_model, _hint_previous_roster, run_optimization
+from app.problem import ingest_request
+from tests.factories import make_request
+
+
+def _refs(assignments):
+    return [AssignmentRef(shift_id=a.shift_id, employee_id=a.employee_id) for a in assignments]
+
+
+def test_previous_roster_is_hinted_completely():
+    """Every variable gets a hint, and the hint reproduces the previous roster."""
+    request = make_request(num_employees=8, num_shifts=30, seed=2)
+    previous = run_optimization(request)
+    request.previous_assignments = _refs(previous.assignments)
+
+    problem = ingest_request(request)
+    pairs = build_pairs(problem, problem.settings.weights)
+    model, unfilled, guards = _build_model(problem, pairs)
+    _hint_previous_roster(model, problem, pairs, unfilled, guards)
+
+    hint = dict(zip(model.Proto().solution_hint.vars, model.Proto().solution_hint.values))
+    assert len(hint) == len(model.Proto().variables)
+    # Identical shifts share a model shift; rendering hands each employee their previous seat
+    hinted = np.flatnonzero([hint[var] == 1 for var in pairs.var.tolist()])
+    rendered = {(a.shift_id, a.employee_id) for a in _build_assignments(problem, pairs, hinted)}
+    assert rendered == {(a.shift_id, a.employee_id) for a in previous.assignments}
+
+
+def test_warm_start_after_call_in_sick_keeps_optimum():
+    """Dropping an employee and hinting the old roster gives the same optimum as a cold solve."""
+    request = make_request(num_employees=8, num_shifts=30, seed=2)
+    previous = run_optimization(request)
+
+    cold = request.model_copy(deep=True)
+    cold.employees = cold.employees[1:]
+    warm = cold.model_copy(deep=True)
+    warm.previous_assignments = _refs(previous.assignments)
+
+    assert run_optimization(warm).fitness == run_optimization(cold).fitness
+
+
+def test_locked_assignment_overrides_eligibility():
+    """A locked pair is kept even if the employee is not eligible for the shift."""
+    request = make_request(num_employees=6, num_shifts=20, seed=4)
+    problem = ingest_request(request)
+    eligibility = build_eligibility(problem, problem.settings.weights)
+    e_idx, s_idx = np.argwhere(~eligibility.matrix)[0].tolist()
+    employee_id, shift_id = request.employees[e_idx].id, request.open_shifts[s_idx].id
+    request.locked_assignments = [AssignmentRef(shift_id=shift_id, employee_id=employee_id)]
+
+    result = run_optimization(request)
+
+    assert result.status == OptimizeStatus.OPTIMAL
+    assigned = {a.shift_id: a.employee_id for a in result.assignments}
+    assert assigned[shift_id] == employee_id
+
+
+def test_locked_assignments_conflicting_are_infeasible():
+    """Two overlapping shifts locked to the same employee cannot both hold."""
+    request = make_request(num_employees=4, num_shifts=10, seed=1)
+    first, second = request.open_shifts[:2]
+    second.day, second.start_time, second.end_time = first.day, first.start_time, first.end_time
+    employee_id = request.employees[0].id
+    request.locked_assignments = [
+        AssignmentRef(shift_id=first.id, employee_id=employee_id),
+        AssignmentRef(shift_id=second.id, employee_id=employee_id),
+    ]
+
+    assert run_optimization(request).status == OptimizeStatus.INFEASIBLE
+
+
+@pytest.mark.parametrize("concurrently", [False, True])
+def test_relaxed_solve_drops_one_conflicting_lock(concurrently):
+    """The relaxed solve frees the lock guards and keeps all locks but one."""
+    request = make_request(num_employees=4, num_shifts=10, seed=1)
+    request.settings.relaxed_concurrently = concurrently
+    first, second = request.open_shifts[:2]
+    second.day, second.start_time, second.end_time = first.day, first.start_time, first.end_time
+    employee_id = request.employees[0].id
+    request.locked_assignments = [
+        AssignmentRef(shift_id=first.id, employee_id=employee_id),
+        AssignmentRef(shift_id=second.id, employee_id=employee_id),
+    ]
+
+    relaxed = run_optimization(request).relaxed_solution
+
+    assert relaxed is not None
+    dropped = [name for name in relaxed.relaxed_constraints if name.startswith("locked:")]
+    assert len(dropped) == 1
+    kept = {first.id, second.id} - {dropped[0].split(":", 1)[1]}
+    assert (kept.pop(), employee_id) in {(a.shift_id, a.employee_id) for a in relaxed.assignments}
+
+
+def test_unsat_core_names_the_conflicting_locks():
+    """Two locks on overlapping shifts form the core, each with a removal suggestion."""
+    request = make_request(num_employees=4, num_shifts=10, seed=1)
+    first, second = request.open_shifts[:2]
+    second.day, second.start_time, second.end_time = first.day, first.start_time, first.end_time
+    employee_id = request.employees[0].id
+    request.locked_assignments = [
+        AssignmentRef(shift_id=first.id, employee_id=employee_id),
+        AssignmentRef(shift_id=second.id, employee_id=employee_id),
+    ]
+
+    result = run_optimization(request)
+
+    core = result.diagnostics.unsat_core
+    assert {f"locked:{first.id}", f"locked:{second.id}"} <= set(core)
+    assert len(result.diagnostics.minimal_unsat) == len(core)
+    removals = [s for s in result.suggestions if s.type == "remove_lock"]
+    assert len(removals) == 2
+
+    request.settings.unsat_core_time_fraction = 0.0
+    assert run_optimization(request).diagnostics.minimal_unsat is None
+
+
+def test_relaxed_concurrently_leaves_feasible_solves_alone():
+    """Starting the relaxed solve alongside does not change a feasible result."""
+    request = make_request(num_employees=6, num_shifts=20, seed=5)
+    request.locked_assignments = _refs(run_optimization(request).assignments[:2])
+    sequential = run_optimization(request)
+
+    request.settings.relaxed_concurrently = True
+    concurrent = run_optimization(request)
+
+    assert concurrent.status == sequential.status == OptimizeStatus.OPTIMAL
+    assert concurrent.fitness == sequential.fitness
+    assert concurrent.relaxed_solution is None
+
+
+def test_locked_assignment_with_unknown_ids_is_rejected():
+    """Locks must reference employees and shifts of the request, one employee per shift."""
+    request = make_request(num_employees=2, num_shifts=2, seed=1)
+    shift_id = request.open_shifts[0].id
+
+    request.locked_assignments = [AssignmentRef(shift_id=shift_id, employee_id="nobody")]
+    with pytest.raises(ValueError, match="unknown employee"):
+        ingest_request(request)
+
+    request.locked_assignments = [
+        AssignmentRef(shift_id=shift_id, employee_id=request.employees[0].id),
+        AssignmentRef(shift_id=shift_id, employee_id=request.employees[1].id),
+    ]
+    with pytest.raises(ValueError, match="more than one employee"):
+        ingest_request(request)
@@ -0,0 +1,71 @@
+# solver/tests/test_warmup.py
+# Tests for the warm-up solve, /ready and lazy loading of the solver
+
+import subprocess
+import sys
+import time
+
+from fastapi.testclient import TestClient
+
+from app import warmup
+from app.main import app
+from app.warmup import Readiness
+
+
+def test_service_import_leaves_solver_unloaded():
+    """Importing the service does not load OR-Tools or the modules built on it."""
+    code = (
+        "import sys, app.main\n"
+        "loaded = [m for m in ('ortools', 'numpy', 'dateutil', 'app.optimize') if m in sys.modules]\n"
+        "assert not loaded, loaded\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+
+
+def test_warm_up_solves_once():
+    readiness = Readiness()
+    assert not readiness.ready
+
+    readiness.warm_up()
+    seconds = readiness.warmup_seconds
+    readiness.warm_up()
+
+    assert readiness.ready and readiness.error is None
+    assert seconds > 0 and readiness.warmup_seconds == seconds
+
+
+def test_warm_up_can_be_skipped(monkeypatch):
+    monkeypatch.setenv("SOLVER_WARMUP", "0")
+    readiness = Readiness()
+
+    readiness.warm_up()
+
+    assert readiness.ready and readiness.warmup_seconds is None
+
+
+def test_failed_warm_up_is_not_ready(monkeypatch):
+    monkeypatch.setattr(warmup, "WARMUP_REQUEST", {"team_id": "broken"})
+    readiness = Readiness()
+
+    readiness.warm_up()
+
+    assert readiness.state == "failed" and "validation error" in readiness.error
+
+
+def test_ready_after_startup_warm_up():
+    """/ready turns 200 once the lifespan's warm-up has run; startup times are in /metrics."""
+    with TestClient(app) as client:
+        deadline = time.monotonic() + 30
+        response = client.get("/ready")
+        while response.status_code == 503 and time.monotonic() < deadline:
+            assert response.json()["status"] in ("starting", "warming")
+            time.sleep(0.05)
+            response = client.get("/ready")
+        metrics = client.get("/metrics").text
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+    assert "solver_ready 1" in metrics
+    assert 'solver_startup_seconds{phase="import"}' in metrics
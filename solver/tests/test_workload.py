@@ -0,0 +1,73 @@
+# solver/tests/test_workload.py
+# Tests for the synthetic workload generator and scaling baseline comparison
+
+from app.models import AvailabilityType, OptimizeStatus
+from app.optimize import run_optimization
+from benchmarks.bench_scaling import compare
+from benchmarks.workload import WorkloadSpec, generate_request
+
+
+def test_generator_is_seeded():
+    """The same seed gives the same request; another seed does not."""
+    spec = WorkloadSpec(employees=20, days=7, shifts_per_day=15)
+
+    first = generate_request(spec, seed=3)
+
+    assert first == generate_request(spec, seed=3)
+    assert first != generate_request(spec, seed=4)
+    assert len(first.employees) == 20 and len(first.open_shifts) == spec.num_shifts == 105
+
+
+def test_generator_follows_the_spec():
+    """Overnight share, blackout rate and skill rarity shape the roster."""
+    spec = WorkloadSpec(employees=200, days=10, shifts_per_day=50, overnight_share=0.3, blackout_rate=0.2)
+
+    request = generate_request(spec, seed=1)
+
+    nights = sum(shift.shift_code == "night" for shift in request.open_shifts) / spec.num_shifts
+    blackouts = sum(
+        window.type == AvailabilityType.BLACKOUT
+        for employee in request.employees
+        for window in employee.availability
+    ) / (spec.employees * spec.days)
+    holders = [sum(f"skill{k}" in e.skills for e in request.employees) for k in range(spec.skills)]
+    assert 0.25 < nights < 0.35
+    assert 0.15 < blackouts < 0.25
+    assert holders[0] == spec.employees and holders[-1] < holders[1]
+
+
+def test_generated_roster_solves():
+    request = generate_request(WorkloadSpec(employees=10, days=5, shifts_per_day=10), seed=0)
+
+    result = run_optimization(request)
+
+    assert result.status == OptimizeStatus.OPTIMAL
+    assert result.diagnostics.assigned_shifts > 0
+
+
+def test_compare_flags_regressions():
+    """Growth past threshold and noise floor, lost optimality and lower quality are flagged."""
+    base = {
+        "employees": 100, "shifts": 1400, "build_ms": 500.0, "solve_ms": 2000.0,
+        "peak_rss_mb": 150.0, "status": "OPTIMAL", "fitness": 1000, "fill_rate": 0.95,
+    }
+    noisy = dict(base, build_ms=530.0, solve_ms=2400.0, peak_rss_mb=160.0, fitness=995)
+    slower = dict(base, build_ms=1000.0, status="FEASIBLE", fitness=900, fill_rate=0.9)
+
+    assert compare({"100x1400": base}, {"100x1400": noisy}, 0.25, 0.01) == []
+    assert compare({"10x50": base}, {"100x1400": slower}, 0.25, 0.01) == []
+    regressions = compare({"100x1400": base}, {"100x1400": slower}, 0.25, 0.01)
+    assert [line.split()[1] for line in regressions] == ["build_ms", "status", "fitness", "fill"]
+
+
+def test_compare_flags_runs_without_a_roster():
+    """A size that loses its roster is flagged; two runs without one compare clean."""
+    base = {
+        "employees": 1000, "shifts": 20000, "build_ms": 500.0, "solve_ms": 2000.0,
+        "peak_rss_mb": 150.0, "status": "FEASIBLE", "fitness": 1000, "fill_rate": 0.95,
+    }
+    timed_out = dict(base, status="TIMEOUT", fitness=None, fill_rate=0.0)
+
+    regressions = compare({"1000x20000": base}, {"1000x20000": timed_out}, 0.25, 0.01)
+    assert [line.split()[1] for line in regressions] == ["fitness", "fill"]
+    assert compare({"1000x20000": timed_out}, {"1000x20000": timed_out}, 0.25, 0.01) == []